@@ -0,0 +1,301 @@
+#! /usr/bin/env python3
+
+"""
+asyncio entry points to the ORF and peptide searches.
+
+The functions of `find_orf` and `translate` are CPU-bound, and reading a
+sequence file blocks, so calling them from a coroutine stalls the event
+loop. The coroutines here run both off the loop:
+
+* Files are read and parsed (with `seqio.iter_records`) a batch of records
+  at a time in an I/O executor, so each call blocks one of its threads for
+  at most about `batch_bases` bases.
+* Each batch of records is searched with one call (of
+  `find_orf.find_first_orfs` or `translate.longest_peptide_many`) in the
+  CPU executor. By default this is the loop's default thread pool. Pass a
+  `concurrent.futures.ProcessPoolExecutor` to search in parallel.
+
+Reading the next batch of a file overlaps with searching the previous one.
+`iter_paths` searches many files at once, yielding results as they are
+found. It has at most `max_concurrency` files open, so hundreds of paths
+only need as many threads as the executors already have.
+
+Cancelling a task (or closing an iterator early) cancels the batches it has
+queued. A batch already running in an executor is left to finish, and its
+result is dropped.
+
+>>> import asyncio
+>>> asyncio.run(find_first_orf('CCAUGUAA'))
+'AUGUAA'
+"""
+
+import asyncio
+import functools
+import collections
+
+import seqio
+import find_orf
+import translate
+import genetic_codes
+
+OPERATIONS = ('find_first_orf', 'get_longest_peptide')
+
+
+async def find_first_orf(sequence,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        executor = None):
+    """
+    Return the first ORF of `sequence`, found in `executor` (the loop's
+    default executor if None); see `find_orf.find_first_orf`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(
+            find_orf.find_first_orf, sequence,
+            start_codons = list(start_codons),
+            stop_codons = list(stop_codons)))
+
+
+async def get_longest_peptide(rna_sequence,
+        genetic_code = genetic_codes.STANDARD,
+        executor = None):
+    """
+    Return the longest peptide of `rna_sequence`, found in `executor` (the
+    loop's default executor if None); see `translate.get_longest_peptide`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(
+            translate.get_longest_peptide, rna_sequence, genetic_code))
+
+
+def _longest_peptides(sequences, genetic_code):
+    # Run in the CPU executor, so it must be picklable and return a list
+    return list(translate.longest_peptide_many(sequences, genetic_code))
+
+
+def _get_search(operation, arguments):
+    # Return the function (of a list of sequences) that makes the batched
+    # call of `operation`, with the `arguments` (a dict) of `operation`
+    if operation == 'find_first_orf':
+        search = functools.partial(find_orf.find_first_orfs,
+                start_codons = list(arguments.pop('start_codons', ['AUG'])),
+                stop_codons = list(arguments.pop('stop_codons',
+                        ['UAA', 'UAG', 'UGA'])))
+    elif operation == 'get_longest_peptide':
+        search = functools.partial(_longest_peptides,
+                genetic_code = arguments.pop('genetic_code',
+                        genetic_codes.STANDARD))
+    else:
+        raise ValueError("Unknown operation: {0!r}".format(operation))
+    if arguments:
+        raise TypeError("{0}() got an unexpected keyword argument "
+                "{1!r}".format(operation, sorted(arguments)[0]))
+    return search
+
+
+def _read_batch(records, batch_bases):
+    # Run in the I/O executor: return the next records of the generator
+    # `records`, up to about `batch_bases` bases (at least one record, unless
+    # there are none left)
+    batch = []
+    n = 0
+    for record in records:
+        batch.append(record)
+        n += len(record.sequence)
+        if n >= batch_bases:
+            break
+    return batch
+
+
+async def iter_records(path, batch_bases = 1 << 20, io_executor = None):
+    """
+    Generate the records of the sequence file at `path` (see
+    `seqio.iter_records`), read and parsed in batches of about
+    `batch_bases` bases in `io_executor` (the loop's default executor if
+    None).
+    """
+    loop = asyncio.get_running_loop()
+    records = seqio.iter_records(path)
+    try:
+        while True:
+            batch = await loop.run_in_executor(io_executor, _read_batch,
+                    records, batch_bases)
+            if not batch:
+                return
+            for record in batch:
+                yield record
+    finally:
+        _close_records(records)
+
+
+def _close_records(records):
+    try:
+        records.close()
+    except ValueError:
+        # A cancelled read is still running in the I/O executor; the file
+        # is closed when the generator is collected
+        pass
+
+
+async def _iter_results(path, search, batch_bases, executor, io_executor,
+        max_pending):
+    # Generate (record, result) for the records of `path`, in order, with up
+    # to `max_pending` batches read ahead and queued for the CPU executor
+    loop = asyncio.get_running_loop()
+    records = seqio.iter_records(path)
+    pending = collections.deque()
+    exhausted = False
+    try:
+        while True:
+            while (not exhausted) and (len(pending) < max_pending):
+                batch = await loop.run_in_executor(io_executor, _read_batch,
+                        records, batch_bases)
+                if not batch:
+                    exhausted = True
+                    break
+                pending.append((batch, loop.run_in_executor(executor,
+                        search, [r.sequence for r in batch])))
+            if not pending:
+                return
+            batch, future = pending[0]
+            results = await future
+            pending.popleft()
+            for record, result in zip(batch, results):
+                yield record, result
+    finally:
+        for batch, future in pending:
+            future.cancel()
+        _close_records(records)
+
+
+async def iter_first_orfs(path,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        executor = None,
+        io_executor = None,
+        batch_bases = 1 << 20,
+        max_pending = 2):
+    """
+    Generate `(record, orf)` for every record of the sequence file at
+    `path`, in order.
+
+    Batches of about `batch_bases` bases are read in `io_executor` and
+    searched (see `find_orf.find_first_orfs`) in `executor`, with up to
+    `max_pending` batches queued at a time, so reading overlaps searching.
+    """
+    results = _iter_results(path, _get_search('find_first_orf',
+            {'start_codons' : start_codons, 'stop_codons' : stop_codons}),
+            batch_bases, executor, io_executor, max_pending)
+    try:
+        async for record, orf in results:
+            yield record, orf
+    finally:
+        await results.aclose()
+
+
+async def iter_longest_peptides(path,
+        genetic_code = genetic_codes.STANDARD,
+        executor = None,
+        io_executor = None,
+        batch_bases = 1 << 20,
+        max_pending = 2):
+    """
+    Generate `(record, peptide)` for every record of the sequence file at
+    `path`, in order, where `peptide` is the longest peptide of the record
+    (see `translate.longest_peptide_many`). The other arguments are those of
+    `iter_first_orfs`.
+    """
+    results = _iter_results(path, _get_search('get_longest_peptide',
+            {'genetic_code' : genetic_code}),
+            batch_bases, executor, io_executor, max_pending)
+    try:
+        async for record, peptide in results:
+            yield record, peptide
+    finally:
+        await results.aclose()
+
+
+async def iter_paths(paths,
+        operation = 'find_first_orf',
+        max_concurrency = 8,
+        executor = None,
+        io_executor = None,
+        batch_bases = 1 << 20,
+        max_pending = 2,
+        buffer_size = 1024,
+        **arguments):
+    """
+    Generate `(path, record, result)` for every record of the sequence files
+    at `paths`, as the results are found.
+
+    Up to `max_concurrency` files are searched at once, each as by
+    `iter_first_orfs` (or `iter_longest_peptides`). The results of each file
+    are in order, but the results of different files are interleaved. Up to
+    `buffer_size` results are held for the consumer before the searches wait
+    for it to catch up.
+
+    If a file cannot be read or searched, the error is raised, and the
+    other searches are cancelled, as they are if the iterator is closed
+    early or the task consuming it is cancelled.
+
+    Parameters
+    ----------
+    paths : iterable of str
+        The paths of the sequence files (see `seqio.iter_records`).
+    operation : str
+        'find_first_orf' or 'get_longest_peptide'.
+    max_concurrency : int
+        The most files searched at once.
+    arguments
+        The arguments of `operation`: `start_codons` and `stop_codons`, or
+        `genetic_code`. The rest are those of `iter_first_orfs`.
+    """
+    search = _get_search(operation, dict(arguments))
+    if max_concurrency < 1:
+        raise ValueError("The concurrency must be at least 1: {0!r}".format(
+                max_concurrency))
+    paths = iter(paths)
+    queue = asyncio.Queue(maxsize = buffer_size)
+
+    async def work():
+        # Workers take paths from the shared iterator until it is empty
+        for path in paths:
+            results = _iter_results(path, search, batch_bases, executor,
+                    io_executor, max_pending)
+            try:
+                async for record, result in results:
+                    await queue.put((path, record, result))
+            finally:
+                await results.aclose()
+
+    workers = [asyncio.ensure_future(work())
+            for i in range(max_concurrency)]
+    finished = asyncio.gather(*workers)
+    # Retrieve the error of the workers, even once they are cancelled, so it
+    # is not reported as never retrieved
+    finished.add_done_callback(_retrieve_exception)
+    get = None
+    try:
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            await asyncio.wait([get, finished],
+                    return_when = asyncio.FIRST_COMPLETED)
+            if get.done():
+                yield get.result()
+                continue
+            get.cancel()
+            # Raise the error of a failed worker, if any
+            finished.result()
+            while not queue.empty():
+                yield queue.get_nowait()
+            return
+    finally:
+        if get is not None:
+            get.cancel()
+        for worker in workers:
+            worker.cancel()
+
+
+def _retrieve_exception(future):
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,918 @@
+#! /usr/bin/env python3
+
+"""
+Benchmarks of the hot paths in `translate.py` and `find_orf.py`.
+
+Run all benchmarks with:
+
+    $ python3 benchmark.py
+
+or only some of them by name:
+
+    $ python3 benchmark.py translate_sequence
+
+The regression suite times every public function on seeded synthetic
+sequences of several sizes, and records the throughput and peak memory of
+each. Save the results as JSON, and compare a later run against them:
+
+    $ python3 benchmark.py --suite --json baseline.json
+    $ python3 benchmark.py --suite --baseline baseline.json --threshold 0.2
+
+The comparison exits with an error if any function is slower (or uses more
+memory) than the baseline by more than the threshold.
+
+The 'server' benchmark reports the latency percentiles of requests made by
+concurrent clients of a `server` (over a Unix domain socket and HTTP), and
+of the same calls made in-process.
+"""
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+import threading
+import json
+import time
+import random
+import platform
+import functools
+import collections
+import timeit
+import tracemalloc
+
+import translate
+import find_orf
+import sequence
+import result_cache
+import server
+import orf_table
+
+
+STANDARD_GENETIC_CODE = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+
+
+_RANDOM_BASES = bytes(b"ACGU"[i % 4] for i in range(256))
+
+def random_rna(length, seed = 1):
+    rng = random.Random(seed)
+    return rng.randbytes(length).translate(_RANDOM_BASES).decode('ascii')
+
+def stop_free_rna(length, seed = 1):
+    """Random RNA with every stop codon of frame 0 replaced by 'UGG'."""
+    seq = random_rna(length, seed)
+    codons = [seq[i:i + 3] for i in range(0, len(seq), 3)]
+    return "".join(
+            'UGG' if STANDARD_GENETIC_CODE.get(c) == '*' else c
+            for c in codons)
+
+def aug_rich_rna(length, seed = 1):
+    """Random RNA with a start codon in every third codon of frame 0."""
+    seq = random_rna(length, seed)
+    return "".join('AUG' + seq[i + 3:i + 9] for i in range(0, len(seq), 9))[
+            :length]
+
+def gc_rich_rna(length, gc_content = 0.65, seed = 1):
+    """Random RNA with the given fraction of G and C bases."""
+    rng = random.Random(seed)
+    gc = int(round(256 * gc_content))
+    table = bytes(b"GC"[i % 2] if i < gc else b"AU"[i % 2]
+            for i in range(256))
+    return rng.randbytes(length).translate(table).decode('ascii')
+
+GENERATORS = collections.OrderedDict((
+        ('random', random_rna),
+        ('aug_rich', aug_rich_rna),
+        ('stop_free', stop_free_rna),
+        ('gc_rich', gc_rich_rna),
+        ))
+
+def dict_translate_sequence(rna_sequence, genetic_code):
+    """The per-codon dict lookup that `CompiledGeneticCode` replaces."""
+    amino_acids = []
+    for i in range(0, len(rna_sequence) - 2, 3):
+        amino_acid = genetic_code[rna_sequence[i:i + 3].upper()]
+        if amino_acid == '*':
+            break
+        amino_acids.append(amino_acid)
+    return "".join(amino_acids)
+
+def restart_get_all_translations(rna_sequence, genetic_code):
+    """Translation restarted at every 'AUG', which `index_frame` replaces."""
+    seq = rna_sequence.upper()
+    peptides = []
+    for frame in range(3):
+        for i in range(frame, len(seq) - 2, 3):
+            if seq[i:i + 3] == 'AUG':
+                peptides.append(translate.translate_sequence(seq[i:],
+                        genetic_code))
+    return peptides
+
+def best_time(statement, repeat = 3, number = 1):
+    return min(timeit.repeat(statement, repeat = repeat, number = number))
+
+def report(name, length, seconds, baseline_seconds = None):
+    message = "{0:<40} {1:>11,} bases {2:>10.5f} s {3:>12,.0f} bases/s".format(
+            name, length, seconds, length / seconds)
+    if baseline_seconds is not None:
+        message += " {0:>7.1f}x".format(baseline_seconds / seconds)
+    sys.stdout.write(message + "\n")
+
+
+def bench_translate_sequence():
+    """Compiled genetic code versus per-codon dict lookups."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    for length in (1000, 100000, 1000000):
+        seq = stop_free_rna(length)
+        assert (translate.translate_sequence(seq, code) ==
+                dict_translate_sequence(seq, STANDARD_GENETIC_CODE))
+        dict_seconds = best_time(lambda: dict_translate_sequence(seq,
+                STANDARD_GENETIC_CODE))
+        report("translate_sequence (dict)", length, dict_seconds)
+        report("translate_sequence (compiled)", length,
+                best_time(lambda: translate.translate_sequence(seq, code)),
+                dict_seconds)
+        report("translate_sequence (dict, compile cached)", length,
+                best_time(lambda: translate.translate_sequence(seq,
+                        STANDARD_GENETIC_CODE)),
+                dict_seconds)
+
+def bench_get_longest_peptide():
+    """Pure-Python versus NumPy backends of `get_longest_peptide`."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    for length in (1000, 10000, 100000, 1000000, 10000000, 100000000):
+        seq = random_rna(length)
+        python_seconds = None
+        if length <= 1000000:
+            python_seconds = best_time(lambda: translate.get_longest_peptide(
+                    seq, code, backend = 'python'), repeat = 1)
+            report("get_longest_peptide (python)", length, python_seconds)
+        if translate.numpy is None:
+            continue
+        if python_seconds is not None:
+            assert (translate.get_longest_peptide(seq, code,
+                    backend = 'numpy') == translate.get_longest_peptide(
+                            seq, code, backend = 'python'))
+        report("get_longest_peptide (numpy)", length,
+                best_time(lambda: translate.get_longest_peptide(seq, code,
+                        backend = 'numpy'), repeat = 1),
+                python_seconds)
+
+def bench_get_all_translations():
+    """Restarting translation at every 'AUG' versus one indexed pass."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    for length in (9000, 90000, 900000):
+        # An 'AUG' in every third codon of frame 0, and a stop codon in every
+        # 300th codon.
+        seq = stop_free_rna(length, seed = 2)
+        seq = "".join(("UAA" if i % 100 == 0 else "AUG") + seq[j + 3:j + 9]
+                for i, j in enumerate(range(0, length, 9)))
+        restart_seconds = None
+        if length <= 90000:
+            assert (translate.get_all_translations(seq, code) ==
+                    restart_get_all_translations(seq, code))
+            restart_seconds = best_time(lambda: restart_get_all_translations(
+                    seq, code), repeat = 1)
+            report("get_all_translations (restart)", length, restart_seconds)
+        report("get_all_translations (indexed)", length,
+                best_time(lambda: translate.get_all_translations(seq, code)),
+                restart_seconds)
+        report("get_all_translations (indexed, views)", length,
+                best_time(lambda: translate.get_all_translations(seq, code,
+                        views = True)),
+                restart_seconds)
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_iter_all_translations():
+    """Peak memory of the materialized list versus the lazy generator."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    for length in (100000, 1000000):
+        seq = random_rna(length)
+        list_peak = peak_memory(lambda: translate.get_all_translations(seq,
+                code))
+        iter_peak = peak_memory(lambda: collections.deque(
+                translate.iter_all_translations(seq, code), maxlen = 0))
+        sys.stdout.write("{0:<40} {1:>11,} bases {2:>12,} bytes\n".format(
+                "get_all_translations (peak memory)", length, list_peak))
+        sys.stdout.write("{0:<40} {1:>11,} bases {2:>12,} bytes\n".format(
+                "iter_all_translations (peak memory)", length, iter_peak))
+
+def join_reverse_and_complement(sequence):
+    """The per-base dict lookup that the complement tables replace."""
+    complements = {'A': 'U', 'U': 'A', 'G': 'C', 'C': 'G'}
+    return "".join(complements[base] for base in sequence.upper())[::-1]
+
+def bench_reverse_and_complement():
+    """Per-base dict lookups versus translation tables."""
+    for length in (1000, 1000000, 10000000):
+        seq = random_rna(length)
+        join_seconds = best_time(lambda: join_reverse_and_complement(seq))
+        report("reverse_and_complement (join)", length, join_seconds)
+        report("reverse_and_complement (str)", length,
+                best_time(lambda: translate.reverse_and_complement(seq)),
+                join_seconds)
+        buffer = bytearray(seq.encode('ascii'))
+        report("reverse_and_complement_in_place", length,
+                best_time(lambda: translate.reverse_and_complement_in_place(
+                        buffer)),
+                join_seconds)
+
+def uncached_find_first_orf(sequence,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA']):
+    """`find_first_orf` vetting codons and compiling patterns every call."""
+    if not re.match(r'[ACGU]*\Z|[ACGT]*\Z', sequence, re.IGNORECASE):
+        raise Exception("Invalid sequence: {0!r}".format(sequence))
+    for codon in list(start_codons) + list(stop_codons):
+        if not re.match(r'[ACGU]{3}\Z', codon, re.IGNORECASE):
+            raise Exception("Invalid codon: {0!r}".format(codon))
+    seq = sequence.upper().replace('T', 'U')
+    starts = [c.upper() for c in start_codons]
+    stops = [c.upper() for c in stop_codons]
+    match_object = re.compile('(?:{0})(?:[ACGU]{{3}})*?(?:{1})'.format(
+            '|'.join(starts), '|'.join(stops))).search(seq)
+    if match_object:
+        return match_object.group()
+    return ''
+
+def bench_find_first_orf_overhead():
+    """Per-call overhead of vetting codons and compiling ORF patterns."""
+    reads = [random_rna(30, seed = i) for i in range(10000)]
+    finder = find_orf.OrfFinder()
+    timings = (
+            ("find_first_orf (uncached)", lambda: [
+                    uncached_find_first_orf(r) for r in reads]),
+            ("find_first_orf (cached)", lambda: [
+                    find_orf.find_first_orf(r) for r in reads]),
+            ("OrfFinder.find_first_orf", lambda: [
+                    finder.find_first_orf(r) for r in reads]),
+            )
+    uncached_seconds = None
+    for name, function in timings:
+        seconds = best_time(function)
+        sys.stdout.write("{0:<40} {1:>9.2f} us/call{2}\n".format(name,
+                1e6 * seconds / len(reads),
+                "" if uncached_seconds is None else " {0:>7.1f}x".format(
+                        uncached_seconds / seconds)))
+        if uncached_seconds is None:
+            uncached_seconds = seconds
+
+def copying_normalize_sequence(sequence):
+    """The vet, `upper` and `replace` copies that `normalize_sequence` fuses."""
+    find_orf.vet_nucleotide_sequence(sequence)
+    return sequence.upper().replace('T', 'U')
+
+def bench_normalize_sequence():
+    """Peak memory of normalizing a sequence."""
+    for length in (1000000, 20000000):
+        seq = random_rna(length).replace('U', 't')
+        buffer = bytearray(seq.encode('ascii'))
+        peaks = (
+                ("vet, upper and replace", peak_memory(
+                        lambda: copying_normalize_sequence(seq))),
+                ("normalize_sequence (str)", peak_memory(
+                        lambda: find_orf.normalize_sequence(seq))),
+                ("normalize_sequence (in place)", peak_memory(
+                        lambda: find_orf.normalize_sequence(buffer,
+                                in_place = True))),
+                )
+        for name, peak in peaks:
+            sys.stdout.write(
+                    "{0:<40} {1:>11,} bases {2:>12,} bytes {3:>6.2f}x\n".format(
+                            name, length, peak, peak / length))
+        report("vet, upper and replace", length, best_time(
+                lambda: copying_normalize_sequence(seq)))
+        report("normalize_sequence (str)", length, best_time(
+                lambda: find_orf.normalize_sequence(seq)))
+
+
+def bench_find_orfs_adversarial():
+    """Regex backtracking versus the linear scanner on start-only input."""
+    for count in (1000, 2000, 4000, 8000):
+        # Start codons in every frame with no stop codon: the lazy regex
+        # retries the rest of the sequence from every start codon
+        seq = 'AUGG' * count
+        length = len(seq)
+        report("find_first_orf (regex)", length, best_time(
+                lambda: uncached_find_first_orf(seq), repeat = 1))
+        report("find_first_orf (scanner)", length, best_time(
+                lambda: find_orf.find_first_orf(seq)))
+        report("find_all_orfs (scanner)", length, best_time(
+                lambda: find_orf.find_all_orfs(seq, reverse = True)))
+    seq = 'AUGG' * 1000000
+    report("find_all_orfs (scanner)", len(seq), best_time(
+            lambda: find_orf.find_all_orfs(seq, reverse = True)))
+
+
+def bench_start_codon_count():
+    """Scan cost with 1 to 10 start codons, alternation versus class tables."""
+    seq = random_rna(1000000)
+    codons = ['AUG', 'GUG', 'UUG', 'CUG', 'AUU', 'AUC', 'AUA', 'ACG', 'GGG',
+            'CCC']
+    stops = ['UAA', 'UAG', 'UGA']
+    for count in range(1, len(codons) + 1):
+        starts = codons[:count]
+        pattern = re.compile('(?:{0})(?:[ACGU]{{3}})*?(?:{1})'.format(
+                '|'.join(starts), '|'.join(stops)))
+        finder = find_orf.OrfFinder(starts, stops)
+        # The regex only finds non-overlapping ORFs, so this compares how
+        # each rate changes with the number of codons, not the rates
+        report("regex alternation ({0} starts)".format(count), len(seq),
+                best_time(lambda: pattern.findall(seq)))
+        report("codon class tables ({0} starts)".format(count), len(seq),
+                best_time(lambda: finder.find_all_orfs(seq,
+                        nested = False)))
+
+
+def bench_batch_jobs():
+    """Batch search of many small records with 1 to N processes."""
+    sequences = [random_rna(300, seed = i) for i in range(20000)]
+    length = sum(len(s) for s in sequences)
+    serial_seconds = best_time(lambda: [find_orf.find_first_orf(s)
+            for s in sequences])
+    report("find_first_orf per record", length, serial_seconds)
+    for jobs in range(1, (os.cpu_count() or 1) + 1):
+        report("find_first_orfs ({0} jobs)".format(jobs), length,
+                best_time(lambda: find_orf.find_first_orfs(sequences,
+                        jobs = jobs)),
+                serial_seconds)
+
+
+def bench_longest_peptide_jobs():
+    """Scaling of `get_longest_peptide` from 1 to N processes."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    seq = random_rna(20000000)
+    serial_seconds = best_time(
+            lambda: translate.get_longest_peptide(seq, code))
+    report("get_longest_peptide (serial)", len(seq), serial_seconds)
+    for jobs in range(1, (os.cpu_count() or 1) + 1):
+        if jobs == 1:
+            # jobs = 1 is the serial search; this times the pool with 1 worker
+            function = lambda: translate._get_longest_peptide_parallel(seq,
+                    code, 1)
+        else:
+            function = lambda: translate.get_longest_peptide(seq, code,
+                    jobs = jobs)
+        report("get_longest_peptide ({0} jobs)".format(jobs), len(seq),
+                best_time(function), serial_seconds)
+
+
+def sorted_translations(rna_sequence, genetic_code, k):
+    """The k longest peptides, from every translation sorted by length."""
+    peptides = translate.get_all_translations(rna_sequence, genetic_code)
+    peptides += translate.get_all_translations(
+            translate.reverse_and_complement(rna_sequence), genetic_code)
+    return sorted(peptides, key = len, reverse = True)[:k]
+
+
+def bench_longest_peptides():
+    """Top-k peptides with a bounded heap versus sorting every translation."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    for length in (100000, 1000000):
+        seq = random_rna(length)
+        for k in (1, 10, 100):
+            sort_seconds = best_time(
+                    lambda: sorted_translations(seq, code, k))
+            report("sort every translation (k = {0})".format(k), length,
+                    sort_seconds)
+            report("get_longest_peptides (k = {0})".format(k), length,
+                    best_time(lambda: translate.get_longest_peptides(seq,
+                            code, k)),
+                    sort_seconds)
+        peaks = (
+                ("sort every translation (k = 10)", peak_memory(
+                        lambda: sorted_translations(seq, code, 10))),
+                ("get_longest_peptides (k = 10)", peak_memory(
+                        lambda: translate.get_longest_peptides(seq, code,
+                                10))),
+                )
+        for name, peak in peaks:
+            sys.stdout.write("{0:<40} {1:>11,} bases {2:>12,} bytes\n".format(
+                    name, length, peak))
+
+
+def bench_sequence():
+    """Memory and speed of a packed `sequence.Sequence` versus a `str`."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    length = 10000000
+    seq = random_rna(length)
+    packed = sequence.Sequence(seq)
+    sys.stdout.write("{0:<40} {1:>11,} bases {2:>12,} bytes\n".format(
+            "str", length, sys.getsizeof(seq)))
+    sys.stdout.write("{0:<40} {1:>11,} bases {2:>12,} bytes {3:>6.2f}x\n".format(
+            "Sequence", length, packed.nbytes,
+            sys.getsizeof(seq) / packed.nbytes))
+    report("Sequence (pack)", length, best_time(
+            lambda: sequence.Sequence(seq)))
+    report("Sequence (unpack)", length, best_time(lambda: str(packed)))
+    str_seconds = best_time(lambda: translate.reverse_and_complement(seq))
+    report("reverse_and_complement (str)", length, str_seconds)
+    report("reverse_and_complement (Sequence)", length, best_time(
+            lambda: sequence.Sequence._from_packed(packed._packed, length,
+                    'RNA').reverse_complement()), str_seconds)
+    str_seconds = best_time(lambda: translate.codon_indices(seq, 1))
+    report("codon_indices (str)", length, str_seconds)
+    report("codon_indices (Sequence)", length, best_time(
+            lambda: packed.codon_indices(1)), str_seconds)
+    for backend in ("python", "numpy"):
+        if backend == "numpy" and translate.numpy is None:
+            continue
+        str_seconds = best_time(lambda: translate.get_longest_peptide(seq,
+                code, backend = backend))
+        report("get_longest_peptide ({0}, str)".format(backend), length,
+                str_seconds)
+        report("get_longest_peptide ({0}, Sequence)".format(backend),
+                length, best_time(lambda: translate.get_longest_peptide(
+                        packed, code, backend = backend)), str_seconds)
+
+
+def duplicated_reads(n, unique, length = 150, seed = 1):
+    """`n` reads drawn (with replacement) from `unique` random reads."""
+    rng = random.Random(seed)
+    reads = [random_rna(length, seed + i) for i in range(unique)]
+    return [rng.choice(reads) for i in range(n)]
+
+def bench_result_cache():
+    """Searching duplicated reads with and without a `ResultCache`."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    n = 20000
+    for unique in (200, 2000, 20000):
+        reads = duplicated_reads(n, unique)
+        length = sum(len(r) for r in reads)
+        label = "{0:,} of {1:,} unique".format(n, unique)
+        seconds = best_time(lambda: [translate.get_longest_peptide(r, code)
+                for r in reads], repeat = 1)
+        report("get_longest_peptide ({0})".format(label), length, seconds)
+        cache = result_cache.ResultCache()
+        assert [translate.get_longest_peptide(r, code, cache = cache)
+                for r in reads] == [translate.get_longest_peptide(r, code)
+                        for r in reads]
+        cache = result_cache.ResultCache()
+        report("get_longest_peptide (cached, {0})".format(label), length,
+                best_time(lambda: [translate.get_longest_peptide(r, code,
+                        cache = cache) for r in reads], repeat = 1),
+                seconds)
+        seconds = best_time(lambda: find_orf.find_first_orfs(reads),
+                repeat = 1)
+        report("find_first_orfs ({0})".format(label), length, seconds)
+        cache = result_cache.ResultCache()
+        report("find_first_orfs (cached, {0})".format(label), length,
+                best_time(lambda: find_orf.find_first_orfs(reads,
+                        cache = cache), repeat = 1),
+                seconds)
+        sys.stdout.write("{0:<40} hits: {1:,} misses: {2:,}\n".format(
+                "", cache.hits, cache.misses))
+
+
+def bench_many():
+    """Batch translation of many short reads versus one call per read."""
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    reads = duplicated_reads(100000, 100000)
+    length = sum(len(r) for r in reads)
+    seconds = best_time(lambda: [translate.translate_sequence(r, code)
+            for r in reads])
+    report("translate_sequence (per read)", length, seconds)
+    report("translate_many", length, best_time(
+            lambda: translate.translate_many(reads, code)), seconds)
+    seconds = best_time(lambda: [translate.get_longest_peptide(r, code)
+            for r in reads], repeat = 1)
+    report("get_longest_peptide (per read)", length, seconds)
+    report("longest_peptide_many", length, best_time(
+            lambda: translate.longest_peptide_many(reads, code),
+            repeat = 1), seconds)
+    peptides = [translate.get_longest_peptide(r, code) for r in reads]
+    batch = translate.longest_peptide_many(reads, code)
+    assert list(batch) == peptides
+    for name, size in (
+            ("list of str", sys.getsizeof(peptides) + sum(
+                    sys.getsizeof(p) for p in peptides)),
+            ("Peptides", sys.getsizeof(batch.buffer) + sys.getsizeof(
+                    batch.offsets))):
+        sys.stdout.write("{0:<40} {1:>11,} reads {2:>12,} bytes\n".format(
+                "longest peptides ({0})".format(name), len(reads), size))
+
+
+def percentiles(values, points = (50, 90, 99)):
+    """The `points` percentiles of `values` (nearest rank)."""
+    values = sorted(values)
+    return [values[min(len(values) - 1, (len(values) * p) // 100)]
+            for p in points]
+
+def measure_latency(address, reads, clients = 8):
+    """
+    The latencies (in seconds) of `find_first_orf` and `get_longest_peptide`
+    calls of each of `reads`, made by `clients` concurrent `server.Client`s
+    of the server at `address` (or in-process, if it is None), and the
+    seconds taken by all of them.
+    """
+    latencies = []
+    lock = threading.Lock()
+    def run(reads):
+        times = []
+        with server.Client(address, fallback = False) as client:
+            for read in reads:
+                started = time.perf_counter()
+                client.find_first_orf(read)
+                client.get_longest_peptide(read)
+                times.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(times)
+    threads = [threading.Thread(target = run, args = (reads[i::clients],))
+            for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+def bench_server():
+    """Latency percentiles of concurrent clients of a `server`."""
+    reads = duplicated_reads(2000, 2000)
+    temp_dir = tempfile.mkdtemp()
+    addresses = [('in-process', None),
+            ('http', ('127.0.0.1', 0))]
+    if hasattr(server, '_UnixServer'):
+        addresses.insert(1, ('unix', os.path.join(temp_dir, 'orf.sock')))
+    try:
+        for clients in (1, 8, 32):
+            for name, address in addresses:
+                running = None
+                if address is not None:
+                    running = server.make_server(address)
+                    if isinstance(address, tuple):
+                        address = running.server_address
+                    threading.Thread(target = running.serve_forever,
+                            daemon = True).start()
+                try:
+                    latencies, seconds = measure_latency(address, reads,
+                            clients)
+                finally:
+                    if running is not None:
+                        running.shutdown()
+                        running.server_close()
+                        running.batcher.close()
+                p50, p90, p99 = percentiles(latencies)
+                batches = ''
+                if running is not None:
+                    batches = "{0:.1f} requests/batch".format(
+                            running.batcher.requests /
+                            max(1, running.batcher.batches))
+                sys.stdout.write("{0:<24} {1:>9,.0f} reads/s  p50 {2:>7.3f} ms"
+                        "  p90 {3:>7.3f} ms  p99 {4:>7.3f} ms  {5}\n".format(
+                                "{0} ({1} clients)".format(name, clients),
+                                len(reads) / seconds, 1000 * p50,
+                                1000 * p90, 1000 * p99, batches))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def bench_orf_table():
+    """Writing ORFs as text and as an ORF table, and reading them back."""
+    n = 1000000
+    rng = random.Random(1)
+    rows = []
+    for i in range(n):
+        start = rng.randrange(10000)
+        rows.append(("read{0}".format(i), '+', start % 3, start,
+                start + 90, 'M' + 'A' * 28))
+    temp_dir = tempfile.mkdtemp()
+    try:
+        text_path = os.path.join(temp_dir, 'orfs.txt')
+        def write_text():
+            with open(text_path, 'w') as stream:
+                for record, strand, frame, start, end, peptide in rows:
+                    stream.write("{0}\t{1}\t{2}\t{3}\t{4}\t{5}\n".format(
+                            record, strand, frame, start, end, peptide))
+        def read_text():
+            with open(text_path) as stream:
+                return [line.rstrip('\n').split('\t') for line in stream
+                        if int(line.split('\t', 5)[3]) >= 5000]
+        def count_text():
+            with open(text_path) as stream:
+                return sum(1 for line in stream
+                        if int(line.split('\t', 5)[3]) >= 5000)
+        table_path = os.path.join(temp_dir, 'orfs.orfcol')
+        def write_table():
+            with orf_table.OrfTableWriter(table_path,
+                    format = 'orfcol') as writer:
+                for row in rows:
+                    writer.write_row(*row)
+        def read_table():
+            with orf_table.OrfTable(table_path) as table:
+                starts = table.column('start')
+                if hasattr(starts, 'nonzero'):
+                    indices = (starts >= 5000).nonzero()[0]
+                else:
+                    indices = [i for i, s in enumerate(starts) if s >= 5000]
+                del starts
+                return list(table.rows(indices))
+        def count_table():
+            with orf_table.OrfTable(table_path) as table:
+                starts = table.column('start')
+                if hasattr(starts, 'nonzero'):
+                    count = int((starts >= 5000).sum())
+                else:
+                    count = sum(1 for s in starts if s >= 5000)
+                del starts
+                return count
+        seconds = best_time(write_text, repeat = 1)
+        report("write text ({0:,} ORFs)".format(n), n, seconds)
+        report("write orfcol ({0:,} ORFs)".format(n), n,
+                best_time(write_table, repeat = 1), seconds)
+        seconds = best_time(read_text, repeat = 1)
+        report("read and filter text", n, seconds)
+        report("read and filter orfcol", n,
+                best_time(read_table, repeat = 1), seconds)
+        seconds = best_time(count_text, repeat = 1)
+        report("count text", n, seconds)
+        report("count orfcol", n, best_time(count_table, repeat = 1),
+                seconds)
+        assert len(read_text()) == len(read_table()) == count_table()
+        for path in (text_path, table_path):
+            sys.stdout.write("{0:<40} {1:>12,} bytes\n".format(
+                    os.path.basename(path), os.path.getsize(path)))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def split_reads(seq, read_length = 150):
+    return [seq[i:i + read_length] for i in range(0, len(seq), read_length)]
+
+def split_chunks(seq, chunk_size = 1 << 16):
+    return [seq[i:i + chunk_size].encode('ascii')
+            for i in range(0, len(seq), chunk_size)]
+
+# The functions timed by the suite, each as a name and a function of a
+# sequence and a compiled genetic code that returns the call to time (so
+# that any setup, like splitting the sequence into reads, is not timed)
+SUITE = (
+        ('translate.codon_indices',
+                lambda seq, code: lambda: translate.codon_indices(seq)),
+        ('translate.translate_sequence',
+                lambda seq, code: lambda: translate.translate_sequence(seq,
+                        code)),
+        ('translate.get_all_translations',
+                lambda seq, code: lambda: translate.get_all_translations(seq,
+                        code, views = True)),
+        ('translate.iter_all_translations',
+                lambda seq, code: lambda: collections.deque(
+                        translate.iter_all_translations(seq, code,
+                                views = True), maxlen = 0)),
+        ('translate.get_longest_peptide',
+                lambda seq, code: lambda: translate.get_longest_peptide(seq,
+                        code)),
+        ('translate.get_longest_peptides',
+                lambda seq, code: lambda: translate.get_longest_peptides(seq,
+                        code)),
+        ('translate.translate_many',
+                lambda seq, code: functools.partial(translate.translate_many,
+                        split_reads(seq), code)),
+        ('translate.longest_peptide_many',
+                lambda seq, code: functools.partial(
+                        translate.longest_peptide_many, split_reads(seq),
+                        code)),
+        ('translate.get_reverse',
+                lambda seq, code: lambda: translate.get_reverse(seq)),
+        ('translate.get_complement',
+                lambda seq, code: lambda: translate.get_complement(seq)),
+        ('translate.reverse_and_complement',
+                lambda seq, code: lambda: translate.reverse_and_complement(
+                        seq)),
+        ('find_orf.vet_nucleotide_sequence',
+                lambda seq, code: lambda: find_orf.vet_nucleotide_sequence(
+                        seq)),
+        ('find_orf.normalize_sequence',
+                lambda seq, code: lambda: find_orf.normalize_sequence(seq)),
+        ('find_orf.find_first_orf',
+                lambda seq, code: lambda: find_orf.find_first_orf(seq)),
+        ('find_orf.find_all_orfs',
+                lambda seq, code: lambda: find_orf.find_all_orfs(seq,
+                        reverse = True)),
+        ('find_orf.find_first_orfs',
+                lambda seq, code: functools.partial(find_orf.find_first_orfs,
+                        split_reads(seq))),
+        ('find_orf.iter_stream_orfs',
+                lambda seq, code: functools.partial(lambda chunks:
+                        collections.deque(find_orf.iter_stream_orfs(chunks),
+                                maxlen = 0), split_chunks(seq))),
+        ('sequence.Sequence',
+                lambda seq, code: lambda: sequence.Sequence(seq)),
+        )
+
+SUITE_SIZES = (1000, 100000, 1000000)
+
+def time_call(call, repeat = 3, min_seconds = 0.05):
+    """
+    Return the best time of one call of `call`, over `repeat` measurements of
+    enough calls (as with `timeit.Timer.autorange`) to take `min_seconds`.
+    """
+    timer = timeit.Timer(call)
+    number = 1
+    while True:
+        seconds = timer.timeit(number)
+        if seconds >= min_seconds:
+            break
+        number *= 2 if seconds <= 0 else max(2, min(10,
+                int(1.2 * min_seconds / seconds) + 1))
+    return min([seconds] + timer.repeat(repeat = repeat - 1,
+            number = number)) / number
+
+def run_suite(sizes = SUITE_SIZES, generators = None, functions = None,
+        repeat = 3, seed = 1):
+    """
+    Time every function of `SUITE` (or those named in `functions`) on a
+    sequence of each length in `sizes` from each generator of `GENERATORS`
+    (or those named in `generators`), and return a list of dicts of the
+    results.
+
+    Each function is timed as the best of `repeat` measurements (see
+    `time_call`), and its peak memory (the most allocated, above what was
+    allocated before the call) is measured in a separate call.
+    """
+    code = translate.compile_genetic_code(STANDARD_GENETIC_CODE)
+    results = []
+    for generator in (generators or GENERATORS):
+        for length in sizes:
+            seq = GENERATORS[generator](length, seed = seed)
+            for name, make_call in SUITE:
+                if functions and (name not in functions):
+                    continue
+                call = make_call(seq, code)
+                seconds = time_call(call, repeat = repeat)
+                results.append(collections.OrderedDict((
+                        ('function', name),
+                        ('generator', generator),
+                        ('length', length),
+                        ('seconds', seconds),
+                        ('bases_per_second', length / seconds),
+                        ('peak_memory', peak_memory(call)),
+                        )))
+                sys.stdout.write("{0:<34} {1:<10} {2:>11,} bases "
+                        "{3:>14,.0f} bases/s {4:>13,} bytes\n".format(name,
+                                generator, length,
+                                results[-1]['bases_per_second'],
+                                results[-1]['peak_memory']))
+    return results
+
+def write_suite_results(path, results, seed = 1):
+    document = collections.OrderedDict((
+            ('created', time.strftime('%Y-%m-%dT%H:%M:%S')),
+            ('python', platform.python_version()),
+            ('platform', platform.platform()),
+            ('numpy', None if translate.numpy is None else
+                    translate.numpy.__version__),
+            ('seed', seed),
+            ('results', results),
+            ))
+    with open(path, 'w') as stream:
+        json.dump(document, stream, indent = 1)
+        stream.write('\n')
+
+def compare_to_baseline(results, baseline_results, threshold = 0.2,
+        min_memory = 1 << 16):
+    """
+    Compare `results` to `baseline_results` (as from `run_suite`), and
+    return a list of the regressions, as (result, message) tuples.
+
+    A result regresses if its throughput is lower than the baseline by more
+    than the fraction `threshold`, or its peak memory is higher than the
+    baseline by more than `threshold` (and by at least `min_memory` bytes,
+    so small allocations do not count).
+    """
+    baseline = {(r['function'], r['generator'], r['length']) : r
+            for r in baseline_results}
+    regressions = []
+    for result in results:
+        old = baseline.get((result['function'], result['generator'],
+                result['length']))
+        if old is None:
+            continue
+        speed = result['bases_per_second'] / old['bases_per_second']
+        if speed < 1.0 - threshold:
+            regressions.append((result,
+                    "{0:.0f}% slower".format(100 * (1.0 - speed))))
+        memory = result['peak_memory'] - old['peak_memory']
+        if (memory > threshold * old['peak_memory']) and (
+                memory >= min_memory):
+            regressions.append((result, "{0:,} more bytes".format(memory)))
+    return regressions
+
+
+BENCHMARKS = {
+        'translate_sequence': bench_translate_sequence,
+        'get_longest_peptide': bench_get_longest_peptide,
+        'get_all_translations': bench_get_all_translations,
+        'iter_all_translations': bench_iter_all_translations,
+        'reverse_and_complement': bench_reverse_and_complement,
+        'find_first_orf_overhead': bench_find_first_orf_overhead,
+        'normalize_sequence': bench_normalize_sequence,
+        'find_orfs_adversarial': bench_find_orfs_adversarial,
+        'start_codon_count': bench_start_codon_count,
+        'batch_jobs': bench_batch_jobs,
+        'longest_peptide_jobs': bench_longest_peptide_jobs,
+        'longest_peptides': bench_longest_peptides,
+        'sequence': bench_sequence,
+        'result_cache': bench_result_cache,
+        'many': bench_many,
+        'server': bench_server,
+        'orf_table': bench_orf_table,
+        }
+
+def main(argv = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+            description = 'Benchmark translate.py and find_orf.py.')
+    parser.add_argument('names',
+            metavar = 'NAME',
+            nargs = '*',
+            help = ('The benchmarks to run (default: all). '
+                    'Choices: {0}.'.format(", ".join(BENCHMARKS))))
+    parser.add_argument('--suite',
+            action = 'store_true',
+            help = ('Run the regression suite instead of the benchmarks: '
+                    'time every public function on seeded sequences.'))
+    parser.add_argument('--sizes',
+            type = int,
+            nargs = '+',
+            default = list(SUITE_SIZES),
+            help = ('The sequence lengths of the suite. '
+                    'Default: {0}.'.format(" ".join(
+                            str(n) for n in SUITE_SIZES))))
+    parser.add_argument('--generators',
+            nargs = '+',
+            choices = list(GENERATORS),
+            default = None,
+            help = 'The sequence generators of the suite. Default: all.')
+    parser.add_argument('--functions',
+            nargs = '+',
+            choices = [name for name, make_call in SUITE],
+            default = None,
+            help = 'The functions timed by the suite. Default: all.')
+    parser.add_argument('--repeat',
+            type = int,
+            default = 3,
+            help = 'Time each function of the suite as the best of this '
+                    'many measurements. Default: 3.')
+    parser.add_argument('--seed',
+            type = int,
+            default = 1,
+            help = 'The seed of the sequence generators. Default: 1.')
+    parser.add_argument('--json',
+            metavar = 'PATH',
+            default = None,
+            help = 'Write the results of the suite to this JSON file.')
+    parser.add_argument('--baseline',
+            metavar = 'PATH',
+            default = None,
+            help = ('Compare the results of the suite to those saved (with '
+                    '\'--json\') in this file, and exit with an error if '
+                    'any regressed.'))
+    parser.add_argument('--threshold',
+            type = float,
+            default = 0.2,
+            help = ('The fraction by which throughput can fall (or peak '
+                    'memory rise) below the baseline before it counts as a '
+                    'regression. Default: 0.2.'))
+    args = parser.parse_args(argv)
+
+    if not args.suite:
+        for name in (args.names or list(BENCHMARKS)):
+            if name not in BENCHMARKS:
+                parser.error('Unknown benchmark: {0!r}'.format(name))
+            BENCHMARKS[name]()
+        return 0
+    if args.names:
+        parser.error('Benchmarks cannot be named with the suite flag')
+    results = run_suite(sizes = args.sizes,
+            generators = args.generators,
+            functions = args.functions,
+            repeat = args.repeat,
+            seed = args.seed)
+    if args.json:
+        write_suite_results(args.json, results, seed = args.seed)
+    if args.baseline:
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+        regressions = compare_to_baseline(results, baseline['results'],
+                threshold = args.threshold)
+        for result, message in regressions:
+            sys.stdout.write("REGRESSION {0} {1} {2:,} bases: {3}\n".format(
+                    result['function'], result['generator'],
+                    result['length'], message))
+        sys.stdout.write("{0} regression(s) against {1}\n".format(
+                len(regressions), args.baseline))
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
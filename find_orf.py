@@ -1,7 +1,32 @@
 #! /usr/bin/env python3
 
+import os
 import sys
 import re
+import functools
+import itertools
+import collections
+import concurrent.futures
+
+import seqio
+import genetic_codes
+import translate
+import result_cache
+import stats
+
+# Strings of zero or more RNA or DNA bases, and an RNA codon, respectively
+_RNA_PATTERN = re.compile(r'[ACGU]*\Z', re.IGNORECASE)
+_DNA_PATTERN = re.compile(r'[ACGT]*\Z', re.IGNORECASE)
+_CODON_PATTERN = re.compile(r'[ACGU]{3}\Z', re.IGNORECASE)
+
+# Maps the bases of RNA and DNA (upper or lower-case) to uppercase RNA, and
+# every other byte to 0
+_NORMALIZE_TABLE = bytearray(256)
+for _base, _rna_base in zip('ACGUTacgut', 'ACGUUACGUU'):
+    _NORMALIZE_TABLE[ord(_base)] = ord(_rna_base)
+_NORMALIZE_TABLE = bytes(_NORMALIZE_TABLE)
+_NORMALIZE_STR_TABLE = dict(enumerate(_NORMALIZE_TABLE[:128]))
+del _base, _rna_base
 
 def vet_nucleotide_sequence(sequence):
     """
@@ -44,35 +69,16 @@ def vet_nucleotide_sequence(sequence):
     >>> vet_nucleotide_sequence('') == None
     True
     """
-    ##########################################################################
-    ############################ EDIT CODE BELOW #############################
-    # `rna_pattern_str` and `dna_pattern_str` need to be regular expressions
-    # that will match any string of zero or more RNA and DNA bases,
-    # respectively (and only strings of zero or more RNA and DNA bases).
-    # Currently, `rna_pattern_str` and `dna_pattern_str` are strings of literal
-    # characters.
-    # These are valid regular expressions, but they will only match their
-    # respective strings exactly.
-    # Change `rna_pattern_str` and `dna_pattern_str` so that they will match
-    # any valid RNA and DNA sequence strings, respectively (and only strings of
-    # RNA and DNA bases).
-    # Read the docstring above for additional clues.
-    rna_pattern_str = r'AUCG'
-    dna_pattern_str = r'ATCG'
-    ##########################################################################
-
-    rna_pattern = re.compile(rna_pattern_str)
-    dna_pattern = re.compile(dna_pattern_str)
-
-    if rna_pattern.match(sequence):
-        return
-    if dna_pattern.match(sequence):
+    started = stats.start()
+    valid = bool(_RNA_PATTERN.match(sequence) or _DNA_PATTERN.match(sequence))
+    if started is not None:
+        stats.stop('vet', started, bytes = len(sequence))
+    if valid:
         return
     else:
         raise Exception("Invalid sequence: {0!r}".format(sequence))
 
 
-
 def vet_codon(codon):
     """
     Return None if `codon` is a valid RNA codon, else raise an exception. 
@@ -110,29 +116,125 @@ def vet_codon(codon):
         ...
     Exception: Invalid codon: 'AUGG'
     """
-    ##########################################################################
-    ############################ EDIT CODE BELOW #############################
-    # `codon_pattern_str` needs to be a regular expression that will match any
-    # codon (but only a string that is one codon).
-    # Currently, `codon_pattern_str` is only a string of literal characters.
-    # This is a valid regular expression, but it will only match 'AUG' exactly.
-    # Change `codon_pattern_str` so that it will match any valid codons, and
-    # only valid codons.
-    # Read the docstring above for additional clues.
-    codon_pattern_str = r'AUG'
-    ##########################################################################
-
-    codon_pattern = re.compile(codon_pattern_str)
-
-    if codon_pattern.match(codon):
+    started = stats.start()
+    valid = bool(_CODON_PATTERN.match(codon))
+    if started is not None:
+        stats.stop('vet', started, bytes = len(codon))
+    if valid:
         return
     else:
         raise Exception("Invalid codon: {0!r}".format(codon))
 
 
+def normalize_sequence(sequence, in_place = False, chunk_size = 1 << 20):
+    """
+    Return `sequence` as uppercase RNA, or raise an exception if it is not a
+    valid RNA or DNA sequence.
+
+    This does the work of `vet_nucleotide_sequence`, `upper` and
+    `replace('T', 'U')` with one translation table, so a `str` or `bytes`
+    sequence is copied once instead of twice, and a `bytearray` can be
+    normalized without a copy.
+
+    Parameters
+    ----------
+    sequence : str, bytes, bytearray or memoryview
+        A DNA or RNA sequence (upper or lower-case)
+    in_place : bool
+        Normalize a `bytearray` (or writable `memoryview`) `sequence` in
+        place, `chunk_size` bases at a time, and return it. It is left
+        unchanged if it is invalid.
+    chunk_size : int
+        The number of bases translated at a time when a `bytearray` or
+        `memoryview` is normalized.
+
+    Returns
+    -------
+    str or bytes
+        A `str` for a `str` `sequence`, otherwise `bytes` (or `sequence`
+        itself if `in_place` is True).
+
+    Examples
+    --------
+    >>> normalize_sequence('acgt')
+    'ACGU'
+    >>> seq = bytearray(b'atgc')
+    >>> normalize_sequence(seq, in_place = True)
+    bytearray(b'AUGC')
+
+    >>> normalize_sequence('AUTGC')
+    Traceback (most recent call last):
+        ...
+    Exception: Invalid sequence: 'AUTGC'
+    """
+    started = stats.start()
+    if isinstance(sequence, str):
+        normalized = _normalize_str(sequence)
+    elif isinstance(sequence, bytes):
+        normalized = _normalize_bytes(sequence)
+    else:
+        normalized = _normalize_buffer(memoryview(sequence), in_place,
+                chunk_size)
+    if started is not None:
+        stats.stop('normalize', started, bytes = len(sequence))
+    if normalized is None:
+        if not isinstance(sequence, str):
+            sequence = bytes(sequence).decode('ascii', 'replace')
+        raise Exception("Invalid sequence: {0!r}".format(sequence))
+    if in_place and not isinstance(sequence, (str, bytes)):
+        return sequence
+    return normalized
+
+
+def _normalize_str(sequence):
+    # Return `sequence` normalized, or None if it is invalid
+    if not sequence.isascii():
+        return None
+    normalized = sequence.translate(_NORMALIZE_STR_TABLE)
+    if '\0' in normalized:
+        return None
+    # Don't allow mixing of DNA and RNA
+    if (('T' in sequence) or ('t' in sequence)) and (
+            ('U' in sequence) or ('u' in sequence)):
+        return None
+    return normalized
+
+
+def _normalize_bytes(sequence):
+    # Return `sequence` normalized, or None if it is invalid
+    normalized = sequence.translate(_NORMALIZE_TABLE)
+    if normalized.find(0) >= 0:
+        return None
+    # Don't allow mixing of DNA and RNA
+    if ((b'T' in sequence) or (b't' in sequence)) and (
+            (b'U' in sequence) or (b'u' in sequence)):
+        return None
+    return normalized
+
+
+def _normalize_buffer(view, in_place, chunk_size):
+    # Normalize a buffer a chunk at a time, into a new buffer or (if
+    # `in_place`) itself, once all of it has been vetted
+    has_t = has_u = False
+    for i in range(0, len(view), chunk_size):
+        chunk = bytes(view[i:i + chunk_size])
+        if chunk.translate(_NORMALIZE_TABLE).find(0) >= 0:
+            return None
+        has_t = has_t or (b'T' in chunk) or (b't' in chunk)
+        has_u = has_u or (b'U' in chunk) or (b'u' in chunk)
+    if has_t and has_u:
+        return None
+    target = view if in_place else bytearray(len(view))
+    for i in range(0, len(view), chunk_size):
+        target[i:i + chunk_size] = bytes(view[i:i + chunk_size]).translate(
+                _NORMALIZE_TABLE)
+    return target if in_place else bytes(target)
+
+
 def find_first_orf(sequence,
         start_codons = ['AUG'],
-        stop_codons = ['UAA', 'UAG', 'UGA']):
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        cache = None):
     """
     Return the first open-reading frame in the DNA or RNA `sequence`.
 
@@ -144,13 +246,20 @@ def find_first_orf(sequence,
     Parameters
     ----------
     sequence : str
-        A string representing a DNA or RNA sequence (upper or lower-case)
+        A string representing a DNA or RNA sequence (upper or lower-case). A
+        `bytes`, `bytearray` or `memoryview` of ASCII bases can be passed
+        instead, such as a window of a `seqio.MappedFasta` record, or a
+        packed `sequence.Sequence`.
     start_codons : list of strings
         All possible start codons. Each codon must be a string of 3 RNA bases,
         upper or lower-case.
     stop_codons : list of strings
         All possible stop codons. Each codon must be a string of 3 RNA bases,
         upper or lower-case.
+    cache : result_cache.ResultCache or None
+        A cache of ORFs, keyed by a hash of `sequence` and the codons. If the
+        ORF of the sequence is in the cache it is returned without
+        searching, and otherwise it is added to the cache.
 
     Returns
     -------
@@ -176,54 +285,781 @@ def find_first_orf(sequence,
     When there is are bases before and after ORF:
     >>> find_first_orf('CCAUGGUAUAACC', ['AUG'], ['UAA'])
     'AUGGUAUAA'
+
+    The codons are only vetted the first time they are used, and the search
+    takes linear time; see `OrfFinder`.
     """
-    # Make sure the sequence is valid
-    vet_nucleotide_sequence(sequence)
+    finder = _get_orf_finder(tuple(start_codons), tuple(stop_codons))
+    if cache is None:
+        return finder.find_first_orf(sequence)
+    return _find_first_orf_cached(finder, sequence, cache)
 
-    # Make sure the codons are valid
-    for codon in start_codons:
-        vet_codon(codon)
-    for codon in stop_codons:
+
+def locate_first_orf(sequence,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA']):
+    """
+    Return the first open-reading frame in the DNA or RNA `sequence` as an
+    `Orf`, with its frame and coordinates, or None if there is none.
+
+    The ORF is the one returned by `find_first_orf`, which takes the same
+    arguments.
+
+    Examples
+    --------
+    >>> locate_first_orf('CCAUGGUAUAACC')
+    Orf(sequence='AUGGUAUAA', strand='+', frame=2, start=2, end=11)
+    >>> locate_first_orf('CCAUGG') is None
+    True
+    """
+    finder = _get_orf_finder(tuple(start_codons), tuple(stop_codons))
+    return finder.locate_first_orf(sequence)
+
+
+def _find_first_orf_cached(finder, sequence, cache):
+    key = _make_cache_key(sequence, finder.start_codons, finder.stop_codons)
+    orf = cache.get(key)
+    if orf is None:
+        orf = finder.find_first_orf(sequence)
+        cache.put(key, orf)
+    return orf
+
+
+def _make_cache_key(sequence, start_codons, stop_codons):
+    # Key the first ORF of `sequence` for a `result_cache.ResultCache`; a
+    # `sequence.Sequence` is hashed as the RNA it is searched as
+    if hasattr(sequence, 'codon_indices'):
+        sequence = sequence.encode('RNA')
+    return result_cache.make_key('find_first_orf', sequence, start_codons,
+            stop_codons)
+
+
+def _normalize_codons(codons):
+    # Vet the codons, and return them as a sorted tuple of unique uppercase
+    # codons
+    for codon in codons:
         vet_codon(codon)
+    return tuple(sorted(set(c.upper() for c in codons)))
 
-    # Get copies of everything in uppercase
-    seq = sequence.upper()
-    starts = [c.upper() for c in start_codons]
-    stops = [c.upper() for c in stop_codons]
-    # Make sure seq is RNA
-    seq = seq.replace('T', 'U')
-
-    ##########################################################################
-    ############################ EDIT CODE BELOW #############################
-    # `orf_pattern_str` needs to be a regular expression that will match an
-    # open reading frame within a string of RNA bases. At this point we know
-    # the string only contains uppercase A, C, G, and U.
-    # I recommend starting by hardcoding the standard start and stop codons
-    # (the ones listed as defaults for this function) into the regular
-    # expression. After you get that working, then try generalizing it to work
-    # for any start/stop codons.
-    # Currently, `orf_pattern_str` is only a string of literal characters. This
-    # is a valid regular expression, but it will only match 'AUGGUAUAA'
-    # exactly. Change `orf_pattern_str` so that it will match any open reading
-    # frame.
-    # Read the docstring above for additional clues.
-    orf_pattern_str = r'AUGGUAUAA'
-    ##########################################################################
-
-    # Create the regular expression object
-    orf_pattern = re.compile(orf_pattern_str)
-    # Search the sequence
-    match_object = orf_pattern.search(seq)
-    if match_object:
-        return match_object.group()
-    return ''
 
+@functools.lru_cache(maxsize = 128)
+def _get_orf_finder(start_codons, stop_codons):
+    return OrfFinder(start_codons, stop_codons)
 
-def parse_sequence_from_path(path):
+
+Orf = collections.namedtuple('Orf',
+        ['sequence', 'strand', 'frame', 'start', 'end'])
+Orf.__doc__ = """
+An open-reading frame found by `find_all_orfs`.
+
+`sequence` is the uppercase RNA of the ORF (from its start codon through its
+stop codon) read on its `strand` ('+' for the sequence as given, '-' for its
+reverse complement), and `frame` (0, 1 or 2) is the reading frame of that
+strand. `start` and `end` are 0-based, end-exclusive coordinates of the ORF
+on the '+' strand, for both strands.
+"""
+
+
+def _make_codon_class_table(codons):
+    # Return a `bytes.translate` table that maps the codon index (see
+    # `translate.codon_indices`) of each of `codons` to 1 and every other
+    # byte (including the other 64 - len(codons) codon indices and invalid
+    # codons) to 0
+    table = bytearray(256)
+    for codon in codons:
+        table[translate.codon_indices(codon)[0]] = 1
+    return bytes(table)
+
+
+def _find_all(classes):
+    # Return the positions of the 1s in a classified frame
+    positions = []
+    position = classes.find(1)
+    while position >= 0:
+        positions.append(position)
+        position = classes.find(1, position + 1)
+    return positions
+
+
+def _vet_for_search(sequence):
+    # Return `sequence` vetted and ready to be searched: a `str` or `bytes`
+    # copy of it as uppercase RNA, or a `sequence.Sequence` (or view of one)
+    # as is, since it was vetted when it was created and its codon indices
+    # are read from its packed bases
+    if hasattr(sequence, 'codon_indices'):
+        return sequence
+    return normalize_sequence(sequence)
+
+
+def _get_rna(sequence, start, end):
+    # Return bases [start, end) of a sequence returned by `_vet_for_search`
+    # as an uppercase RNA `str`
+    bases = sequence[start:end]
+    if isinstance(bases, str):
+        return bases
+    return bytes(bases).translate(_NORMALIZE_TABLE).decode('ascii')
+
+
+class OrfFinder(object):
+    """
+    Find open-reading frames with a fixed set of start and stop codons.
+
+    The codons are vetted, and compiled into a pair of 64-slot codon class
+    tables (one for start and one for stop codons, indexed by the codon
+    indices of `translate.codon_indices`), once when the finder is created,
+    so searching many sequences with the same finder only pays for vetting
+    and searching each sequence. `find_first_orf` keeps a cache of finders
+    keyed by its codons.
+
+    Each reading frame is searched in a single linear pass over its codon
+    indices: a `bytes.translate` through each class table marks every start
+    or stop codon, whichever of the 64 codons are configured, so the cost
+    per base does not grow with the number of codons. The marked positions
+    are then paired. Unlike a regular expression with a lazy repeat, which
+    rescans the rest of the sequence from every start codon that has no
+    in-frame stop codon, this takes linear time for any sequence.
+
+    Parameters
+    ----------
+    start_codons : list of strings
+        All possible start codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    stop_codons : list of strings
+        All possible stop codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+
+    Examples
+    --------
+    >>> finder = OrfFinder(['AUG'], ['UAA', 'uag'])
+    >>> finder.find_first_orf('CCAUGGUAUAGCC')
+    'AUGGUAUAG'
+    """
+
+    def __init__(self,
+            start_codons = ['AUG'],
+            stop_codons = ['UAA', 'UAG', 'UGA']):
+        self.start_codons = _normalize_codons(start_codons)
+        self.stop_codons = _normalize_codons(stop_codons)
+        self._start_table = _make_codon_class_table(self.start_codons)
+        self._stop_table = _make_codon_class_table(self.stop_codons)
+
+    def _scan_frame(self, indices, nested = True):
+        # Generate the (start, stop) codon offsets of the ORFs of a frame
+        start_classes = indices.translate(self._start_table)
+        stops = _find_all(indices.translate(self._stop_table))
+        if not nested:
+            # Only the first start codon after each stop codon is needed, so
+            # the loop runs once per stop codon, however many codons start
+            # ORFs
+            previous_stop = 0
+            for stop in stops:
+                start = start_classes.find(1, previous_stop, stop)
+                if start >= 0:
+                    yield start, stop
+                previous_stop = stop
+            return
+        i = 0
+        for start in _find_all(start_classes):
+            while (i < len(stops)) and (stops[i] <= start):
+                i += 1
+            if i == len(stops):
+                return
+            yield start, stops[i]
+
+    def _first_in_frame(self, indices):
+        # Return the codon offsets of the first ORF of a frame, or None
+        start = indices.translate(self._start_table).find(1)
+        if start < 0:
+            return None
+        stop = indices[start + 1:].translate(self._stop_table).find(1)
+        if stop < 0:
+            return None
+        return start, start + 1 + stop
+
+    def find_first_orf(self, sequence):
+        """
+        Return the first open-reading frame in the DNA or RNA `sequence`.
+
+        See `find_orf.find_first_orf`.
+        """
+        orf = self.locate_first_orf(sequence)
+        return '' if orf is None else orf.sequence
+
+    def locate_first_orf(self, sequence):
+        """
+        Return the first open-reading frame in the DNA or RNA `sequence` as
+        an `Orf`, or None if there is none.
+
+        See `find_orf.locate_first_orf`.
+        """
+        seq = _vet_for_search(sequence)
+        started = stats.start()
+
+        # The first ORF is the one with the first start codon (of any frame)
+        # that is followed by an in-frame stop codon
+        first = None
+        codons = 0
+        for frame in range(3):
+            indices = translate.codon_indices(seq, frame)
+            codons += len(indices)
+            orf = self._first_in_frame(indices)
+            if orf is not None:
+                start = frame + (3 * orf[0])
+                end = frame + (3 * (orf[1] + 1))
+                if (first is None) or (start < first[1]):
+                    first = (frame, start, end)
+        orf = None
+        if first is not None:
+            frame, start, end = first
+            orf = Orf(_get_rna(seq, start, end), '+', frame, start, end)
+        if started is not None:
+            stats.stop('search', started, bytes = len(seq), codons = codons,
+                    orfs = 0 if orf is None else 1)
+        return orf
+
+    def find_all_orfs(self, sequence, reverse = False, nested = True):
+        """
+        Return every open-reading frame in the DNA or RNA `sequence`.
+
+        See `find_orf.find_all_orfs`.
+        """
+        seq = _vet_for_search(sequence)
+        started = stats.start()
+        codons = 0
+        strands = [('+', seq)]
+        if reverse:
+            strands.append(('-', translate.reverse_and_complement(seq,
+                    alphabet = 'RNA')))
+        orfs = []
+        for strand, strand_seq in strands:
+            strand_orfs = []
+            for frame in range(3):
+                indices = translate.codon_indices(strand_seq, frame)
+                codons += len(indices)
+                for start, stop in self._scan_frame(indices, nested):
+                    start = frame + (3 * start)
+                    end = frame + (3 * (stop + 1))
+                    orf_seq = _get_rna(strand_seq, start, end)
+                    if strand == '-':
+                        start, end = len(seq) - end, len(seq) - start
+                    strand_orfs.append(Orf(orf_seq, strand, frame, start,
+                            end))
+            strand_orfs.sort(key = lambda orf: (
+                    orf.start if orf.strand == '+' else -orf.end))
+            orfs.extend(strand_orfs)
+        if started is not None:
+            stats.stop('search', started, bytes = len(seq) * len(strands),
+                    codons = codons, orfs = len(orfs))
+        return orfs
+
+
+def find_all_orfs(sequence,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        reverse = False,
+        nested = True):
+    """
+    Return every open-reading frame in the DNA or RNA `sequence`.
+
+    All three reading frames of `sequence` (and, if `reverse` is True, of its
+    reverse complement) are scanned in a single linear pass per frame, so
+    the search takes linear time even for sequences with many start codons
+    and no stop codons.
+
+    Parameters
+    ----------
+    sequence : str
+        A string representing a DNA or RNA sequence (upper or lower-case). A
+        `bytes`, `bytearray` or `memoryview` of ASCII bases, or a packed
+        `sequence.Sequence`, can be passed instead.
+    start_codons : list of strings
+        All possible start codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    stop_codons : list of strings
+        All possible stop codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    reverse : bool
+        Also search the reverse complement of `sequence`.
+    nested : bool
+        If True, every start codon begins an ORF, so an ORF can contain
+        other (nested) ORFs that end at the same stop codon. If False, only
+        the longest of these is returned.
+
+    Returns
+    -------
+    list of Orf
+        The ORFs of the '+' strand ordered by start, followed by those of the
+        '-' strand ordered by start along that strand.
+
+    Examples
+    --------
+    >>> for orf in find_all_orfs('AUGAUGUAACCUUACAU', reverse = True):
+    ...     print(orf)
+    Orf(sequence='AUGAUGUAA', strand='+', frame=0, start=0, end=9)
+    Orf(sequence='AUGUAA', strand='+', frame=0, start=3, end=9)
+    Orf(sequence='AUGUAA', strand='-', frame=0, start=11, end=17)
+    """
+    finder = _get_orf_finder(tuple(start_codons), tuple(stop_codons))
+    return finder.find_all_orfs(sequence, reverse = reverse, nested = nested)
+
+
+class OrfStreamScanner(object):
+    """
+    Find the open-reading frames of a sequence that is read in chunks.
+
+    Each chunk passed to `feed` is vetted and normalized (see
+    `normalize_sequence`), and the new codons of each reading frame are
+    scanned as by `OrfFinder.find_all_orfs`. The start codons that have not
+    yet been followed by an in-frame stop codon are carried from one chunk
+    to the next, and every ORF is returned by the `feed` call that reads its
+    stop codon. Only the bases from the first of these open start codons
+    onward are kept, so memory is bounded by the longest open ORF, not by
+    the length of the sequence.
+
+    Only the given strand is searched, as its reverse complement cannot be
+    read until the whole sequence has been.
+
+    Parameters
+    ----------
+    start_codons : list of strings
+        All possible start codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    stop_codons : list of strings
+        All possible stop codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    nested : bool
+        If False, only the longest of the ORFs that end at the same stop
+        codon is returned; see `find_all_orfs`.
+
+    Examples
+    --------
+    >>> scanner = OrfStreamScanner()
+    >>> scanner.feed('CCAUGAU')
+    []
+    >>> for orf in scanner.feed('GUAAAUGC'):
+    ...     print(orf)
+    Orf(sequence='AUGAUGUAA', strand='+', frame=2, start=2, end=11)
+    Orf(sequence='AUGUAA', strand='+', frame=2, start=5, end=11)
+    """
+
+    def __init__(self,
+            start_codons = ['AUG'],
+            stop_codons = ['UAA', 'UAG', 'UGA'],
+            nested = True):
+        self._finder = _get_orf_finder(tuple(start_codons),
+                tuple(stop_codons))
+        self.nested = nested
+        # The normalized bases still needed, from position `_offset` of the
+        # sequence
+        self._buffer = bytearray()
+        self._offset = 0
+        self._length = 0
+        # The position of the next codon to scan, and the open start codons,
+        # of each frame
+        self._next_codons = [0, 1, 2]
+        self._open_starts = [[], [], []]
+        self._has_t = False
+        self._has_u = False
+
+    @property
+    def length(self):
+        """The number of bases read so far."""
+        return self._length
+
+    @property
+    def first_open_start(self):
+        """
+        The position of the first start codon not yet followed by an in-frame
+        stop codon, or None.
+        """
+        starts = [s[0] for s in self._open_starts if s]
+        return min(starts) if starts else None
+
+    def feed(self, chunk):
+        """
+        Read the next `chunk` (a DNA or RNA `str`, or bytes-like object) of
+        the sequence, and return a list of the ORFs whose stop codons are in
+        it, ordered by start.
+        """
+        normalized = normalize_sequence(chunk)
+        started = stats.start()
+        scanned = sum(self._next_codons)
+        if isinstance(normalized, str):
+            normalized = normalized.encode('ascii')
+            chunk = chunk.encode('ascii')
+        else:
+            chunk = bytes(chunk)
+        # Don't allow mixing of DNA and RNA, across chunks either
+        self._has_t = self._has_t or (b'T' in chunk) or (b't' in chunk)
+        self._has_u = self._has_u or (b'U' in chunk) or (b'u' in chunk)
+        if self._has_t and self._has_u:
+            raise Exception("Invalid sequence: it has both T and U bases")
+        self._buffer += normalized
+        self._length += len(normalized)
+        orfs = []
+        for frame in range(3):
+            orfs.extend(self._scan_frame(frame))
+        orfs.sort(key = lambda orf: orf.start)
+        # Drop the bases that no ORF can include any more
+        keep = min(self._next_codons)
+        first_open_start = self.first_open_start
+        if first_open_start is not None:
+            keep = min(keep, first_open_start)
+        del self._buffer[:keep - self._offset]
+        self._offset = keep
+        if started is not None:
+            stats.stop('search', started, bytes = len(normalized),
+                    codons = (sum(self._next_codons) - scanned) // 3,
+                    orfs = len(orfs))
+        return orfs
+
+    def _scan_frame(self, frame):
+        begin = self._next_codons[frame]
+        n = (self._length - begin) // 3
+        if n <= 0:
+            return []
+        with memoryview(self._buffer) as view:
+            i = begin - self._offset
+            indices = translate.codon_indices(view[i:i + (3 * n)])
+        starts = _find_all(indices.translate(self._finder._start_table))
+        stops = _find_all(indices.translate(self._finder._stop_table))
+        open_starts = self._open_starts[frame]
+        orfs = []
+        i = 0
+        for stop in stops + [n]:
+            while (i < len(starts)) and (starts[i] < stop):
+                if self.nested or (not open_starts):
+                    open_starts.append(begin + (3 * starts[i]))
+                i += 1
+            if stop == n:
+                break
+            end = begin + (3 * (stop + 1))
+            for start in open_starts:
+                orfs.append(Orf(self._buffer[start - self._offset:
+                        end - self._offset].decode('ascii'), '+', frame,
+                        start, end))
+            del open_starts[:]
+        self._next_codons[frame] = begin + (3 * n)
+        return orfs
+
+
+def iter_stream_orfs(chunks,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        nested = True):
+    """
+    Generate the ORFs of the sequence read as `chunks` (e.g., from
+    `seqio.iter_sequence_chunks`), each as soon as its stop codon is read.
+
+    The ORFs are those of `find_all_orfs` (without the reverse strand), but
+    they are ordered by end rather than start; see `OrfStreamScanner`.
+    """
+    scanner = OrfStreamScanner(start_codons, stop_codons, nested = nested)
+    for chunk in chunks:
+        for orf in scanner.feed(chunk):
+            yield orf
+
+
+def find_first_orf_in_stream(chunks,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA']):
+    """
+    Return the first open-reading frame of the sequence read as `chunks`.
+
+    This is the ORF returned by `find_first_orf` for the whole sequence, but
+    it is returned as soon as it is known: once it has been read and no
+    start codon before it is still open. The rest of `chunks` is not read
+    (or vetted).
+
+    Examples
+    --------
+    >>> find_first_orf_in_stream(['CCAUG', 'GUAUAG', 'CCXX'])
+    'AUGGUAUAG'
+    """
+    orf = locate_first_orf_in_stream(chunks,
+            start_codons = start_codons,
+            stop_codons = stop_codons)
+    return '' if orf is None else orf.sequence
+
+
+def locate_first_orf_in_stream(chunks,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA']):
+    """
+    Return the first open-reading frame of the sequence read as `chunks` as
+    an `Orf`, or None if there is none; see `find_first_orf_in_stream`.
+    """
+    scanner = OrfStreamScanner(start_codons, stop_codons, nested = False)
+    first = None
+    for chunk in chunks:
+        for orf in scanner.feed(chunk):
+            if (first is None) or (orf.start < first.start):
+                first = orf
+        if first is not None:
+            first_open_start = scanner.first_open_start
+            if (first_open_start is None) or (first_open_start > first.start):
+                return first
+    return first
+
+
+def find_first_orf_in_record(record,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        window_bases = 1 << 20):
+    """
+    Return the first open-reading frame of `record`, a record of a
+    `seqio.MappedFasta`.
+
+    The record is searched as by `find_first_orf_in_stream`, a window of
+    `window_bases` bases at a time (see `seqio.MappedRecord.view`), so
+    memory use is bounded by the window and the longest open ORF rather
+    than by the length of the record.
+    """
+    orf = locate_first_orf_in_record(record,
+            start_codons = start_codons,
+            stop_codons = stop_codons,
+            window_bases = window_bases)
+    return '' if orf is None else orf.sequence
+
+
+def locate_first_orf_in_record(record,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        window_bases = 1 << 20):
+    """
+    Return the first open-reading frame of `record` (a record of a
+    `seqio.MappedFasta`) as an `Orf`, or None if there is none; see
+    `find_first_orf_in_record`.
+    """
+    windows = _iter_record_windows(record, window_bases)
+    try:
+        return locate_first_orf_in_stream(windows,
+                start_codons = start_codons,
+                stop_codons = stop_codons)
+    finally:
+        # Drop the last view of the mapped file, so the file can be closed
+        windows.close()
+
+
+def _iter_record_windows(record, window_bases):
+    # Generate consecutive windows of `record`. The stream scanner carries
+    # open ORFs from one window to the next, so the windows do not overlap
+    for start in range(0, len(record), window_bases):
+        yield record.view(start, start + window_bases)
+
+
+def _find_first_orfs_in_batch(sequences, start_codons, stop_codons,
+        collect_stats = False, caller_pid = None):
+    # Run in a worker by `iter_first_orfs`, so it must be picklable. Return
+    # the ORFs, and (if `collect_stats`) the stats of a worker process, to
+    # be merged into those of the caller. A worker thread of the caller's
+    # process (`caller_pid`) records to the caller's collector, which must
+    # be left in place
+    finder = _get_orf_finder(start_codons, stop_codons)
+    if os.getpid() == caller_pid:
+        return [finder.find_first_orf(sequence) for sequence in sequences
+                ], None
+    collector = stats.enable() if collect_stats else stats.disable()
+    orfs = [finder.find_first_orf(sequence) for sequence in sequences]
+    if not collect_stats:
+        return orfs, None
+    stats.disable()
+    return orfs, collector.as_dict()
+
+
+def _iter_batches(records, batch_bases):
+    # Group `records` into lists holding about `batch_bases` bases each, so
+    # that many small records share one round trip to a worker process
+    batch = []
+    bases = 0
+    for record in records:
+        batch.append(record)
+        bases += len(record.sequence)
+        if bases >= batch_bases:
+            yield batch
+            batch = []
+            bases = 0
+    if batch:
+        yield batch
+
+
+def _look_up_batch(batch, start_codons, stop_codons, cache):
+    # Return the cached ORFs of the records of `batch` (None for those to
+    # search), and the indices of the records to search grouped by their
+    # cache key, so a sequence repeated within the batch is searched once
+    orfs = [None] * len(batch)
+    if cache is None:
+        return orfs, collections.OrderedDict((i, [i])
+                for i in range(len(batch)))
+    missing = collections.OrderedDict()
+    for i, record in enumerate(batch):
+        key = _make_cache_key(record.sequence, start_codons, stop_codons)
+        orfs[i] = cache.get(key)
+        if orfs[i] is None:
+            missing.setdefault(key, []).append(i)
+    return orfs, missing
+
+
+def _search_batch(batch, missing, start_codons, stop_codons, executor):
+    # Return the future of the ORFs of the records to search (None if there
+    # are none)
+    if not missing:
+        return None
+    return executor.submit(_find_first_orfs_in_batch,
+            [batch[indices[0]].sequence for indices in missing.values()],
+            start_codons, stop_codons, stats.collector is not None,
+            os.getpid())
+
+
+def _fill_batch(orfs, missing, future, cache):
+    # Put the ORFs searched for (by `_search_batch`) into `orfs` (and the
+    # cache)
+    if future is None:
+        return orfs
+    found, worker_stats = future.result()
+    if (worker_stats is not None) and (stats.collector is not None):
+        stats.collector.merge(worker_stats)
+    for (key, indices), orf in zip(missing.items(), found):
+        for i in indices:
+            orfs[i] = orf
+        if cache is not None:
+            cache.put(key, orf)
+    return orfs
+
+
+def iter_first_orfs(records,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        jobs = 1,
+        batch_bases = 1 << 20,
+        cache = None,
+        executor = None):
+    """
+    Generate the first open-reading frame of every record in `records`.
+
+    With more than one job, the records are grouped into batches of about
+    `batch_bases` bases, and the batches are searched by a
+    `concurrent.futures.ProcessPoolExecutor`. Only a few batches per job are
+    in flight at once, so `records` can be a stream of any length (e.g.,
+    from `seqio.iter_records`), and the results are generated in the order
+    of `records` however many jobs are used.
+
+    Parameters
+    ----------
+    records : iterable of seqio.Record
+        The records to search.
+    start_codons : list of strings
+        All possible start codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    stop_codons : list of strings
+        All possible stop codons. Each codon must be a string of 3 RNA bases,
+        upper or lower-case.
+    jobs : int or None
+        The number of processes to search with. If None, the number of CPUs
+        is used. With 1 job, the records are searched in this process.
+    batch_bases : int
+        The number of bases to send to a process at a time.
+    cache : result_cache.ResultCache or None
+        A cache of ORFs (see `find_first_orf`). It is used in this process,
+        so only the records missing from the cache are sent to be searched.
+        (With more than one job, a batch is looked up before the results of
+        the batches in flight are cached, and a sequence repeated within a
+        batch is only searched once.)
+    executor : concurrent.futures.Executor or None
+        An executor to search the batches with (e.g., a process pool kept
+        open between calls), used instead of a new process pool of `jobs`
+        processes, and not shut down. `jobs` still sets the number of
+        batches in flight.
+
+    Returns
+    -------
+    generator of (seqio.Record, str) tuples
+        Each record with its first ORF (see `find_first_orf`).
+    """
+    start_codons = _normalize_codons(start_codons)
+    stop_codons = _normalize_codons(stop_codons)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if (jobs == 1) and (executor is None):
+        finder = _get_orf_finder(start_codons, stop_codons)
+        for record in records:
+            if cache is None:
+                yield record, finder.find_first_orf(record.sequence)
+            else:
+                yield record, _find_first_orf_cached(finder,
+                        record.sequence, cache)
+        return
+    batches = _iter_batches(records, batch_bases)
+    if executor is not None:
+        for record_orf in _search_batches(batches, start_codons,
+                stop_codons, cache, executor, 2 * jobs):
+            yield record_orf
+        return
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        for record_orf in _search_batches(batches, start_codons,
+                stop_codons, cache, executor, 2 * jobs):
+            yield record_orf
+
+
+def _search_batches(batches, start_codons, stop_codons, cache, executor,
+        max_pending):
+    # Generate (record, ORF) for the records of `batches`, in order, with up
+    # to `max_pending` batches searched by `executor` at a time
+    pending = collections.deque()
+    for batch in batches:
+        orfs, missing = _look_up_batch(batch, start_codons, stop_codons,
+                cache)
+        pending.append((batch, orfs, missing, _search_batch(batch,
+                missing, start_codons, stop_codons, executor)))
+        if len(pending) >= max_pending:
+            batch, orfs, missing, future = pending.popleft()
+            for record_orf in zip(batch, _fill_batch(orfs, missing,
+                    future, cache)):
+                yield record_orf
+    while pending:
+        batch, orfs, missing, future = pending.popleft()
+        for record_orf in zip(batch, _fill_batch(orfs, missing, future,
+                cache)):
+            yield record_orf
+
+
+def find_first_orfs(sequences,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        jobs = 1,
+        batch_bases = 1 << 20,
+        cache = None,
+        executor = None):
+    """
+    Return a list of the first open-reading frame of each of `sequences`.
+
+    See `find_first_orf` and, for `jobs`, `batch_bases`, `cache` and
+    `executor`, `iter_first_orfs`.
+
+    Examples
+    --------
+    >>> find_first_orfs(['CCAUGUAA', 'AUGCCC', 'ATGTGA'])
+    ['AUGUAA', '', 'AUGUGA']
+    """
+    records = (seqio.Record(None, s) for s in sequences)
+    return [orf for record, orf in iter_first_orfs(records,
+            start_codons = start_codons,
+            stop_codons = stop_codons,
+            jobs = jobs,
+            batch_bases = batch_bases,
+            cache = cache,
+            executor = executor)]
+
+
+def open_sequence_path(path):
+    """
+    Open `path` with `seqio.open_sequence_file`, explaining any failure on
+    standard error.
+    """
     # Try to open the path to read from it, and handle exceptions if they
     # arrise
     try:
-        file_stream = open(path, 'r')
+        return seqio.open_sequence_file(path)
     except FileNotFoundError as e:
         sys.stderr.write("Sorry, couldn't find path {}".format(path))
         raise e
@@ -235,14 +1071,85 @@ def parse_sequence_from_path(path):
         sys.stderr.write("Sorry, something went wrong when trying to open {}".format(
                 path))
         raise
-    # If we've reached here, the file is open and ready to read
-    sequence = ''
-    # A for loop to visit each line in the file
-    for line in file_stream:
-        # Strip whitespace from the line and concatenate it to the end of the
-        # sequence
-        sequence += line.strip()
-    return sequence
+
+
+def parse_records_from_path(path):
+    """
+    Generate every record of the plain, FASTA or FASTQ (optionally gzipped)
+    file at `path` as a `seqio.Record`; see `seqio.iter_records`.
+    """
+    with open_sequence_path(path) as stream:
+        for record in stats.iter_timed('parse', seqio.iter_records(stream),
+                _count_record):
+            yield record
+
+
+def _count_record(record):
+    return {'bytes' : len(record.sequence), 'records' : 1}
+
+
+def _count_chunk(chunk):
+    return {'bytes' : len(chunk)}
+
+
+def parse_sequence_from_path(path):
+    """
+    Return the first sequence in the file at `path` (the whole file if it
+    is a file of bare sequence lines), or an empty string if it has none.
+    """
+    for record in parse_records_from_path(path):
+        return record.sequence
+    return ''
+
+
+def write_columnar_orfs(path, records,
+        start_codons = ['AUG'],
+        stop_codons = ['UAA', 'UAG', 'UGA'],
+        genetic_code = genetic_codes.STANDARD,
+        format = 'auto',
+        stream = False):
+    """
+    Write the first ORF of each of `records` (`seqio.Record`s, or `(header,
+    sequence)` pairs) and its peptide to a columnar table at `path`; see
+    `orf_table.OrfTableWriter`. The peptide is the translation (with
+    `genetic_code`) of the codons of the ORF before its stop codon, so it
+    ends where the ORF does whatever the `stop_codons`; a codon that is a
+    stop codon of `genetic_code` but not one of `stop_codons` is translated
+    as '*'. If `stream`
+    is True, the sequence of each record is an iterable of chunks, searched
+    as by `find_first_orf_in_stream`. A sequence that is a
+    `seqio.MappedRecord` is searched as by `find_first_orf_in_record`.
+
+    Return the number of ORFs written.
+    """
+    import orf_table
+
+    finder = _get_orf_finder(tuple(start_codons), tuple(stop_codons))
+    code = translate.compile_genetic_code(genetic_code)
+    with orf_table.OrfTableWriter(path, format = format) as writer:
+        for header, sequence in records:
+            if isinstance(sequence, seqio.MappedRecord):
+                orf = locate_first_orf_in_record(sequence,
+                        start_codons = start_codons,
+                        stop_codons = stop_codons)
+            elif stream:
+                orf = locate_first_orf_in_stream(sequence,
+                        start_codons = start_codons,
+                        stop_codons = stop_codons)
+            else:
+                orf = finder.locate_first_orf(sequence)
+            if orf is not None:
+                writer.write(header, orf, code.translate(orf.sequence[:-3]))
+    return writer.num_rows
+
+
+def _iter_mapped_records(paths):
+    # Generate (header, record) for the records of the FASTA files at
+    # `paths`, mapping one file at a time
+    for path in paths:
+        with seqio.MappedFasta(path) as fasta:
+            for record in fasta:
+                yield record.header, record
 
 
 def main():
@@ -258,14 +1165,60 @@ def main():
     parser.add_argument('sequence',
             metavar = 'SEQUENCE',
             type = str,
+            nargs = '+',
             help = ('The sequence to search for an open-reading frame. '
                     'If the path flag (\'-p\'/\'--path\') is specified, '
                     'then this should be a path to a file containing the '
-                    'sequence to be searched.'))
+                    'sequence to be searched. More than one sequence (or '
+                    'path) can be given.'))
     parser.add_argument('-p', '--path',
             action = 'store_true',
             help = ('The sequence argument should be treated as a path to a '
-                    'containing the sequence to be searched.'))
+                    'file containing the sequence to be searched. The file '
+                    'can be a plain, FASTA or FASTQ file, optionally '
+                    'gzipped, and the first ORF of every record is '
+                    'reported.'))
+    parser.add_argument('-r', '--region',
+            type = str,
+            action = 'append', # append each argument to a list
+            default = None,
+            help = ('Only search this region of the FASTA file given with '
+                    'the path flag (\'-p\'/\'--path\'), as '
+                    '\'name\', \'name:start\' or \'name:start-end\' '
+                    '(1-based and inclusive). The file is indexed (in a '
+                    '\'.fai\' file next to it) so that only the region is '
+                    'read. This option can be used multiple times.'))
+    parser.add_argument('--stream',
+            action = 'store_true',
+            help = ('Read the sequence from the path given as the sequence '
+                    'argument (or from standard input if it is \'-\') in '
+                    'chunks, and report its first ORF as soon as it is '
+                    'found. The input must be a single bare sequence; line '
+                    'breaks are ignored. Memory use is bounded by the '
+                    'longest open ORF rather than the length of the '
+                    'sequence.'))
+    parser.add_argument('--mapped',
+            action = 'store_true',
+            help = ('Map the uncompressed FASTA files given with the path '
+                    'flag (\'-p\'/\'--path\') into memory, and search each '
+                    'record a window of bases at a time, so that memory use '
+                    'is bounded by the window and the longest open ORF '
+                    'rather than by the length of the records.'))
+    parser.add_argument('-j', '--jobs',
+            type = int,
+            default = 1,
+            help = ('The number of processes to search with. Records are '
+                    'sent to the processes in batches, and the output is in '
+                    'the same order as with one process. Use 0 for the '
+                    'number of CPUs. Default: 1.'))
+    parser.add_argument('--cache',
+            type = str,
+            default = None,
+            metavar = 'PATH',
+            help = ('Cache the ORF of every sequence in an sqlite database '
+                    'at this path (created if it does not exist), so that '
+                    'sequences seen before, in this run or a previous '
+                    'one, are not searched again.'))
     parser.add_argument('-s', '--start-codon',
             type = str,
             action = 'append', # append each argument to a list
@@ -280,28 +1233,154 @@ def main():
             help = ('A stop codon. This option can be used multiple times '
                     'if there are multiple stop codons. '
                     'Default: {0}.'.format(" ".join(default_stop_codons))))
+    parser.add_argument('-t', '--table',
+            type = int,
+            choices = genetic_codes.get_table_ids(),
+            default = None,
+            metavar = 'ID',
+            help = ('The ID of the NCBI genetic code (translation table) '
+                    'whose start and stop codons are used by default, '
+                    'instead of the defaults above. Codons given with the '
+                    'start and stop codon options take precedence.'))
+    parser.add_argument('--columnar',
+            type = str,
+            default = None,
+            metavar = 'PATH',
+            help = ('Write the first ORF of every record to this path as a '
+                    'columnar table (see orf_table.py) rather than as text '
+                    'to standard output: the record header, strand, frame, '
+                    'start, end and length of the ORF, and its peptide. '
+                    'Records without an ORF have no row.'))
+    parser.add_argument('--columnar-format',
+            choices = ('auto', 'arrow', 'orfcol'),
+            default = 'auto',
+            help = ('The format of the columnar table: Arrow IPC (which '
+                    'requires pyarrow), or the simple \'orfcol\' format. '
+                    'Default: \'auto\', for Arrow if pyarrow is installed.'))
+    parser.add_argument('--stats',
+            nargs = '?',
+            const = 'text',
+            default = None,
+            choices = ('text', 'json'),
+            help = ('Report the calls, time and counters (bytes, records, '
+                    'codons, ORFs, cache hits and misses) of each stage of '
+                    'the run (parsing, vetting, normalizing, searching and '
+                    'caching) to standard error when it ends, as a text '
+                    'table (the default) or as JSON.'))
 
     # Parse the command-line arguments into a 'dict'-like container
     args = parser.parse_args()
+    if args.stats:
+        collector = stats.enable()
+
+    if args.mapped:
+        if (not args.path) or args.region or args.stream:
+            parser.error('The mapped flag requires the path flag, without '
+                    'the region option or stream flag')
+        if args.cache or (args.jobs != 1):
+            parser.error('The mapped flag cannot be used with the cache or '
+                    'jobs options')
+    if args.columnar and (args.cache or (args.jobs != 1)):
+        parser.error('The columnar option cannot be used with the cache or '
+                'jobs options')
 
-    # Check to see if the path option was set to True by the caller. If so, parse
-    # the sequence from the path
-    if args.path:
-        sequence = parse_sequence_from_path(args.sequence)
+    # Check to see if the path option was set to True by the caller. If so,
+    # parse every record from the path
+    if args.stream:
+        if args.path or args.region or (len(args.sequence) > 1):
+            parser.error('The stream flag takes a single path (or \'-\'), '
+                    'without the path flag or region option')
+        if args.cache:
+            parser.error('The cache option cannot be used with the stream '
+                    'flag')
+    elif args.region:
+        if not args.path:
+            parser.error('The region option requires the path flag')
+        if len(args.sequence) > 1:
+            parser.error('The region option requires a single path')
+        records = stats.iter_timed('parse',
+                (seqio.Record(region, seqio.fetch(args.sequence[0],
+                        *seqio.parse_region(region,
+                                seqio.read_fasta_index(args.sequence[0]))))
+                        for region in args.region),
+                _count_record)
+    elif args.mapped:
+        records = _iter_mapped_records(args.sequence)
+    elif args.path:
+        records = itertools.chain.from_iterable(
+                parse_records_from_path(p) for p in args.sequence)
     else:
-        sequence = args.sequence
+        records = (seqio.Record(None, s) for s in args.sequence)
+    if args.jobs < 0:
+        parser.error('The number of jobs cannot be negative')
 
     # Check to see if start/stop codons were provided by the caller. If not,
-    # use the defaults.
+    # use the defaults (or those of the genetic code chosen by the caller).
+    if args.table is not None:
+        default_start_codons = genetic_codes.get_start_codons(args.table)
+        default_stop_codons = genetic_codes.get_stop_codons(args.table)
     if not args.start_codon:
         args.start_codon = default_start_codons
     if not args.stop_codon:
         args.stop_codon = default_stop_codons
 
-    orf = find_first_orf(sequence = sequence,
-            start_codons = args.start_codon,
-            stop_codons = args.stop_codon)
-    sys.stdout.write('{}\n'.format(orf))
+    try:
+        if args.columnar:
+            if args.stream:
+                source = args.sequence[0]
+                if source == '-':
+                    source = sys.stdin.buffer
+                chunks = stats.iter_timed('parse',
+                        seqio.iter_sequence_chunks(source), _count_chunk)
+                records = [(None, chunks)]
+            write_columnar_orfs(args.columnar, records,
+                    start_codons = args.start_codon,
+                    stop_codons = args.stop_codon,
+                    genetic_code = args.table or genetic_codes.STANDARD,
+                    format = args.columnar_format,
+                    stream = args.stream)
+            return
+
+        if args.stream:
+            source = args.sequence[0]
+            if source == '-':
+                source = sys.stdin.buffer
+            chunks = stats.iter_timed('parse',
+                    seqio.iter_sequence_chunks(source), _count_chunk)
+            orf = find_first_orf_in_stream(chunks,
+                    start_codons = args.start_codon,
+                    stop_codons = args.stop_codon)
+            sys.stdout.write('{}\n'.format(orf))
+            return
+
+        if args.mapped:
+            for header, record in records:
+                orf = find_first_orf_in_record(record,
+                        start_codons = args.start_codon,
+                        stop_codons = args.stop_codon)
+                sys.stdout.write('>{}\n'.format(header))
+                sys.stdout.write('{}\n'.format(orf))
+            return
+
+        cache = None
+        if args.cache:
+            cache = result_cache.ResultCache(path = args.cache)
+        try:
+            for (header, sequence), orf in iter_first_orfs(records,
+                    start_codons = args.start_codon,
+                    stop_codons = args.stop_codon,
+                    jobs = args.jobs or None,
+                    cache = cache):
+                if header is not None:
+                    sys.stdout.write('>{}\n'.format(header))
+                sys.stdout.write('{}\n'.format(orf))
+        finally:
+            if cache is not None:
+                cache.close()
+    finally:
+        if args.stats:
+            stats.disable()
+            collector.write(format = args.stats)
 
 
 if __name__ == '__main__':
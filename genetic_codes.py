@@ -0,0 +1,195 @@
+#! /usr/bin/env python3
+
+"""
+The NCBI genetic codes (translation tables), by table ID.
+
+Each table is stored as NCBI publishes it: a string of the 64 amino acids,
+and a string marking the start codons with 'M', of the codons in TCAG order
+(TTT, TTC, TTA, TTG, TCT, ..., GGG). A table is only built into a dict, and
+compiled into a `translate.CompiledGeneticCode`, the first time it is used.
+"""
+
+import functools
+import collections
+
+import translate
+
+_BASES = 'UCAG'
+_CODONS = tuple(a + b + c for a in _BASES for b in _BASES for c in _BASES)
+
+GeneticCodeTable = collections.namedtuple('GeneticCodeTable',
+        ['id', 'name', 'amino_acids', 'starts'])
+GeneticCodeTable.__doc__ = """An NCBI translation table.
+
+`amino_acids` and `starts` are the NCBI strings of the amino acids of the 64
+codons in TCAG order (stop codons as '*'), and of their use as start codons
+('M' for a start codon, '-' otherwise).
+"""
+
+_TABLES = collections.OrderedDict((t.id, t) for t in (
+        GeneticCodeTable(1, 'Standard',
+                'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '---M------**--*----M---------------M----------------------------'),
+        GeneticCodeTable(2, 'Vertebrate Mitochondrial',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG',
+                '----------**--------------------MMMM----------**---M------------'),
+        GeneticCodeTable(3, 'Yeast Mitochondrial',
+                'FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------**----------------------MM----------------------------'),
+        GeneticCodeTable(4, 'Mold, Protozoan, and Coelenterate Mitochondrial '
+                'and Mycoplasma/Spiroplasma',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '--MM------**-------M------------MMMM---------------M------------'),
+        GeneticCodeTable(5, 'Invertebrate Mitochondrial',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG',
+                '---M------**--------------------MMMM---------------M------------'),
+        GeneticCodeTable(6, 'Ciliate, Dasycladacean and Hexamita Nuclear',
+                'FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '--------------*--------------------M----------------------------'),
+        GeneticCodeTable(9, 'Echinoderm and Flatworm Mitochondrial',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+                '----------**-----------------------M---------------M------------'),
+        GeneticCodeTable(10, 'Euplotid Nuclear',
+                'FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------**-----------------------M----------------------------'),
+        GeneticCodeTable(11, 'Bacterial, Archaeal and Plant Plastid',
+                'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '---M------**--*----M------------MMMM---------------M------------'),
+        GeneticCodeTable(12, 'Alternative Yeast Nuclear',
+                'FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------**--*----M---------------M----------------------------'),
+        GeneticCodeTable(13, 'Ascidian Mitochondrial',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSGGVVVVAAAADDEEGGGG',
+                '---M------**----------------------MM---------------M------------'),
+        GeneticCodeTable(14, 'Alternative Flatworm Mitochondrial',
+                'FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+                '-----------*-----------------------M----------------------------'),
+        GeneticCodeTable(16, 'Chlorophycean Mitochondrial',
+                'FFLLSSSSYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------*---*--------------------M----------------------------'),
+        GeneticCodeTable(21, 'Trematode Mitochondrial',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+                '----------**-----------------------M---------------M------------'),
+        GeneticCodeTable(22, 'Scenedesmus obliquus Mitochondrial',
+                'FFLLSS*SYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '------*---*---*--------------------M----------------------------'),
+        GeneticCodeTable(23, 'Thraustochytrium Mitochondrial',
+                'FF*LSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '--*-------**--*-----------------M--M---------------M------------'),
+        GeneticCodeTable(24, 'Rhabdopleuridae Mitochondrial',
+                'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG',
+                '---M------**-------M---------------M---------------M------------'),
+        GeneticCodeTable(25, 'Candidate Division SR1 and Gracilibacteria',
+                'FFLLSSSSYY**CCGWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '---M------**-----------------------M---------------M------------'),
+        GeneticCodeTable(26, 'Pachysolen tannophilus Nuclear',
+                'FFLLSSSSYY**CC*WLLLAPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------**--*----M---------------M----------------------------'),
+        GeneticCodeTable(27, 'Karyorelict Nuclear',
+                'FFLLSSSSYYQQCCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '--------------*--------------------M----------------------------'),
+        GeneticCodeTable(28, 'Condylostoma Nuclear',
+                'FFLLSSSSYYQQCCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------**--*--------------------M----------------------------'),
+        GeneticCodeTable(29, 'Mesodinium Nuclear',
+                'FFLLSSSSYYYYCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '--------------*--------------------M----------------------------'),
+        GeneticCodeTable(30, 'Peritrich Nuclear',
+                'FFLLSSSSYYEECC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '--------------*--------------------M----------------------------'),
+        GeneticCodeTable(31, 'Blastocrithidia Nuclear',
+                'FFLLSSSSYYEECCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+                '----------**-----------------------M----------------------------'),
+        GeneticCodeTable(33, 'Cephalodiscidae Mitochondrial UAA-Tyr',
+                'FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG',
+                '---M-------*-------M---------------M---------------M------------'),
+        ))
+
+STANDARD = 1
+
+
+def get_table_ids():
+    """Return the IDs of the NCBI translation tables, in order."""
+    return list(_TABLES)
+
+
+def get_table(table_id = STANDARD):
+    """
+    Return the `GeneticCodeTable` with the NCBI ID `table_id`.
+
+    A `ValueError` is raised if there is no table with the ID.
+    """
+    try:
+        return _TABLES[int(table_id)]
+    except (KeyError, ValueError, TypeError):
+        raise ValueError("Unknown genetic code table: {0!r}".format(
+                table_id))
+
+
+def get_genetic_code_dict(table_id = STANDARD):
+    """
+    Return a new dict mapping the 64 RNA codons to the amino acids (stop
+    codons as '*') of the translation table `table_id`.
+
+    Examples
+    --------
+    >>> code = get_genetic_code_dict(2)
+    >>> code['UGA'], code['AGA'], code['AUA']
+    ('W', '*', 'M')
+    """
+    return dict(zip(_CODONS, get_table(table_id).amino_acids))
+
+
+def get_start_codons(table_id = STANDARD):
+    """
+    Return the RNA start codons of the translation table `table_id`, in
+    TCAG order.
+
+    Examples
+    --------
+    >>> get_start_codons(11)
+    ['UUG', 'CUG', 'AUU', 'AUC', 'AUA', 'AUG', 'GUG']
+    """
+    return [c for c, s in zip(_CODONS, get_table(table_id).starts)
+            if s == 'M']
+
+
+def get_stop_codons(table_id = STANDARD):
+    """
+    Return the RNA stop codons of the translation table `table_id`, in
+    TCAG order.
+
+    Examples
+    --------
+    >>> get_stop_codons()
+    ['UAA', 'UAG', 'UGA']
+    """
+    return [c for c, aa in zip(_CODONS, get_table(table_id).amino_acids)
+            if aa == '*']
+
+
+@functools.lru_cache(maxsize = None)
+def _compile(table_id):
+    return translate.CompiledGeneticCode(get_genetic_code_dict(table_id),
+            start_codons = get_start_codons(table_id))
+
+
+def get_genetic_code(table_id = STANDARD):
+    """
+    Return the translation table `table_id` as a
+    `translate.CompiledGeneticCode`, with its start codons.
+
+    Each table is compiled the first time it is asked for, and the same
+    object is returned from then on, so it can be passed to every call of
+    the functions in `translate` at no cost. (The functions in `translate`
+    also accept a table ID in place of a genetic code.)
+
+    Examples
+    --------
+    >>> code = get_genetic_code(2)
+    >>> code.translate('AUAUGAAGA')
+    'MW*'
+    >>> code is get_genetic_code(2)
+    True
+    """
+    return _compile(get_table(table_id).id)
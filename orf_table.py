@@ -0,0 +1,543 @@
+#! /usr/bin/env python3
+
+"""
+Columnar files of ORFs and their peptides.
+
+An ORF table has a row per ORF, with the columns:
+
+record
+    The header of the record the ORF was found in ('' if it has none).
+strand
+    1 for the '+' strand, or -1 for the '-' strand.
+frame
+    The reading frame (0, 1 or 2) of the strand.
+start, end
+    The 0-based, end-exclusive coordinates of the ORF on the '+' strand
+    (see `find_orf.Orf`).
+length
+    The number of bases of the ORF.
+peptide
+    The amino acids the ORF encodes (without the stop codon).
+
+Tables are written in the Arrow IPC file format if `pyarrow` is installed,
+and otherwise in 'orfcol', a simple self-describing format:
+
+    b'ORFCOL1\\n'
+    batch 0: the buffers of each column, each padded to 8 bytes
+    batch 1: ...
+    footer: JSON describing the columns, and the rows and buffers
+            (offset, length) of each batch
+    the length of the footer (little-endian uint64)
+    b'ORFCOL1\\n'
+
+Integer columns are stored as arrays of fixed-size integers, and text
+columns as an array of 64-bit offsets (one more than the rows) and the
+UTF-8 text of every row back to back. An `OrfTable` maps the file into
+memory and reads the columns in place, so millions of ORFs can be loaded
+and filtered without parsing text.
+
+>>> import os, tempfile
+>>> path = os.path.join(tempfile.mkdtemp(), 'orfs.orfcol')
+>>> import find_orf
+>>> with OrfTableWriter(path, format = 'orfcol') as writer:
+...     writer.write('seq1', find_orf.locate_first_orf('CCAUGGUAUAA'), 'MV')
+>>> with OrfTable(path) as table:
+...     list(table.rows())
+[OrfRow(record='seq1', strand='+', frame=2, start=2, end=11, length=9, peptide='MV')]
+"""
+
+import sys
+import json
+import mmap
+import array
+import bisect
+import struct
+import operator
+import itertools
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('auto', 'arrow', 'orfcol')
+
+_MAGIC = b'ORFCOL1\n'
+_ARROW_MAGIC = b'ARROW1'
+
+# The columns and their types, and the `array` type code of each integer
+# type
+COLUMNS = collections.OrderedDict((
+        ('record', 'utf8'),
+        ('strand', 'int8'),
+        ('frame', 'int8'),
+        ('start', 'int64'),
+        ('end', 'int64'),
+        ('length', 'int64'),
+        ('peptide', 'utf8'),
+        ))
+_TYPE_CODES = {'int8' : 'b', 'int64' : 'q'}
+
+_STRANDS = {'+' : 1, '-' : -1}
+
+OrfRow = collections.namedtuple('OrfRow', ['record', 'strand', 'frame',
+        'start', 'end', 'length', 'peptide'])
+OrfRow.__doc__ = """A row of an `OrfTable`, with the strand as '+' or '-'."""
+
+
+def _resolve_format(format):
+    if format not in FORMATS:
+        raise ValueError("Unknown ORF table format: {0!r}".format(format))
+    if format == 'auto':
+        return 'orfcol' if pyarrow is None else 'arrow'
+    if (format == 'arrow') and (pyarrow is None):
+        raise ImportError("The 'arrow' format requires pyarrow")
+    return format
+
+
+class OrfTableWriter(object):
+    """
+    Writes ORFs to a columnar file, a batch of rows at a time.
+
+    The rows of each batch are collected in one array (or buffer) per
+    column, and written when the batch is full, through a buffered file of
+    `buffer_size` bytes. Call `close` (or use the writer as a context
+    manager) to write the last batch and the footer.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file to write.
+    format : str
+        'arrow', 'orfcol', or 'auto' (the default) for 'arrow' if `pyarrow`
+        is installed and 'orfcol' otherwise.
+    batch_rows : int
+        The number of rows written at a time.
+    buffer_size : int
+        The size of the file buffer.
+    """
+
+    def __init__(self, path, format = 'auto', batch_rows = 1 << 16,
+            buffer_size = 1 << 20):
+        self.format = _resolve_format(format)
+        self.path = path
+        self.batch_rows = batch_rows
+        self.num_rows = 0
+        self._stream = open(path, 'wb', buffering = buffer_size)
+        self._batches = []
+        self._arrow_writer = None
+        if self.format == 'arrow':
+            self._schema = pyarrow.schema([
+                    (name, pyarrow.string() if kind == 'utf8' else
+                            getattr(pyarrow, kind)())
+                    for name, kind in COLUMNS.items()])
+            self._arrow_writer = pyarrow.ipc.new_file(self._stream,
+                    self._schema)
+        else:
+            self._stream.write(_MAGIC)
+            self._position = len(_MAGIC)
+        self._new_batch()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _new_batch(self):
+        # The values of each column (with the strand as given, and without
+        # the length) for the rows of the batch
+        self._batch = tuple([] for name in OrfRow._fields if name != 'length')
+
+    def write_row(self, record, strand, frame, start, end, peptide):
+        """
+        Add a row for an ORF of `record` (a header, or None) on `strand`
+        ('+' or '-'), in `frame`, from `start` to `end`, encoding
+        `peptide`.
+        """
+        if strand not in _STRANDS:
+            raise ValueError("Invalid strand: {0!r}".format(strand))
+        records, strands, frames, starts, ends, peptides = self._batch
+        records.append(record or '')
+        strands.append(strand)
+        frames.append(frame)
+        starts.append(start)
+        ends.append(end)
+        peptides.append(peptide)
+        self.num_rows += 1
+        if len(records) >= self.batch_rows:
+            self._write_batch()
+
+    def write(self, record, orf, peptide):
+        """Add a row for `orf` (a `find_orf.Orf`) of `record`."""
+        self.write_row(record, orf.strand, orf.frame, orf.start, orf.end,
+                peptide)
+
+    def _build_columns(self):
+        # Return the columns of the batch as arrays of integers, or (offsets,
+        # data) pairs of text
+        records, strands, frames, starts, ends, peptides = self._batch
+        return collections.OrderedDict((
+                ('record', _encode_text(records)),
+                ('strand', array.array('b', (_STRANDS[s] for s in strands))),
+                ('frame', array.array('b', frames)),
+                ('start', array.array('q', starts)),
+                ('end', array.array('q', ends)),
+                ('length', array.array('q', map(operator.sub, ends,
+                        starts))),
+                ('peptide', _encode_text(peptides)),
+                ))
+
+    def _write_batch(self):
+        rows = len(self._batch[0])
+        if rows == 0:
+            return
+        columns = self._build_columns()
+        if self._arrow_writer is not None:
+            self._write_arrow_batch(rows, columns)
+        else:
+            self._write_orfcol_batch(rows, columns)
+        self._new_batch()
+
+    def _write_arrow_batch(self, rows, columns):
+        arrays = []
+        for name, kind in COLUMNS.items():
+            column = columns[name]
+            if kind == 'utf8':
+                offsets, data = column
+                if len(data) >= (1 << 31):
+                    raise ValueError("A batch of the {0!r} column is too "
+                            "long; write fewer rows per batch".format(name))
+                arrays.append(pyarrow.Array.from_buffers(pyarrow.string(),
+                        rows, [None,
+                        pyarrow.py_buffer(array.array('i', offsets)),
+                        pyarrow.py_buffer(data)]))
+            else:
+                arrays.append(pyarrow.array(column,
+                        type = getattr(pyarrow, kind)()))
+        self._arrow_writer.write_batch(pyarrow.record_batch(arrays,
+                schema = self._schema))
+
+    def _write_buffer(self, buffer):
+        # Write `buffer`, padded to 8 bytes, and return its (offset, length)
+        data = memoryview(buffer).cast('B')
+        offset = self._position
+        self._stream.write(data)
+        padding = (-len(data)) % 8
+        self._stream.write(b'\x00' * padding)
+        self._position += len(data) + padding
+        return [offset, len(data)]
+
+    def _write_orfcol_batch(self, rows, columns):
+        buffers = collections.OrderedDict()
+        for name, kind in COLUMNS.items():
+            column = columns[name]
+            if kind == 'utf8':
+                offsets, data = column
+                buffers[name + '.offsets'] = self._write_buffer(offsets)
+                buffers[name + '.data'] = self._write_buffer(data)
+            else:
+                buffers[name] = self._write_buffer(column)
+        self._batches.append({'rows' : rows, 'buffers' : buffers})
+
+    def close(self):
+        """Write the rows not yet written, and the footer, and close."""
+        if self._stream.closed:
+            return
+        try:
+            self._write_batch()
+            if self._arrow_writer is not None:
+                self._arrow_writer.close()
+            else:
+                footer = json.dumps(collections.OrderedDict((
+                        ('version', 1),
+                        ('byteorder', sys.byteorder),
+                        ('columns', [{'name' : name, 'type' : kind}
+                                for name, kind in COLUMNS.items()]),
+                        ('rows', self.num_rows),
+                        ('batches', self._batches),
+                        ))).encode('utf-8')
+                self._stream.write(footer)
+                self._stream.write(struct.pack('<Q', len(footer)))
+                self._stream.write(_MAGIC)
+        finally:
+            self._stream.close()
+
+
+def _encode_text(texts):
+    # Return `texts` as UTF-8 data and the offsets of each text in it,
+    # encoding them all at once when they are ASCII (so that their lengths
+    # in characters and bytes are the same)
+    joined = "".join(texts)
+    if joined.isascii():
+        data = joined.encode('ascii')
+        lengths = map(len, texts)
+    else:
+        encoded = [text.encode('utf-8') for text in texts]
+        data = b"".join(encoded)
+        lengths = map(len, encoded)
+    offsets = array.array('q', [0])
+    offsets.extend(itertools.accumulate(lengths))
+    return offsets, data
+
+
+def _decode_text(offsets, data):
+    # Return a function of a row that returns its text, decoding all of
+    # `data` at once when it is ASCII
+    data = bytes(data)
+    if data.isascii():
+        text = data.decode('ascii')
+        return lambda i: text[offsets[i]:offsets[i + 1]]
+    return lambda i: data[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+
+class TextColumn(object):
+    """
+    A text column of an `OrfTable`, read in place.
+
+    The text of each batch is held as its offsets and data (views of the
+    mapped file). Indexing decodes one row at a time, while iterating (or
+    `take`) decodes a batch at a time.
+    """
+
+    __slots__ = ('_chunks', '_starts')
+
+    def __init__(self, chunks):
+        # `chunks` is a list of (offsets, data) per batch
+        self._chunks = chunks
+        self._starts = [0]
+        for offsets, data in chunks:
+            self._starts.append(self._starts[-1] + len(offsets) - 1)
+
+    def __len__(self):
+        return self._starts[-1]
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not (0 <= i < n):
+            raise IndexError("TextColumn index out of range")
+        chunk = bisect.bisect_right(self._starts, i) - 1
+        offsets, data = self._chunks[chunk]
+        i -= self._starts[chunk]
+        return bytes(data[offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for offsets, data in self._chunks:
+            get = _decode_text(offsets, data)
+            for i in range(len(offsets) - 1):
+                yield get(i)
+
+    def take(self, indices):
+        """
+        Return the texts at `indices` as a list. The batch of the last index
+        is kept decoded, so ascending indices are fastest.
+        """
+        n = len(self)
+        texts = []
+        first = last = 0
+        get = None
+        for i in indices:
+            i = int(i)
+            if i < 0:
+                i += n
+            if not (first <= i < last):
+                if not (0 <= i < n):
+                    raise IndexError("TextColumn index out of range")
+                chunk = bisect.bisect_right(self._starts, i) - 1
+                first, last = self._starts[chunk], self._starts[chunk + 1]
+                get = _decode_text(*self._chunks[chunk])
+            texts.append(get(i - first))
+        return texts
+
+
+class OrfTable(object):
+    """
+    A memory-mapped ORF table, as written by `OrfTableWriter`.
+
+    `column` returns a column by name: an integer column as a NumPy array
+    (or an `array.array` if NumPy is not installed), and a text column as
+    a sequence of strings. For a table of one batch (and every Arrow
+    table), integer columns are views of the mapped file rather than
+    copies. `rows` generates the rows (all of them, or those at the given
+    indices) as `OrfRow`s, so a table can be filtered with array
+    operations on its columns, e.g.:
+
+        long = numpy.flatnonzero(table.column('length') >= 300)
+        for row in table.rows(long):
+            ...
+
+    Views of the file (such as the arrays returned by `column`) must be
+    released before the table is closed.
+
+    Parameters
+    ----------
+    path : str
+        The path of an Arrow IPC or 'orfcol' file.
+    """
+
+    _block_rows = 1 << 16
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        self._arrow = None
+        self._columns = {}
+        try:
+            magic = self._file.read(len(_ARROW_MAGIC))
+            if magic == _ARROW_MAGIC:
+                if pyarrow is None:
+                    raise ImportError("Reading an Arrow table requires "
+                            "pyarrow")
+                self.format = 'arrow'
+                self._arrow = pyarrow.ipc.open_file(
+                        pyarrow.memory_map(path, 'r')).read_all()
+                self.num_rows = self._arrow.num_rows
+            else:
+                self.format = 'orfcol'
+                self._map = mmap.mmap(self._file.fileno(), 0,
+                        access = mmap.ACCESS_READ)
+                self._read_footer()
+        except:
+            self.close()
+            raise
+
+    def _read_footer(self):
+        data = self._map
+        tail = len(_MAGIC) + 8
+        if (len(data) < len(_MAGIC) + tail) or (data[:len(_MAGIC)] != _MAGIC
+                ) or (data[-len(_MAGIC):] != _MAGIC):
+            raise Exception("Invalid ORF table: {0!r}".format(self.path))
+        footer_length = struct.unpack('<Q', data[-tail:-len(_MAGIC)])[0]
+        footer = json.loads(data[-tail - footer_length:-tail].decode('utf-8'))
+        if footer['version'] != 1:
+            raise Exception("Unsupported ORF table version: {0!r}".format(
+                    footer['version']))
+        self._byteorder = footer['byteorder']
+        self._types = collections.OrderedDict((c['name'], c['type'])
+                for c in footer['columns'])
+        self._batches = footer['batches']
+        self.num_rows = footer['rows']
+        self._view = memoryview(data)
+
+    def __len__(self):
+        return self.num_rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def column_names(self):
+        if self._arrow is not None:
+            return list(self._arrow.column_names)
+        return list(self._types)
+
+    def _buffer(self, batch, name, type_code):
+        offset, length = batch['buffers'][name]
+        view = self._view[offset:offset + length]
+        if self._byteorder != sys.byteorder:
+            values = array.array(type_code, view)
+            values.byteswap()
+            return values
+        return view.cast(type_code)
+
+    def column(self, name):
+        """Return the column `name` (see the class docs)."""
+        if name in self._columns:
+            return self._columns[name]
+        if self._arrow is not None:
+            column = self._arrow.column(name)
+            if pyarrow.types.is_string(column.type):
+                values = column.to_pylist()
+            elif numpy is not None:
+                values = column.to_numpy()
+            else:
+                values = array.array(_TYPE_CODES[str(column.type)],
+                        column.to_pylist())
+        else:
+            kind = self._types[name]
+            if kind == 'utf8':
+                values = TextColumn([
+                        (self._buffer(b, name + '.offsets', 'q'),
+                                self._buffer(b, name + '.data', 'B'))
+                        for b in self._batches])
+            else:
+                type_code = _TYPE_CODES[kind]
+                views = [self._buffer(b, name, type_code)
+                        for b in self._batches]
+                if numpy is not None:
+                    if len(views) == 1:
+                        values = numpy.frombuffer(views[0], dtype = type_code)
+                    else:
+                        values = numpy.concatenate([numpy.frombuffer(v,
+                                dtype = type_code) for v in views] or
+                                [numpy.zeros(0, dtype = type_code)])
+                else:
+                    values = array.array(type_code)
+                    for view in views:
+                        values.frombytes(view)
+        self._columns[name] = values
+        return values
+
+    def rows(self, indices = None):
+        """
+        Generate the rows (or the rows at `indices`, in their order) as
+        `OrfRow`s.
+        """
+        columns = [self.column(name) for name in OrfRow._fields]
+        if indices is None:
+            indices = range(self.num_rows)
+        # Take the rows a block of indices at a time, a column at a time
+        for block in _iter_blocks(indices, self._block_rows):
+            values = [_take(column, block) for column in columns]
+            values[1] = ['+' if strand > 0 else '-' for strand in values[1]]
+            yield from map(OrfRow._make, zip(*values))
+
+    def close(self):
+        """Release the columns and unmap the file."""
+        self._columns = {}
+        self._arrow = None
+        if self._map is not None:
+            if hasattr(self, '_view'):
+                self._view.release()
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def _iter_blocks(indices, size):
+    # Generate `indices` (a sequence or iterable) as sequences of up to
+    # `size` indices
+    if hasattr(indices, '__getitem__') and hasattr(indices, '__len__'):
+        for i in range(0, len(indices), size):
+            yield indices[i:i + size]
+        return
+    indices = iter(indices)
+    while True:
+        block = list(itertools.islice(indices, size))
+        if not block:
+            return
+        yield block
+
+
+def _take(column, indices):
+    # Return the values of `column` at `indices` as a list of Python values
+    if isinstance(column, TextColumn):
+        return column.take(indices)
+    if (numpy is not None) and isinstance(column, numpy.ndarray):
+        return column[numpy.asarray(indices, dtype = numpy.intp)].tolist()
+    if isinstance(indices, range) and (indices.step == 1):
+        return list(column[indices.start:indices.stop])
+    return [column[i] for i in indices]
@@ -0,0 +1,210 @@
+#! /usr/bin/env python3
+
+"""
+A size-bounded cache of results, keyed by a hash of the sequence and
+parameters they were computed from, that can persist between runs.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import collections
+
+import stats
+
+CacheInfo = collections.namedtuple('CacheInfo',
+        ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def make_key(name, sequence, *parameters, chunk_size = 1 << 20):
+    """
+    Return a 16-byte hash of `name`, `sequence` and `parameters`.
+
+    The sequence is hashed as uppercase ASCII (a chunk at a time, so a long
+    sequence is never copied whole), so sequences that only differ in case
+    share a key. The `parameters` (e.g., codons or a genetic code) are hashed
+    by their `repr`, so they should be tuples, strings, bytes or numbers.
+
+    Parameters
+    ----------
+    name : str
+        The name of the computation, so that different functions of the
+        same sequence get different keys.
+    sequence : str, bytes, bytearray or memoryview
+        The sequence the result is computed from.
+    parameters
+        Anything else the result depends on.
+
+    Returns
+    -------
+    bytes
+
+    Examples
+    --------
+    >>> make_key('f', 'augc', ('AUG',)) == make_key('f', b'AUGC', ('AUG',))
+    True
+    >>> make_key('f', 'AUGC') == make_key('g', 'AUGC')
+    False
+    """
+    if isinstance(sequence, str):
+        sequence = sequence.encode('ascii', 'replace')
+    digest = hashlib.blake2b(digest_size = 16)
+    digest.update(repr((name, len(sequence), parameters)).encode('utf-8'))
+    for i in range(0, len(sequence), chunk_size):
+        digest.update(bytes(sequence[i:i + chunk_size]).upper())
+    return digest.digest()
+
+
+class ResultCache(object):
+    """
+    A cache of results (strings) keyed by `make_key`.
+
+    The most recently used `maxsize` results are kept in memory, and the
+    least recently used is evicted when a new one is added to a full cache.
+    If `path` is given, every result is also written to an sqlite database
+    at `path`, which is read when a key is missing from memory, so results
+    persist between runs. Writes are committed in batches; call `close` (or
+    use the cache as a context manager) to commit the last of them.
+
+    `hits` and `misses` count the lookups with `get`, as `cache_info` reports
+    them.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        The number of results kept in memory. If None, the memory cache is
+        unbounded.
+    path : str or None
+        The path of the sqlite database to persist results to.
+    commit_interval : int
+        The number of results written to the database per commit.
+
+    Examples
+    --------
+    >>> cache = ResultCache(maxsize = 2)
+    >>> cache.put(b'a', 'A'); cache.put(b'b', 'B')
+    >>> cache.get(b'a')
+    'A'
+    >>> cache.put(b'c', 'C')
+    >>> cache.get(b'b') is None
+    True
+    >>> cache.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+    """
+
+    def __init__(self, maxsize = 1 << 16, path = None,
+            commit_interval = 1000):
+        if (maxsize is not None) and (maxsize < 0):
+            raise ValueError("The cache size cannot be negative: {0!r}".format(
+                    maxsize))
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._commit_interval = commit_interval
+        self._results = collections.OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path,
+                    check_same_thread = False)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS results "
+                    "(key BLOB PRIMARY KEY, value TEXT NOT NULL)")
+            self._connection.commit()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _remember(self, key, value):
+        if self.maxsize == 0:
+            return
+        self._results[key] = value
+        self._results.move_to_end(key)
+        if (self.maxsize is not None) and (len(self._results) > self.maxsize):
+            self._results.popitem(last = False)
+
+    def get(self, key, default = None):
+        """Return the result for `key`, or `default` if there is none."""
+        started = stats.start()
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if started is not None:
+            hit = value is not None
+            stats.stop('cache', started, hits = int(hit),
+                    misses = int(not hit))
+        return default if value is None else value
+
+    def _get(self, key):
+        value = self._results.get(key)
+        if value is not None:
+            self._results.move_to_end(key)
+            return value
+        if self._connection is not None:
+            row = self._connection.execute(
+                    "SELECT value FROM results WHERE key = ?",
+                    (key,)).fetchone()
+            if row is not None:
+                self._remember(key, row[0])
+                return row[0]
+        return None
+
+    def put(self, key, value):
+        """Store the result `value` for `key`."""
+        with self._lock:
+            self._remember(key, value)
+            if self._connection is not None:
+                self._pending.append((key, value))
+                if len(self._pending) >= self._commit_interval:
+                    self._commit()
+
+    def _commit(self):
+        if self._pending:
+            self._connection.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?)",
+                    self._pending)
+            self._connection.commit()
+            self._pending = []
+
+    def flush(self):
+        """Commit the results not yet written to the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+
+    def close(self):
+        """Commit any pending results and close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+                self._connection.close()
+                self._connection = None
+
+    def clear(self):
+        """
+        Forget the results held in memory, and reset the counters. (The
+        database is left as it is.)
+        """
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def cache_info(self):
+        """
+        Return the hits, misses, maximum and current sizes (in memory) as a
+        `CacheInfo`, like `functools.lru_cache`.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize,
+                    len(self._results))
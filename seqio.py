@@ -0,0 +1,547 @@
+#! /usr/bin/env python3
+
+"""
+Reading nucleotide sequences from plain, FASTA and FASTQ files.
+"""
+
+import os
+import mmap
+import gzip
+import array
+import bisect
+import functools
+import collections
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+Record = collections.namedtuple('Record', ['header', 'sequence'])
+Record.__doc__ = """A sequence read from a file.
+
+`header` is the text after the '>' (FASTA) or '@' (FASTQ) of the record's
+header line, or None for a file of bare sequence lines.
+"""
+
+
+def open_sequence_file(path):
+    """Open `path` for reading bytes, decompressing it if it is gzipped.
+
+    Gzip is detected from the magic number at the start of the file rather
+    than the file name. BGZF (bgzip) files are gzip files of many members,
+    and are read the same way.
+
+    Parameters
+    ----------
+    path : str
+        The path to a plain or gzip-compressed file.
+
+    Returns
+    -------
+    file object
+        A buffered binary stream.
+    """
+    stream = open(path, 'rb')
+    try:
+        magic = stream.peek(2)[:2]
+    except:
+        stream.close()
+        raise
+    if magic == _GZIP_MAGIC:
+        # A `GzipFile` given a file object does not close it, so open the
+        # path again with one that owns its file
+        stream.close()
+        return gzip.open(path, 'rb')
+    return stream
+
+
+def iter_records(source):
+    """Generate the sequences in a plain, FASTA or FASTQ file.
+
+    The format is detected from the first non-blank line: '>' starts a FASTA
+    file, '@' starts a FASTQ file, and anything else is taken to be the lines
+    of a single bare sequence. Lines are read through a buffered stream, and
+    the lines of each sequence are collected in a list and joined once, so
+    only one record is held in memory at a time.
+
+    Parameters
+    ----------
+    source : str or file object
+        A path (which may be gzip or bgzip compressed; see
+        `open_sequence_file`) or a binary stream. A path is closed when the
+        generator is exhausted or closed; a stream is left open.
+
+    Yields
+    ------
+    Record
+
+    Examples
+    --------
+    >>> import io
+    >>> stream = io.BytesIO(b'>seq1 a\\nAUG\\nGUA\\n>seq2\\nUAA\\n')
+    >>> list(iter_records(stream))
+    [Record(header='seq1 a', sequence='AUGGUA'), Record(header='seq2', sequence='UAA')]
+    """
+    if isinstance(source, str):
+        with open_sequence_file(source) as stream:
+            for record in iter_records(stream):
+                yield record
+        return
+    lines = (line.strip() for line in source)
+    for first_line in lines:
+        if first_line:
+            break
+    else:
+        return
+    if first_line.startswith(b'>'):
+        records = _iter_fasta(first_line, lines)
+    elif first_line.startswith(b'@'):
+        records = _iter_fastq(first_line, lines)
+    else:
+        records = _iter_plain(first_line, lines)
+    for header, sequence in records:
+        yield Record(header, sequence)
+
+def _iter_plain(first_line, lines):
+    pieces = [first_line]
+    pieces.extend(lines)
+    yield None, b"".join(pieces).decode('ascii')
+
+def _iter_fasta(first_line, lines):
+    header = first_line
+    pieces = []
+    for line in lines:
+        if line.startswith(b'>'):
+            yield header[1:].decode('ascii'), b"".join(pieces).decode('ascii')
+            header = line
+            pieces = []
+        else:
+            pieces.append(line)
+    yield header[1:].decode('ascii'), b"".join(pieces).decode('ascii')
+
+def _iter_fastq(first_line, lines):
+    header = first_line
+    while header is not None:
+        if not header.startswith(b'@'):
+            raise Exception("Invalid FASTQ header: {0!r}".format(
+                    header.decode('ascii', 'replace')))
+        pieces = []
+        for line in lines:
+            if line.startswith(b'+'):
+                break
+            pieces.append(line)
+        else:
+            raise Exception("FASTQ record {0!r} has no quality scores".format(
+                    header.decode('ascii', 'replace')))
+        sequence = b"".join(pieces)
+        quality_length = 0
+        for line in lines:
+            quality_length += len(line)
+            if quality_length >= len(sequence):
+                break
+        if quality_length != len(sequence):
+            raise Exception(
+                    "FASTQ record {0!r} has {1} bases but {2} quality "
+                    "scores".format(header.decode('ascii', 'replace'),
+                            len(sequence), quality_length))
+        yield header[1:].decode('ascii'), sequence.decode('ascii')
+        header = next((line for line in lines if line), None)
+
+
+def iter_sequence_chunks(source, chunk_size = 1 << 16):
+    """Generate the bases of a file of one bare sequence in chunks.
+
+    Unlike `iter_records`, which holds a whole record in memory, the file is
+    read `chunk_size` bytes at a time and whitespace (including line breaks)
+    is removed from each chunk, so a sequence of any length can be read
+    with bounded memory, e.g., from a pipe.
+
+    Parameters
+    ----------
+    source : str or file object
+        A path (which may be gzip or bgzip compressed; see
+        `open_sequence_file`) or a binary stream.
+    chunk_size : int
+        The number of bytes read at a time.
+
+    Yields
+    ------
+    bytes
+
+    Examples
+    --------
+    >>> import io
+    >>> list(iter_sequence_chunks(io.BytesIO(b'AUG\\nGUA\\nUAA\\n'), 5))
+    [b'AUGG', b'UAUA', b'A']
+    """
+    if isinstance(source, str):
+        with open_sequence_file(source) as stream:
+            for chunk in iter_sequence_chunks(stream, chunk_size):
+                yield chunk
+        return
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        chunk = chunk.translate(None, _WHITESPACE)
+        if chunk:
+            yield chunk
+
+
+class MappedFasta(object):
+    """A memory-mapped FASTA file with random access to its records.
+
+    The file is mapped into memory rather than read, so the operating system
+    pages in only the parts of it that are used, and the pages can be
+    dropped again under memory pressure. When the file is opened, the start
+    of every sequence line is recorded in a line-offset index, so bases can
+    be addressed by their position within a record with the line breaks
+    skipped. Views of the mapped file (see `MappedRecord.view`) must be
+    released before the file is closed.
+
+    Parameters
+    ----------
+    path : str
+        The path to an uncompressed FASTA file.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'seqs.fasta')
+    >>> with open(path, 'w') as stream:
+    ...     _ = stream.write('>seq1\\nCCAUG\\nGUAUA\\nA\\n')
+    >>> with MappedFasta(path) as fasta:
+    ...     record = fasta['seq1']
+    ...     (len(record), record[3:11])
+    (11, b'UGGUAUAA')
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            if os.fstat(self._file.fileno()).st_size > 0:
+                self._map = mmap.mmap(self._file.fileno(), 0,
+                        access = mmap.ACCESS_READ)
+            else:
+                self._map = b''
+        except:
+            self._file.close()
+            raise
+        self.records = collections.OrderedDict()
+        for record in self._index_records():
+            self.records[record.name] = record
+
+    def _index_records(self):
+        data = self._map
+        position = 0
+        end = len(data)
+        while position < end and data[position:position + 1] != b'>':
+            position = data.find(b'\n', position)
+            if position < 0:
+                return
+            position += 1
+        while position < end:
+            header_end = data.find(b'\n', position)
+            if header_end < 0:
+                header_end = end
+            header = bytes(data[position + 1:header_end]).rstrip(b'\r')
+            header = header.decode('ascii')
+            line_starts = array.array('q')
+            line_lengths = array.array('q')
+            position = header_end + 1
+            while position < end and data[position:position + 1] != b'>':
+                line_end = data.find(b'\n', position)
+                if line_end < 0:
+                    line_end = end
+                length = line_end - position
+                if length and data[line_end - 1:line_end] == b'\r':
+                    length -= 1
+                if length:
+                    line_starts.append(position)
+                    line_lengths.append(length)
+                position = line_end + 1
+            yield MappedRecord(data, header, line_starts, line_lengths)
+
+    def __getitem__(self, name):
+        return self.records[name]
+
+    def __iter__(self):
+        return iter(self.records.values())
+
+    def __len__(self):
+        return len(self.records)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MappedRecord(object):
+    """A record of a `MappedFasta`, addressed by base position.
+
+    Indexing or slicing a record copies only the requested bases out of the
+    mapped file. `view` returns a zero-copy `memoryview` when the requested
+    bases are on one line (which is always the case for records written on
+    a single line), and `iter_lines` generates zero-copy views of every
+    line, so a record can be processed a line at a time.
+    """
+
+    __slots__ = ('_data', 'header', 'name', '_line_starts', '_line_offsets')
+
+    def __init__(self, data, header, line_starts, line_lengths):
+        self._data = data
+        self.header = header
+        self.name = header.split(None, 1)[0] if header else header
+        self._line_starts = line_starts
+        # `_line_offsets[i]` is the position in the record of the first base
+        # of line i; the last entry is the length of the record.
+        self._line_offsets = array.array('q', [0])
+        for length in line_lengths:
+            self._line_offsets.append(self._line_offsets[-1] + length)
+
+    def __len__(self):
+        return self._line_offsets[-1]
+
+    def _locate(self, position):
+        line = bisect.bisect_right(self._line_offsets, position) - 1
+        line = min(line, len(self._line_starts) - 1)
+        return line, self._line_starts[line] + (
+                position - self._line_offsets[line])
+
+    def _pieces(self, start, end):
+        if start >= end:
+            return
+        line, file_start = self._locate(start)
+        while start < end:
+            line_end = self._line_offsets[line + 1]
+            stop = min(end, line_end)
+            yield memoryview(self._data)[file_start:file_start + (stop - start)]
+            start = stop
+            line += 1
+            if line < len(self._line_starts):
+                file_start = self._line_starts[line]
+
+    def view(self, start = 0, end = None):
+        """Return bases `start` to `end` without line breaks.
+
+        A zero-copy `memoryview` of the mapped file is returned if the bases
+        are all on one line, otherwise the lines are copied into one
+        `bytearray` of `end - start` bytes, a line at a time.
+        """
+        start, end, step = slice(start, end).indices(len(self))
+        pieces = self._pieces(start, end)
+        first = next(pieces, b'')
+        if len(first) == (end - start):
+            return first
+        bases = bytearray(end - start)
+        position = len(first)
+        bases[:position] = first
+        first.release()
+        for piece in pieces:
+            bases[position:position + len(piece)] = piece
+            position += len(piece)
+            piece.release()
+        return bases
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return bytes(self.view())[key]
+            return bytes(self.view(key.start, key.stop))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("record index out of range")
+        return bytes(self.view(key, key + 1))
+
+    def iter_lines(self):
+        """Generate a zero-copy `memoryview` of each line of the record."""
+        return self._pieces(0, len(self))
+
+    def iter_windows(self, size, overlap = 0):
+        """Generate successive windows of `size` bases (as from `view`).
+
+        Consecutive windows share `overlap` bases, so that features shorter
+        than `overlap` bases are wholly within at least one window.
+        """
+        if size <= overlap:
+            raise ValueError("The window size must be larger than the overlap")
+        for start in range(0, max(len(self) - overlap, 1), size - overlap):
+            yield start, self.view(start, start + size)
+
+
+FastaIndexEntry = collections.namedtuple('FastaIndexEntry',
+        ['name', 'length', 'offset', 'line_bases', 'line_width'])
+FastaIndexEntry.__doc__ = """A line of a FASTA index (.fai) file.
+
+`length` is the number of bases in the record, `offset` is the byte offset of
+its first base in the FASTA file, and every line of the record but the last
+has `line_bases` bases and `line_width` bytes (the bases plus the line break).
+"""
+
+
+def get_fasta_index_path(path):
+    return path + '.fai'
+
+def build_fasta_index(path, index_path = None):
+    """Write a samtools-compatible index (.fai) of the FASTA file at `path`.
+
+    The index has a line for each record, with the columns of a
+    `FastaIndexEntry`, and lets `fetch` seek straight to any region of the
+    file. Every line of a record but the last must have the same length,
+    otherwise an exception is raised.
+
+    Parameters
+    ----------
+    path : str
+        The path to an uncompressed FASTA file.
+    index_path : str
+        Where to write the index. The default is `path` with '.fai' appended.
+
+    Returns
+    -------
+    list
+        The `FastaIndexEntry` of each record.
+    """
+    if index_path is None:
+        index_path = get_fasta_index_path(path)
+    with open(path, 'rb') as stream:
+        if stream.peek(2)[:2] == _GZIP_MAGIC:
+            raise Exception("Cannot index compressed FASTA file {0!r}".format(
+                    path))
+        entries = list(_index_fasta_stream(stream, path))
+    with open(index_path, 'w') as stream:
+        for entry in entries:
+            stream.write("\t".join(str(x) for x in entry) + "\n")
+    _read_fasta_index_file.cache_clear()
+    return entries
+
+def _index_fasta_stream(stream, path):
+    position = 0
+    entry = None
+    for line in stream:
+        line_start = position
+        position += len(line)
+        if line.startswith(b'>'):
+            if entry is not None:
+                yield FastaIndexEntry(*entry)
+            name = line[1:].split(None, 1)
+            name = name[0].decode('ascii') if name else ''
+            entry = [name, 0, position, 0, 0]
+            ended = False
+            continue
+        if entry is None:
+            continue
+        bases = len(line.rstrip(b'\r\n'))
+        if entry[1] == 0 and not bases:
+            continue
+        if entry[1] == 0:
+            entry[2:5] = [line_start, bases, len(line)]
+        elif bases:
+            # Only the last line of a record may be shorter than the others.
+            if ended or (bases > entry[3]):
+                raise Exception(
+                        "Record {0!r} of {1!r} has lines of different "
+                        "lengths".format(entry[0], path))
+        ended = ended or (bases < entry[3]) or (len(line) != entry[4])
+        entry[1] += bases
+    if entry is not None:
+        yield FastaIndexEntry(*entry)
+
+@functools.lru_cache(maxsize = 16)
+def _read_fasta_index_file(index_path, mtime_ns):
+    entries = collections.OrderedDict()
+    with open(index_path) as stream:
+        for line in stream:
+            fields = line.rstrip('\n').split('\t')
+            entry = FastaIndexEntry(fields[0], *(int(x) for x in fields[1:5]))
+            entries[entry.name] = entry
+    return entries
+
+def read_fasta_index(path):
+    """Return the index of the FASTA file at `path`, building it if needed.
+
+    The index is returned as an ordered dict of `FastaIndexEntry` keyed by
+    record name. Parsed indices are cached, so repeated calls for the same
+    file only read its index once (and again if it is rebuilt).
+    """
+    index_path = get_fasta_index_path(path)
+    if (not os.path.exists(index_path)) or (
+            os.stat(index_path).st_mtime_ns < os.stat(path).st_mtime_ns):
+        build_fasta_index(path, index_path)
+    return _read_fasta_index_file(index_path,
+            os.stat(index_path).st_mtime_ns)
+
+def fetch(path, name, start = None, end = None):
+    """Return bases `start` to `end` of record `name` of a FASTA file.
+
+    `start` and `end` are 0-based and `end` is exclusive, as with slicing a
+    string, and default to the start and end of the record. The index of the
+    file (see `read_fasta_index`) is used to seek straight to the requested
+    bases, so only they are read.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'seqs.fasta')
+    >>> with open(path, 'w') as stream:
+    ...     _ = stream.write('>seq1\\nCCAUG\\nGUAUA\\nA\\n>seq2\\nAUG\\n')
+    >>> fetch(path, 'seq1', 3, 11)
+    'UGGUAUAA'
+    """
+    try:
+        entry = read_fasta_index(path)[name]
+    except KeyError:
+        raise KeyError("No record named {0!r} in {1!r}".format(name, path))
+    start, end, step = slice(start, end).indices(entry.length)
+    if start >= end:
+        return ''
+    def byte_offset(position):
+        line, column = divmod(position, entry.line_bases)
+        return entry.offset + (line * entry.line_width) + column
+    with open(path, 'rb') as stream:
+        stream.seek(byte_offset(start))
+        data = stream.read(byte_offset(end - 1) + 1 - byte_offset(start))
+    return data.replace(b'\n', b'').replace(b'\r', b'').decode('ascii')
+
+def parse_region(region, names = None):
+    """Parse a samtools-style region into (name, start, end) for `fetch`.
+
+    Regions are 'name', 'name:start' or 'name:start-end', with 1-based,
+    inclusive coordinates (commas are allowed in numbers). Names can hold
+    colons, so, as samtools does, a region that is one of `names` (e.g., the
+    index of the file, from `read_fasta_index`) is taken as a whole record,
+    and otherwise the range is split off at the last colon.
+
+    Examples
+    --------
+    >>> parse_region('chr1:1,001-2,000')
+    ('chr1', 1000, 2000)
+    >>> parse_region('chr1:5')
+    ('chr1', 4, None)
+    >>> parse_region('chr1')
+    ('chr1', None, None)
+    >>> parse_region('HLA:1-10', names = ['HLA:1-10'])
+    ('HLA:1-10', None, None)
+    """
+    if (names is not None) and (region in names):
+        return region, None, None
+    name, colon, interval = region.rpartition(':')
+    if not colon:
+        return region, None, None
+    start, dash, end = interval.replace(',', '').partition('-')
+    try:
+        start = int(start) - 1
+        end = int(end) if dash else None
+    except ValueError:
+        raise Exception("Invalid region: {0!r}".format(region))
+    if start < 0 or (end is not None and end <= start):
+        raise Exception("Invalid region: {0!r}".format(region))
+    return name, start, end
@@ -0,0 +1,330 @@
+#! /usr/bin/env python3
+
+"""
+A compact nucleotide sequence type, packed 4 bases to a byte.
+"""
+
+import translate
+
+# Maps the bases (upper or lower-case) to their 2-bit codes: A, C, G and T or
+# U are 0, 1, 2 and 3, which is the order of the codon indices of
+# `translate.codon_indices`. Every other byte maps to 4.
+_CODE_TABLE = bytearray([4]) * 256
+for _code, _bases in enumerate(('Aa', 'Cc', 'Gg', 'TtUu')):
+    for _base in _bases:
+        _CODE_TABLE[ord(_base)] = _code
+_CODE_TABLE = bytes(_CODE_TABLE)
+
+# Shift the code of the base at each position of a packed byte into place,
+# first base in the highest bits
+_PACK_TABLES = [bytes((c << (6 - (2 * p))) & 0xFF for c in range(256))
+        for p in range(4)]
+
+# Extract the code of the base at each position of a packed byte
+_UNPACK_TABLES = [bytes((b >> (6 - (2 * p))) & 3 for b in range(256))
+        for p in range(4)]
+
+# Map codes to the uppercase bases of each alphabet
+_LETTER_TABLES = {
+        'RNA' : bytes.maketrans(b'\x00\x01\x02\x03', b'ACGU'),
+        'DNA' : bytes.maketrans(b'\x00\x01\x02\x03', b'ACGT'),
+        }
+
+# Reverse the order of the 4 bases of a packed byte and complement them
+# (the complement of a base's code is 3 minus the code)
+_REVERSE_COMPLEMENT_TABLE = bytes(
+        sum((3 - ((b >> (2 * p)) & 3)) << (6 - (2 * p)) for p in range(4))
+        for b in range(256))
+
+# The codon index tables of `translate` for codes rather than letters
+_CODE_POSITION_TABLES = translate._make_position_tables('\x00\x01\x02\x03')
+
+# The number of bases packed, unpacked or indexed at a time; a multiple of
+# 3 and 4, so chunks stay aligned to bytes and codons
+_CHUNK_SIZE = 3 << 20
+
+
+class Sequence(object):
+    """
+    A DNA or RNA sequence, packed 4 bases to a byte.
+
+    The sequence is vetted once, when it is created, and stored in a quarter
+    of the memory of a `str`. Its reverse and complement is built (by
+    reversing and complementing the packed bytes) the first time it is
+    needed, and then cached.
+
+    A `Sequence` can be passed to the functions of `translate` and
+    `find_orf` in place of a `str`: codon indices are computed straight
+    from the packed bases, so nothing is unpacked for a whole sequence,
+    and `translate.reverse_and_complement` returns the cached reverse and
+    complement. Slicing (like `view` and `frame`) returns a zero-copy
+    `SequenceView`, which can be passed to the same functions, and `str`
+    and `bytes` unpack the bases as uppercase ASCII.
+
+    Parameters
+    ----------
+    sequence : str, bytes, bytearray or memoryview
+        A DNA or RNA sequence (upper or lower-case). It cannot mix T and U.
+    alphabet : str or None
+        'DNA' or 'RNA', the alphabet the sequence is converted to by `str`
+        and `bytes`. By default, 'DNA' if `sequence` has a T and 'RNA'
+        otherwise.
+
+    Examples
+    --------
+    >>> seq = Sequence('augGCUu')
+    >>> seq
+    Sequence('AUGGCUU')
+    >>> seq.reverse_complement()
+    Sequence('AAGCCAU')
+    >>> seq[1:5]
+    SequenceView('UGGC')
+    >>> str(seq.frame(1)[::3])
+    'UC'
+    >>> seq.nbytes
+    2
+    """
+
+    __slots__ = ('_packed', '_length', 'alphabet', '_reverse_complement')
+
+    def __init__(self, sequence, alphabet = None):
+        if isinstance(sequence, str):
+            if not sequence.isascii():
+                raise Exception("Invalid sequence: {0!r}".format(sequence))
+            sequence = sequence.encode('ascii')
+        pieces = []
+        has_t = has_u = False
+        for i in range(0, len(sequence), _CHUNK_SIZE):
+            chunk = bytes(sequence[i:i + _CHUNK_SIZE])
+            codes = chunk.translate(_CODE_TABLE)
+            if codes.find(4) >= 0:
+                raise Exception("Invalid sequence: {0!r}".format(
+                        chunk.decode('ascii', 'replace')))
+            has_t = has_t or (b'T' in chunk) or (b't' in chunk)
+            has_u = has_u or (b'U' in chunk) or (b'u' in chunk)
+            pieces.append(_pack(codes))
+        # Don't allow mixing of DNA and RNA
+        if has_t and has_u:
+            raise Exception("Invalid sequence: it has both T and U bases")
+        if alphabet is None:
+            alphabet = 'DNA' if has_t else 'RNA'
+        self._init(b"".join(pieces), len(sequence), alphabet)
+
+    def _init(self, packed, length, alphabet):
+        if alphabet.upper() not in _LETTER_TABLES:
+            raise ValueError("Unknown alphabet: {0!r}".format(alphabet))
+        self._packed = packed
+        self._length = length
+        self.alphabet = alphabet.upper()
+        self._reverse_complement = None
+
+    @classmethod
+    def _from_packed(cls, packed, length, alphabet):
+        sequence = cls.__new__(cls)
+        sequence._init(packed, length, alphabet)
+        return sequence
+
+    @property
+    def nbytes(self):
+        """The number of bytes holding the packed bases."""
+        return len(self._packed)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        return _getitem(self, 0, self._length, key)
+
+    def __bytes__(self):
+        return self._unpack(0, self._length)
+
+    def __str__(self):
+        return self._unpack(0, self._length).decode('ascii')
+
+    def encode(self, alphabet = None):
+        """
+        Return the bases as uppercase ASCII `bytes` of `alphabet` ('DNA' or
+        'RNA'; by default, the sequence's own).
+        """
+        return self._unpack(0, self._length, alphabet)
+
+    def __repr__(self):
+        return 'Sequence({0!r})'.format(str(self))
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return (self._length, self._packed, self.alphabet) == (
+                other._length, other._packed, other.alphabet)
+
+    def __hash__(self):
+        return hash((self._length, self._packed, self.alphabet))
+
+    def _unpack_codes(self, start, end):
+        # Return the 2-bit codes of bases [start, end) as one byte each
+        if start >= end:
+            return b''
+        first, last = start // 4, (end + 3) // 4
+        packed = self._packed[first:last]
+        codes = bytearray(4 * len(packed))
+        for position, table in enumerate(_UNPACK_TABLES):
+            codes[position::4] = packed.translate(table)
+        offset = start - (4 * first)
+        return bytes(codes[offset:offset + (end - start)])
+
+    def _unpack(self, start, end, alphabet = None):
+        # Return bases [start, end) as uppercase ASCII
+        return self._unpack_codes(start, end).translate(
+                _LETTER_TABLES[(alphabet or self.alphabet).upper()])
+
+    def _codon_indices(self, start, end):
+        # Return the codon indices of the complete codons of bases
+        # [start, end)
+        pieces = []
+        for i in range(start, end - 2, _CHUNK_SIZE):
+            codes = self._unpack_codes(i, min(i + _CHUNK_SIZE, end))
+            pieces.append(translate._pack_codons(codes, 0,
+                    _CODE_POSITION_TABLES))
+        return b"".join(pieces)
+
+    def codon_indices(self, frame = 0):
+        """
+        Return the indices of the complete codons in `frame`, as
+        `translate.codon_indices` does for the unpacked sequence.
+        """
+        return self._codon_indices(frame, self._length)
+
+    def reverse_complement(self):
+        """Return the reverse and complement of the sequence (cached)."""
+        if self._reverse_complement is None:
+            packed = self._packed[::-1].translate(_REVERSE_COMPLEMENT_TABLE)
+            padding = (-self._length) % 4
+            if padding:
+                # The complemented padding bases are now at the start, so
+                # shift every base 2 bits to the left for each of them
+                packed = _shift_left(packed, 2 * padding)
+            self._reverse_complement = Sequence._from_packed(packed,
+                    self._length, self.alphabet)
+            self._reverse_complement._reverse_complement = self
+        return self._reverse_complement
+
+    def view(self, start = 0, end = None):
+        """Return a zero-copy `SequenceView` of bases [start, end)."""
+        start, end, step = slice(start, end).indices(self._length)
+        return SequenceView(self, start, max(start, end))
+
+    def frame(self, frame):
+        """
+        Return a zero-copy `SequenceView` from base `frame` on, so the codons
+        of its first reading frame are those of `frame` of the sequence.
+        """
+        return self.view(frame)
+
+
+class SequenceView(object):
+    """
+    A zero-copy view of bases [start, end) of a `Sequence`.
+
+    A view supports the same operations as a `Sequence` (and can be passed
+    to the same functions), reading the packed bases of `sequence`.
+    """
+
+    __slots__ = ('sequence', 'start', 'end')
+
+    def __init__(self, sequence, start, end):
+        self.sequence = sequence
+        self.start = start
+        self.end = end
+
+    @property
+    def alphabet(self):
+        return self.sequence.alphabet
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, key):
+        return _getitem(self.sequence, self.start, self.end, key)
+
+    def __bytes__(self):
+        return self.sequence._unpack(self.start, self.end)
+
+    def __str__(self):
+        return bytes(self).decode('ascii')
+
+    def encode(self, alphabet = None):
+        """
+        Return the bases as uppercase ASCII `bytes` of `alphabet` ('DNA' or
+        'RNA'; by default, the sequence's own).
+        """
+        return self.sequence._unpack(self.start, self.end, alphabet)
+
+    def __repr__(self):
+        return 'SequenceView({0!r})'.format(str(self))
+
+    def codon_indices(self, frame = 0):
+        """
+        Return the indices of the complete codons in `frame` of the view.
+        """
+        return self.sequence._codon_indices(self.start + frame, self.end)
+
+    def reverse_complement(self):
+        """
+        Return the reverse and complement of the view, as a view of the
+        (cached) reverse and complement of `sequence`.
+        """
+        n = len(self.sequence)
+        return SequenceView(self.sequence.reverse_complement(),
+                n - self.end, n - self.start)
+
+    def view(self, start = 0, end = None):
+        """Return a zero-copy `SequenceView` of bases [start, end)."""
+        start, end, step = slice(start, end).indices(len(self))
+        return SequenceView(self.sequence, self.start + start,
+                self.start + max(start, end))
+
+    def frame(self, frame):
+        """Return a zero-copy `SequenceView` from base `frame` on."""
+        return self.view(frame)
+
+
+def _getitem(sequence, start, end, key):
+    # Index or slice bases [start, end) of `sequence`
+    if isinstance(key, slice):
+        first, last, step = key.indices(end - start)
+        if step == 1:
+            return SequenceView(sequence, start + first,
+                    start + max(first, last))
+        return Sequence(sequence._unpack(start, end)[key],
+                alphabet = sequence.alphabet)
+    if key < 0:
+        key += end - start
+    if not (0 <= key < end - start):
+        raise IndexError("Sequence index out of range")
+    return sequence._unpack(start + key, start + key + 1).decode('ascii')
+
+
+def _pack(codes):
+    # Pack 2-bit codes (one per byte) 4 to a byte, padding the last byte
+    # with zeros. The codes of each position are shifted with a translation
+    # table and the positions are added as big integers, which never carry
+    # as each position has its own 2 bits.
+    codes += b'\x00' * ((-len(codes)) % 4)
+    n = len(codes) // 4
+    packed = 0
+    for position, table in enumerate(_PACK_TABLES):
+        packed += int.from_bytes(codes[position::4].translate(table), 'big')
+    return packed.to_bytes(n, 'big')
+
+
+def _shift_left(packed, bits, chunk_size = 1 << 20):
+    # Shift the bits of `packed` left by `bits` (< 8), a chunk at a time,
+    # filling the end with zeros
+    shifted = bytearray(len(packed))
+    for i in range(0, len(packed), chunk_size):
+        n = min(chunk_size, len(packed) - i)
+        value = int.from_bytes(packed[i:i + n + 1].ljust(n + 1, b'\x00'),
+                'big')
+        value = ((value << bits) >> 8) & ((1 << (8 * n)) - 1)
+        shifted[i:i + n] = value.to_bytes(n, 'big')
+    return bytes(shifted)
@@ -0,0 +1,653 @@
+#! /usr/bin/env python3
+
+"""
+A long-running server of ORF and peptide searches, and a client for it.
+
+Short-lived jobs pay for starting the interpreter and compiling genetic
+codes and ORF finders on every run. The server pays for them once: it
+compiles the standard genetic code and ORF finder when it starts, and keeps
+every genetic code and finder it is asked for compiled (see
+`translate.compile_genetic_code` and `find_orf.find_first_orf`).
+
+Requests are JSON objects naming an operation ('find_first_orf' or
+'get_longest_peptide') and its arguments. Requests that arrive together
+(from any number of connections) are collected by a `Batcher`, and each
+group of them with the same arguments is searched with a single call of
+`find_orf.find_first_orfs` or `translate.longest_peptide_many`.
+
+The server listens on a Unix domain socket, taking one request per line
+(and answering with one response per line), or on a localhost HTTP port,
+taking each request as the body of a POST to '/<operation>':
+
+    $ python3 server.py --unix /tmp/orf.sock
+    $ python3 server.py --http 8765
+
+The server has no authentication or encryption: anyone who can connect to
+it can make it search. HTTP is served on 127.0.0.1 unless another host is
+given, and the server must not be exposed beyond the local machine.
+
+A `Client` sends its calls to a server, and makes them in-process (as the
+same functions would) if there is no server to connect to:
+
+>>> with Client(None) as client:
+...     client.find_first_orf('CCAUGUAA')
+'AUGUAA'
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import queue
+import socket
+import ipaddress
+import threading
+import collections
+import socketserver
+import http.client
+import http.server
+import concurrent.futures
+
+import find_orf
+import translate
+import genetic_codes
+
+# The environment variable holding the default address of a `Client`
+ADDRESS_VARIABLE = 'ORF_SERVER'
+
+# The host of an HTTP address that does not give one
+DEFAULT_HTTP_HOST = '127.0.0.1'
+
+DEFAULT_START_CODONS = ('AUG',)
+DEFAULT_STOP_CODONS = ('UAA', 'UAG', 'UGA')
+
+OPERATIONS = ('find_first_orf', 'get_longest_peptide')
+
+_Request = collections.namedtuple('_Request',
+        ['operation', 'parameters', 'sequence', 'future'])
+
+
+def _get_codons(request, name, default):
+    # Return the codons `name` of `request` as a tuple of strings
+    codons = request.get(name, default)
+    if (not isinstance(codons, (list, tuple))) or (not all(
+            isinstance(codon, str) for codon in codons)):
+        raise ValueError("Invalid {0}: {1!r}".format(name, codons))
+    return tuple(codons)
+
+
+def _get_parameters(operation, request):
+    # Return the arguments of `request` (other than the sequence) as a
+    # hashable key, so that requests with the same arguments are batched.
+    # They are checked here, in the caller's thread, so that a malformed
+    # request is answered with an error rather than reaching the worker
+    if operation == 'find_first_orf':
+        return (_get_codons(request, 'start_codons', DEFAULT_START_CODONS),
+                _get_codons(request, 'stop_codons', DEFAULT_STOP_CODONS))
+    if operation == 'get_longest_peptide':
+        code = request.get('genetic_code', genetic_codes.STANDARD)
+        if isinstance(code, dict) and all(isinstance(k, str) and
+                isinstance(v, str) for k, v in code.items()):
+            return tuple(sorted(code.items()))
+        if isinstance(code, int) and not isinstance(code, bool):
+            return code
+        raise ValueError("Invalid genetic code: {0!r}".format(code))
+    raise ValueError("Unknown operation: {0!r}".format(operation))
+
+
+def _search(operation, parameters, sequences, jobs = 1, executor = None):
+    # Make the batched call of `operation` for all of `sequences`
+    if operation == 'find_first_orf':
+        start_codons, stop_codons = parameters
+        return find_orf.find_first_orfs(sequences,
+                start_codons = list(start_codons),
+                stop_codons = list(stop_codons),
+                jobs = jobs,
+                executor = executor)
+    if isinstance(parameters, tuple):
+        parameters = dict(parameters)
+    return list(translate.longest_peptide_many(sequences,
+            translate.compile_genetic_code(parameters)))
+
+
+class Batcher(object):
+    """
+    Collects requests into batches, and searches each batch with one call.
+
+    Requests are queued by `submit`, from any number of threads, and a
+    single worker thread takes them off the queue: it waits for the first
+    request, then for up to `max_delay` seconds more (or until it has
+    `max_batch` requests) for others to join it. By default it does not
+    wait, and a batch is every request queued while the previous batch was
+    searched, so a lone request is not delayed, and batches grow with the
+    load. The requests of a batch
+    are grouped by operation and arguments, and each group is searched with
+    one batched call. If a batched call fails (e.g., because one of its
+    sequences is invalid), its requests are searched one at a time, so that
+    only the requests at fault fail.
+
+    Parameters
+    ----------
+    max_batch : int
+        The most requests in a batch.
+    max_delay : float
+        The most seconds to wait for more requests to join a batch.
+    jobs : int or None
+        The number of processes `find_orf.find_first_orfs` searches a batch
+        with (None for the number of CPUs). With more than one, the
+        processes are started with the batcher, and kept until it is closed.
+    """
+
+    def __init__(self, max_batch = 1024, max_delay = 0.0, jobs = 1):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.jobs = jobs
+        if jobs is None:
+            self.jobs = os.cpu_count() or 1
+        self._executor = None
+        if self.jobs != 1:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.jobs)
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target = self._run,
+                name = 'Batcher', daemon = True)
+        self._thread.start()
+
+    def submit(self, operation, sequence, **arguments):
+        """
+        Queue a call of `operation` ('find_first_orf' or
+        'get_longest_peptide') for `sequence`, and return a
+        `concurrent.futures.Future` of its result.
+
+        The `arguments` are those of the request: `start_codons` and
+        `stop_codons`, or `genetic_code` (a dict or a table ID).
+        """
+        parameters = _get_parameters(operation, arguments)
+        future = concurrent.futures.Future()
+        self._queue.put(_Request(operation, parameters, sequence, future))
+        return future
+
+    def close(self):
+        """
+        Search the requests already queued, then stop the worker (and its
+        processes).
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _run(self):
+        try:
+            self._collect()
+        except BaseException as e:
+            # Fail the requests still queued, rather than leave their
+            # callers waiting on a worker that has stopped
+            while True:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    _set_exception(request.future, e)
+            raise
+
+    def _collect(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    if timeout > 0:
+                        request = self._queue.get(timeout = timeout)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._process_safely(batch)
+                    return
+                batch.append(request)
+            self._process_safely(batch)
+
+    def _process_safely(self, batch):
+        # Process `batch`, failing those of its requests left unanswered if
+        # processing it fails, so that one bad batch does not stop the
+        # worker
+        try:
+            self._process(batch)
+        except Exception as e:
+            for request in batch:
+                _set_exception(request.future, e)
+
+    def _process(self, batch):
+        self.batches += 1
+        self.requests += len(batch)
+        groups = collections.OrderedDict()
+        for request in batch:
+            try:
+                groups.setdefault((request.operation, request.parameters),
+                        []).append(request)
+            except Exception as e:
+                _set_exception(request.future, e)
+        for (operation, parameters), requests in groups.items():
+            try:
+                self._process_group(operation, parameters, requests)
+            except Exception as e:
+                for request in requests:
+                    _set_exception(request.future, e)
+
+    def _process_group(self, operation, parameters, requests):
+        try:
+            results = _search(operation, parameters,
+                    [r.sequence for r in requests], self.jobs,
+                    self._executor)
+        except Exception:
+            results = None
+        if results is not None:
+            for request, result in zip(requests, results):
+                request.future.set_result(result)
+            return
+        for request in requests:
+            try:
+                result = _search(operation, parameters,
+                        [request.sequence])[0]
+            except Exception as e:
+                request.future.set_exception(e)
+            else:
+                request.future.set_result(result)
+
+
+def _set_exception(future, exception):
+    # Fail `future`, unless it already has a result
+    if not future.done():
+        future.set_exception(exception)
+
+
+def handle_request(batcher, request, timeout = None):
+    """
+    Return the response (a dict) to `request` (a dict, as decoded from
+    JSON), searching it with `batcher`.
+
+    The response is `{'result': ...}`, or `{'error': message}` if the
+    request is invalid or the search fails.
+    """
+    try:
+        arguments = dict(request)
+        operation = arguments.pop('operation')
+        sequence = arguments.pop('sequence')
+        if not isinstance(sequence, str):
+            raise Exception("Invalid sequence: {0!r}".format(sequence))
+        future = batcher.submit(operation, sequence, **arguments)
+        return {'result' : future.result(timeout)}
+    except KeyError as e:
+        return {'error' : "Missing request field: {0}".format(e)}
+    except Exception as e:
+        return {'error' : str(e)}
+
+
+def warm_up():
+    """
+    Compile the standard genetic code and ORF finder, so that the first
+    requests for them do not pay for it.
+    """
+    genetic_codes.get_genetic_code(genetic_codes.STANDARD)
+    find_orf._get_orf_finder(DEFAULT_START_CODONS, DEFAULT_STOP_CODONS)
+
+
+class _UnixRequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line, answered by one JSON response per line
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+            except ValueError as e:
+                response = {'error' : "Invalid request: {0}".format(e)}
+            else:
+                response = handle_request(self.server.batcher, request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+
+class _HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    # A JSON request as the body of a POST to '/<operation>'. The headers
+    # and body of a response are written separately, so Nagle's algorithm
+    # would hold the body back until the client acknowledged the headers
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        operation = self.path.strip('/')
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            request['operation'] = operation
+        except (ValueError, TypeError) as e:
+            response = {'error' : "Invalid request: {0}".format(e)}
+        else:
+            response = handle_request(self.server.batcher, request)
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(400 if 'error' in response else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+if hasattr(socket, 'AF_UNIX'):
+    class _UnixServer(socketserver.ThreadingMixIn,
+            socketserver.UnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+
+def parse_address(address):
+    """
+    Return `address` as `('unix', path)` or `('http', (host, port))`.
+
+    An address is the path of a Unix domain socket, or 'host:port' (or
+    'http://host:port', or a `(host, port)` tuple) for HTTP. The host
+    defaults to `DEFAULT_HTTP_HOST` (e.g., for ':8765').
+
+    Examples
+    --------
+    >>> parse_address('/tmp/orf.sock')
+    ('unix', '/tmp/orf.sock')
+    >>> parse_address('http://localhost:8765')
+    ('http', ('localhost', 8765))
+    >>> parse_address(':8765')
+    ('http', ('127.0.0.1', 8765))
+    """
+    if isinstance(address, tuple):
+        return 'http', (address[0] or DEFAULT_HTTP_HOST, int(address[1]))
+    if address.startswith('http://'):
+        address = address[len('http://'):].rstrip('/')
+    elif os.sep in address or ':' not in address:
+        return 'unix', address
+    host, port = address.rsplit(':', 1)
+    return 'http', (host or DEFAULT_HTTP_HOST, int(port))
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _remove_stale_socket(path):
+    # Remove the socket left at `path` by an earlier server, refusing to
+    # remove anything else
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError("Not a socket, so not replacing it: "
+                "{0!r}".format(path))
+    os.remove(path)
+
+
+def make_server(address, max_batch = 1024, max_delay = 0.0, jobs = 1):
+    """
+    Return a threading server of requests at `address` (see
+    `parse_address`), whose `batcher` attribute is the `Batcher` that
+    searches them. Start it with `serve_forever`, and stop it with
+    `shutdown` and `server_close`.
+    """
+    kind, address = parse_address(address)
+    if kind == 'unix':
+        _remove_stale_socket(address)
+        server = _UnixServer(address, _UnixRequestHandler)
+    else:
+        server = _HTTPServer(address, _HTTPRequestHandler)
+    server.batcher = Batcher(max_batch = max_batch, max_delay = max_delay,
+            jobs = jobs)
+    warm_up()
+    return server
+
+
+class Client(object):
+    """
+    A client of a server at `address`, that falls back to in-process calls.
+
+    The methods take the same arguments as the functions they are named
+    after. If the server cannot be reached (or `address` is None), the
+    call is made in-process instead, unless `fallback` is False, in which
+    case the `OSError` is raised. The server is tried again on the next
+    call. Invalid requests raise an `Exception` with the server's message.
+
+    A client can be shared by threads, but its calls are sent one at a
+    time over one connection; use a client per thread for concurrent
+    requests.
+
+    Parameters
+    ----------
+    address : str, tuple or None
+        The address of the server (see `parse_address`). By default, the
+        value of the ORF_SERVER environment variable, if it is set.
+    timeout : float or None
+        The seconds to wait to connect and for each response.
+    fallback : bool
+        Whether to make calls in-process when the server cannot be reached.
+    """
+
+    _default = object()
+
+    def __init__(self, address = _default, timeout = None, fallback = True):
+        if address is Client._default:
+            address = os.environ.get(ADDRESS_VARIABLE) or None
+        self.address = None if address is None else parse_address(address)
+        self.timeout = timeout
+        self.fallback = fallback
+        self._connection = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the connection to the server."""
+        with self._lock:
+            self._disconnect()
+
+    def _disconnect(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self):
+        kind, address = self.address
+        if kind == 'unix':
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(address)
+            except OSError:
+                connection.close()
+                raise
+            self._connection = connection
+            self._reader = connection.makefile('rb')
+        else:
+            self._connection = http.client.HTTPConnection(*address,
+                    timeout = self.timeout)
+
+    def _send(self, operation, request):
+        # Return the server's response to `request`
+        kind, address = self.address
+        if self._connection is None:
+            self._connect()
+        if kind == 'unix':
+            request = dict(request, operation = operation)
+            self._connection.sendall(json.dumps(request).encode('utf-8') +
+                    b"\n")
+            line = self._reader.readline()
+            if not line:
+                raise ConnectionResetError("The server closed the connection")
+            return json.loads(line.decode('utf-8'))
+        self._connection.request('POST', '/' + operation,
+                body = json.dumps(request).encode('utf-8'),
+                headers = {'Content-Type' : 'application/json'})
+        return json.loads(self._connection.getresponse().read().decode(
+                'utf-8'))
+
+    def _call(self, operation, request, local):
+        if self.address is not None:
+            with self._lock:
+                try:
+                    response = self._send(operation, request)
+                except (OSError, http.client.HTTPException):
+                    self._disconnect()
+                    if not self.fallback:
+                        raise
+                else:
+                    if 'error' in response:
+                        raise Exception(response['error'])
+                    return response['result']
+        return local()
+
+    def find_first_orf(self, sequence,
+            start_codons = ['AUG'],
+            stop_codons = ['UAA', 'UAG', 'UGA']):
+        """Return the first ORF of `sequence`; see `find_orf.find_first_orf`."""
+        return self._call('find_first_orf', {
+                'sequence' : _as_str(sequence),
+                'start_codons' : list(start_codons),
+                'stop_codons' : list(stop_codons)},
+                lambda: find_orf.find_first_orf(sequence,
+                        start_codons = start_codons,
+                        stop_codons = stop_codons))
+
+    def get_longest_peptide(self, rna_sequence,
+            genetic_code = genetic_codes.STANDARD):
+        """
+        Return the longest peptide of `rna_sequence`; see
+        `translate.get_longest_peptide`. The `genetic_code` is a dict, the
+        ID of an NCBI translation table, or a `translate.CompiledGeneticCode`
+        (one of the NCBI tables, or one whose only start codon is AUG, as
+        the server compiles dicts with).
+        """
+        if self.address is not None:
+            genetic_code = _encode_genetic_code(genetic_code)
+        return self._call('get_longest_peptide', {
+                'sequence' : _as_str(rna_sequence),
+                'genetic_code' : genetic_code},
+                lambda: translate.get_longest_peptide(rna_sequence,
+                        genetic_code))
+
+
+def _encode_genetic_code(genetic_code):
+    # Return `genetic_code` as a value a request can hold: a table ID or a
+    # dict
+    if isinstance(genetic_code, (int, dict)):
+        return genetic_code
+    if not isinstance(genetic_code, translate.CompiledGeneticCode):
+        raise ValueError("Invalid genetic code: {0!r}".format(genetic_code))
+    for table_id in genetic_codes.get_table_ids():
+        if genetic_codes.get_genetic_code(table_id) is genetic_code:
+            return table_id
+    if genetic_code.start_codons != frozenset(DEFAULT_START_CODONS):
+        raise ValueError("A compiled genetic code with start codons {0!r} "
+                "cannot be sent to a server; pass a table ID or a dict "
+                "instead".format(sorted(genetic_code.start_codons)))
+    return dict(genetic_code.genetic_code)
+
+
+def _as_str(sequence):
+    if isinstance(sequence, str):
+        return sequence
+    if hasattr(sequence, 'codon_indices'):
+        return str(sequence)
+    return bytes(sequence).decode('ascii', 'replace')
+
+
+def main(argv = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+            description = 'Serve ORF and peptide searches.')
+    group = parser.add_mutually_exclusive_group(required = True)
+    group.add_argument('--unix',
+            metavar = 'PATH',
+            help = 'Listen on a Unix domain socket at this path.')
+    group.add_argument('--http',
+            metavar = '[HOST:]PORT',
+            help = ('Listen for HTTP requests on this port, of this host '
+                    '(default: {0}). The server has no authentication, so '
+                    'it must not be exposed beyond the local '
+                    'machine.'.format(DEFAULT_HTTP_HOST)))
+    parser.add_argument('--max-batch',
+            type = int,
+            default = 1024,
+            help = 'The most requests searched in a batch. Default: 1024.')
+    parser.add_argument('--max-delay',
+            type = float,
+            default = 0.0,
+            help = ('The most seconds to wait for requests to join a '
+                    'batch. Default: 0.'))
+    parser.add_argument('-j', '--jobs',
+            type = int,
+            default = 1,
+            help = ('The number of processes to search each batch of ORF '
+                    'requests with. Use 0 for the number of CPUs. '
+                    'Default: 1.'))
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error('The number of jobs cannot be negative')
+
+    address = args.unix
+    if args.http:
+        if ':' not in args.http:
+            args.http = ':' + args.http
+        address = parse_address(args.http)[1]
+        if not _is_loopback(address[0]):
+            sys.stderr.write("Warning: serving on {0}, which is not a "
+                    "loopback address; the server has no authentication, "
+                    "so anyone who can reach it can use it\n".format(
+                            address[0]))
+    server = make_server(address,
+            max_batch = args.max_batch,
+            max_delay = args.max_delay,
+            jobs = args.jobs or None)
+    sys.stderr.write("Listening on {0}\n".format(args.unix or
+            "{0}:{1}".format(*address)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#! /usr/bin/env python3
+
+"""
+Per-stage timing and counters for `find_orf.py` and `translate.py`.
+
+Collection is off by default. The instrumented functions call `start` once
+per call, which returns None unless a collector is set, and only time and
+count their work (with `stop`) when it is not None, so they cost next to
+nothing when collection is off. Turn it on with `enable` (or the
+`collecting` context manager):
+
+>>> import find_orf
+>>> with collecting() as collector:
+...     orf = find_orf.find_first_orf('CCAUGUAA')
+>>> collector.stages['search'].counters
+{'bytes': 8, 'codons': 6, 'orfs': 1}
+
+The stages are:
+
+parse
+    Reading records (or chunks) from a file (`bytes`, `records`).
+vet
+    Vetting sequences and codons (`bytes`).
+normalize
+    Vetting and normalizing sequences to uppercase RNA (`bytes`).
+search
+    Searching for ORFs, after normalization (`bytes`, `codons` scanned,
+    `orfs` found).
+translate
+    Finding longest peptides (`bytes`, `codons` translated, `peptides`).
+cache
+    Looking up results in a `result_cache.ResultCache` (`hits`,
+    `misses`).
+"""
+
+import sys
+import json
+import time
+import threading
+import contextlib
+import collections
+
+# The `Stats` that the instrumented functions record to, or None
+collector = None
+
+
+class Stage(object):
+    """The number of calls, wall time and counters of one stage."""
+
+    __slots__ = ('calls', 'seconds', 'counters')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.counters = {}
+
+    def as_dict(self):
+        result = collections.OrderedDict((
+                ('calls', self.calls),
+                ('seconds', self.seconds),
+                ))
+        result.update(sorted(self.counters.items()))
+        return result
+
+
+class Stats(object):
+    """
+    Totals of the wall time and counters recorded for each stage.
+
+    Every call of `record` is also passed to each hook (see `add_hook`), so
+    the numbers can be fed to another metrics system as they are recorded.
+
+    Parameters
+    ----------
+    hooks : iterable of callables
+        Functions to call as `hook(stage, seconds, counters)` for every
+        record, where `counters` is a dict.
+    """
+
+    def __init__(self, hooks = ()):
+        self.stages = collections.OrderedDict()
+        self.hooks = list(hooks)
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Call `hook(stage, seconds, counters)` for every record."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def record(self, stage, seconds = 0.0, calls = 1, **counters):
+        """Add `seconds` and `counters` to the totals of `stage`."""
+        with self._lock:
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = Stage()
+            totals.calls += calls
+            totals.seconds += seconds
+            for name, count in counters.items():
+                totals.counters[name] = totals.counters.get(name, 0) + count
+        for hook in self.hooks:
+            hook(stage, seconds, counters)
+
+    def merge(self, stages):
+        """
+        Add the totals of `stages` (as returned by `as_dict`, e.g., from
+        another process) to these. Each stage is passed to the hooks once,
+        with its totals.
+        """
+        for stage, totals in stages.items():
+            counters = dict(totals)
+            calls = counters.pop('calls')
+            seconds = counters.pop('seconds')
+            self.record(stage, seconds, calls = calls, **counters)
+
+    def as_dict(self):
+        """Return the totals as a dict of dicts, keyed by stage."""
+        with self._lock:
+            return collections.OrderedDict((stage, totals.as_dict())
+                    for stage, totals in self.stages.items())
+
+    def format(self):
+        """Return the totals as a human-readable table."""
+        lines = ["{0:<10} {1:>9} {2:>10} {3:>14} {4:>14}  {5}".format(
+                "stage", "calls", "seconds", "bytes", "bytes/s", "counters")]
+        for stage, totals in self.as_dict().items():
+            counters = dict(totals)
+            calls = counters.pop('calls')
+            seconds = counters.pop('seconds')
+            n = counters.pop('bytes', None)
+            rate = ''
+            if (n is not None) and (seconds > 0):
+                rate = "{0:,.0f}".format(n / seconds)
+            lines.append("{0:<10} {1:>9,} {2:>10.6f} {3:>14} {4:>14}  {5}".format(
+                    stage, calls, seconds,
+                    '' if n is None else "{0:,}".format(n), rate,
+                    " ".join("{0}={1:,}".format(k, v)
+                            for k, v in sorted(counters.items()))))
+        return "\n".join(line.rstrip() for line in lines) + "\n"
+
+    def write(self, stream = None, format = 'text'):
+        """
+        Write the totals to `stream` (standard error by default) as a 'text'
+        table or as 'json'.
+        """
+        if stream is None:
+            stream = sys.stderr
+        if format == 'json':
+            stream.write(json.dumps(self.as_dict(), indent = 1) + "\n")
+        elif format == 'text':
+            stream.write(self.format())
+        else:
+            raise ValueError("Unknown stats format: {0!r}".format(format))
+
+
+def enable(stats = None):
+    """
+    Start recording to `stats` (a new `Stats` by default), and return it.
+    """
+    global collector
+    collector = Stats() if stats is None else stats
+    return collector
+
+
+def disable():
+    """Stop recording, and return the `Stats` recorded to (or None)."""
+    global collector
+    stats, collector = collector, None
+    return stats
+
+
+@contextlib.contextmanager
+def collecting(stats = None):
+    """
+    Record to `stats` (a new `Stats` by default) within a `with` block,
+    then restore the previous collector.
+    """
+    global collector
+    previous = collector
+    current = enable(stats)
+    try:
+        yield current
+    finally:
+        collector = previous
+
+
+def start():
+    """
+    Return the time to pass to `stop`, or None if collection is off.
+    """
+    if collector is None:
+        return None
+    return time.perf_counter()
+
+
+def stop(stage, started, **counters):
+    """
+    Record the time since `started` (as returned by `start`), and
+    `counters`, to `stage` of the current collector.
+    """
+    current = collector
+    if current is not None:
+        current.record(stage, time.perf_counter() - started, **counters)
+
+
+def iter_timed(stage, iterable, counters):
+    """
+    Generate the items of `iterable`, recording the time taken to produce
+    each to `stage` of the current collector, with the counters returned
+    by `counters(item)` (a dict).
+
+    If collection is off when this is called, `iterable` is returned as is.
+    """
+    if collector is None:
+        return iterable
+    return _iter_timed(stage, iterable, counters)
+
+
+def _iter_timed(stage, iterable, counters):
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        seconds = time.perf_counter() - started
+        current = collector
+        if current is not None:
+            current.record(stage, seconds, **counters(item))
+        yield item
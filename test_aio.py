@@ -0,0 +1,170 @@
+#! /usr/bin/env python3
+
+import os
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+import concurrent.futures
+
+import test_util
+import aio
+import find_orf
+import translate
+import seqio
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    # Records the most calls submitted but not yet finished at a time
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outstanding = 0
+        self.most_outstanding = 0
+        self.calls = 0
+        self._count_lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        with self._count_lock:
+            self.calls += 1
+            self.outstanding += 1
+            self.most_outstanding = max(self.most_outstanding,
+                    self.outstanding)
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._count_lock:
+            self.outstanding -= 1
+
+
+class TestAioBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for f in range(12):
+            path = os.path.join(self.temp_dir, "{0}.fasta".format(f))
+            with open(path, 'w') as stream:
+                for i in range(30):
+                    stream.write(">r{0}_{1}\nCC{2}UAAGG\n".format(f, i,
+                            'AUG' * ((f + i) % 5)))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def expected(self, path, function):
+        return [(record, function(record.sequence))
+                for record in seqio.iter_records(path)]
+
+
+class TestAio(TestAioBaseClass):
+    def test_single_calls(self):
+        async def run():
+            return await asyncio.gather(
+                    aio.find_first_orf('CCAUGUAA'),
+                    aio.find_first_orf('CCAUGUAA', ['CCA'], ['UGU']),
+                    aio.get_longest_peptide('AUGGUACAUUAA'),
+                    aio.get_longest_peptide('AUAUGAAGA', 2))
+        self.assertEqual(asyncio.run(run()),
+                ['AUGUAA', 'CCAUGU', 'MVH', 'MW'])
+
+    def test_iter_records(self):
+        async def run():
+            return [r async for r in aio.iter_records(self.paths[0],
+                    batch_bases = 20)]
+        self.assertEqual(asyncio.run(run()),
+                list(seqio.iter_records(self.paths[0])))
+
+    def test_iter_first_orfs(self):
+        async def run():
+            return [x async for x in aio.iter_first_orfs(self.paths[1],
+                    batch_bases = 40)]
+        self.assertEqual(asyncio.run(run()),
+                self.expected(self.paths[1], find_orf.find_first_orf))
+
+    def test_iter_longest_peptides(self):
+        async def run():
+            return [x async for x in aio.iter_longest_peptides(self.paths[2],
+                    genetic_code = 2, batch_bases = 40)]
+        self.assertEqual(asyncio.run(run()), self.expected(self.paths[2],
+                lambda s: translate.get_longest_peptide(s, 2)))
+
+    def test_iter_paths(self):
+        executor = CountingExecutor(4)
+        async def run():
+            return [x async for x in aio.iter_paths(self.paths,
+                    max_concurrency = 3, max_pending = 2, batch_bases = 30,
+                    executor = executor)]
+        with executor:
+            results = asyncio.run(run())
+        self.assertEqual(sorted(results), sorted((path, record, orf)
+                for path in self.paths
+                for record, orf in self.expected(path,
+                        find_orf.find_first_orf)))
+        for path in self.paths:
+            self.assertEqual([(r, o) for p, r, o in results if p == path],
+                    self.expected(path, find_orf.find_first_orf))
+        self.assertLessEqual(executor.most_outstanding, 3 * 2)
+        self.assertGreater(executor.calls, len(self.paths))
+
+    def test_iter_paths_process_pool(self):
+        async def run(executor):
+            return [x async for x in aio.iter_paths(self.paths[:3],
+                    operation = 'get_longest_peptide', executor = executor)]
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            results = asyncio.run(run(executor))
+        self.assertEqual(len(results), 90)
+        for path, record, peptide in results:
+            self.assertEqual(peptide,
+                    translate.get_longest_peptide(record.sequence, 1))
+
+    def test_iter_paths_errors(self):
+        async def run(paths, **kwargs):
+            return [x async for x in aio.iter_paths(paths, **kwargs)]
+        self.assertRaises(FileNotFoundError, asyncio.run, run(
+                self.paths[:2] + [os.path.join(self.temp_dir, 'missing')]))
+        self.assertRaises(ValueError, asyncio.run, run(self.paths,
+                operation = 'translate'))
+        self.assertRaises(ValueError, asyncio.run, run(self.paths,
+                max_concurrency = 0))
+        self.assertRaises(TypeError, asyncio.run, run(self.paths,
+                revrese = True))
+        self.assertRaises(TypeError, asyncio.run, run(self.paths,
+                operation = 'get_longest_peptide', stop_codons = ['UAA']))
+
+    def test_cancellation(self):
+        seen = []
+        async def consume():
+            async for x in aio.iter_paths(self.paths, batch_bases = 10):
+                seen.append(x)
+                await asyncio.sleep(0)
+        async def run():
+            task = asyncio.ensure_future(consume())
+            while not seen:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            # Let the cancelled workers clean up
+            await asyncio.sleep(0.05)
+            return len(asyncio.all_tasks())
+        self.assertEqual(asyncio.run(run()), 1)
+        self.assertLess(len(seen), 360)
+
+    def test_early_close(self):
+        async def run():
+            results = aio.iter_paths(self.paths, max_concurrency = 2)
+            first = await results.__anext__()
+            await results.aclose()
+            await asyncio.sleep(0.05)
+            return first, len(asyncio.all_tasks())
+        (path, record, orf), tasks = asyncio.run(run())
+        self.assertEqual(orf, find_orf.find_first_orf(record.sequence))
+        self.assertEqual(tasks, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
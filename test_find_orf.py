@@ -1,8 +1,10 @@
 #! /usr/bin/env python3
 
 import unittest
+import concurrent.futures
 
 import test_util
+import seqio
 import find_orf
 
 
@@ -96,6 +98,51 @@ class TestVetCodon(TestFindOrfBaseClass):
         self.run_vet_codon(codon, True)
 
 
+class TestNormalizeSequence(TestFindOrfBaseClass):
+    def run_normalize_sequence(self, sequence, expected_result):
+        self.run_test_of_function(
+                function = find_orf.normalize_sequence,
+                key_word_args = {"sequence" : sequence},
+                expected_result = expected_result)
+
+    def test_rna(self):
+        self.run_normalize_sequence("acguACGU", "ACGUACGU")
+
+    def test_dna(self):
+        self.run_normalize_sequence("acgtACGT", "ACGUACGU")
+
+    def test_empty(self):
+        self.run_normalize_sequence("", "")
+        self.run_normalize_sequence(b"", b"")
+
+    def test_bytes_like(self):
+        self.run_normalize_sequence(b"acgt", b"ACGU")
+        self.run_normalize_sequence(bytearray(b"acgt"), b"ACGU")
+        self.run_normalize_sequence(memoryview(b"acgt"), b"ACGU")
+
+    def test_invalid(self):
+        for seq in ("ACGUT", "ACGN", "ACG ", "AC\u00c9", b"ACGUT", b"ACGN",
+                bytearray(b"acgut")):
+            self.run_test_of_function_raise(
+                    function = find_orf.normalize_sequence,
+                    key_word_args = {"sequence": seq},
+                    expected_exception = Exception)
+
+    def test_in_place(self):
+        for chunk_size in (1, 2, 3, 100):
+            seq = bytearray(b"acgtACGTtt")
+            result = find_orf.normalize_sequence(seq, in_place = True,
+                    chunk_size = chunk_size)
+            self.assertIs(result, seq)
+            self.assertEqual(seq, bytearray(b"ACGUACGUUU"))
+
+    def test_in_place_invalid(self):
+        seq = bytearray(b"acgtACGUtt")
+        self.assertRaises(Exception, find_orf.normalize_sequence, seq,
+                in_place = True, chunk_size = 2)
+        self.assertEqual(seq, bytearray(b"acgtACGUtt"))
+
+
 class TestFindFirstOrf(TestFindOrfBaseClass):
     def test_empty_sequence(self):
         seq = ""
@@ -167,5 +214,223 @@ class TestFindFirstOrf(TestFindOrfBaseClass):
                 stop_codons = ['UUU'])
 
 
+class TestOrfFinder(TestFindFirstOrf):
+    def run_find_first_orf(self, sequence,
+            expected_result,
+            start_codons = ['AUG'],
+            stop_codons = ['UAA', 'UAG', 'UGA']):
+        finder = find_orf.OrfFinder(start_codons, stop_codons)
+        self.run_test_of_function(
+                function = finder.find_first_orf,
+                key_word_args = {"sequence" : sequence},
+                expected_result = expected_result)
+
+    def test_codons_are_normalized(self):
+        finder = find_orf.OrfFinder(['aug', 'AUG'], ['uaa', 'UGA', 'UAA'])
+        self.assertEqual(finder.start_codons, ('AUG',))
+        self.assertEqual(finder.stop_codons, ('UAA', 'UGA'))
+        self.assertEqual(finder._start_table,
+                find_orf.OrfFinder(['AUG'], ['UGA', 'UAA'])._start_table)
+        self.assertEqual(finder._stop_table,
+                find_orf.OrfFinder(['AUG'], ['UGA', 'UAA'])._stop_table)
+
+    def test_many_codons(self):
+        # Every codon but UUU is a start codon; UUU is the only stop codon
+        codons = [a + b + c for a in 'ACGU' for b in 'ACGU' for c in 'ACGU']
+        finder = find_orf.OrfFinder(codons[:-1], ['UUU'])
+        self.assertEqual(finder.find_first_orf('UUUCCCAAAUUUG'),
+                'CCCAAAUUU')
+        self.assertEqual(finder.find_first_orf('UUUUUUUUU'), '')
+        self.assertEqual(finder._start_table.count(1), 63)
+
+    def test_invalid_codon(self):
+        self.assertRaises(Exception, find_orf.OrfFinder, ['ATG'], ['UAA'])
+        self.assertRaises(Exception, find_orf.find_first_orf, 'AUGUAA',
+                ['AUG'], ['UA'])
+
+    def test_adversarial_starts(self):
+        # Many start codons with no stop codon used to make the regex
+        # backtrack quadratically; the scanner takes linear time.
+        seq = 'AUG' * 20000
+        self.run_find_first_orf(seq, '')
+        self.run_find_first_orf(seq + 'UAA', seq + 'UAA')
+
+    def test_start_and_stop_codon(self):
+        # A codon that is both a start and stop codon cannot be an ORF alone
+        self.run_find_first_orf('CUAAGGCUAA', 'UAAGGCUAA',
+                start_codons = ['UAA'], stop_codons = ['UAA'])
+        self.assertEqual(find_orf.find_all_orfs('UAAUAAUAA', ['UAA'],
+                ['UAA'], nested = False),
+                [find_orf.Orf('UAAUAA', '+', 0, 0, 6),
+                        find_orf.Orf('UAAUAA', '+', 0, 3, 9)])
+
+
+class TestFindAllOrfs(TestFindOrfBaseClass):
+    def run_find_all_orfs(self, sequence, expected_result, **kwargs):
+        self.run_test_of_function(
+                function = lambda **kw: [tuple(o)
+                        for o in find_orf.find_all_orfs(**kw)],
+                key_word_args = dict(sequence = sequence, **kwargs),
+                expected_result = expected_result)
+
+    def test_no_orfs(self):
+        self.run_find_all_orfs('', [])
+        self.run_find_all_orfs('AUGAUGAUG', [])
+        self.run_find_all_orfs('UAAUAGUGA', [], reverse = True)
+
+    def test_all_frames(self):
+        seq = 'AUGUAACAUGAUGCCCUAAG'
+        self.run_find_all_orfs(seq, [
+                ('AUGUAA', '+', 0, 0, 6),
+                ('AUGAUGCCCUAA', '+', 1, 7, 19),
+                ('AUGCCCUAA', '+', 1, 10, 19),
+                ])
+        self.run_find_all_orfs(seq, [
+                ('AUGUAA', '+', 0, 0, 6),
+                ('AUGAUGCCCUAA', '+', 1, 7, 19),
+                ], nested = False)
+
+    def test_reverse(self):
+        self.run_find_all_orfs('AUGAUGUAACCUUACAU', [
+                ('AUGAUGUAA', '+', 0, 0, 9),
+                ('AUGUAA', '+', 0, 3, 9),
+                ('AUGUAA', '-', 0, 11, 17),
+                ], reverse = True)
+
+    def test_dna_and_bytes(self):
+        expected_result = [
+                ('AUGUAA', '+', 2, 2, 8),
+                ('AUGUAA', '-', 2, 9, 15),
+                ]
+        self.run_find_all_orfs('ccatgtaacttacatgg', expected_result,
+                reverse = True)
+        self.run_find_all_orfs(b'CCAUGUAACUUACAUGG', expected_result,
+                reverse = True)
+
+    def test_custom_codons(self):
+        self.run_find_all_orfs('CCCAAAGGGUUUAAA', [
+                ('CCCAAAGGGUUU', '+', 0, 0, 12),
+                ('AAAGGGUUU', '+', 0, 3, 12),
+                ], start_codons = ['CCC', 'aaa'], stop_codons = ['UUU'])
+
+    def test_invalid_sequence(self):
+        self.assertRaises(Exception, find_orf.find_all_orfs, 'AUGXUAA')
+
+    def test_matches_find_first_orf(self):
+        seqs = ['CCAUGGUAUAGCC', 'AUGCAUGUAAUGA', 'GAUGAAAUGACUGAUAA',
+                'CAUGUAUGGAUAGGG', 'UAGAUGCCCUGAAUGUAA']
+        for seq in seqs:
+            orfs = find_orf.find_all_orfs(seq)
+            self.assertEqual(orfs[0].sequence if orfs else '',
+                    find_orf.find_first_orf(seq))
+
+    def test_locate_first_orf(self):
+        seqs = ['CCAUGGUAUAGCC', 'AUGCAUGUAAUGA', 'GAUGAAAUGACUGAUAA',
+                'CAUGUAUGGAUAGGG', 'UAGAUGCCCUGAAUGUAA', 'CCC', '']
+        for seq in seqs:
+            orfs = find_orf.find_all_orfs(seq)
+            expected_result = orfs[0] if orfs else None
+            self.assertEqual(find_orf.locate_first_orf(seq), expected_result)
+            self.assertEqual(find_orf.locate_first_orf_in_stream(
+                    [seq[:4], seq[4:]]), expected_result)
+
+
+class TestOrfStreamScanner(TestFindOrfBaseClass):
+    def split(self, sequence, size):
+        return [sequence[i:i + size] for i in range(0, len(sequence), size)]
+
+    def test_matches_find_all_orfs(self):
+        seqs = ['AUGUAACAUGAUGCCCUAAG', 'AUGAUGUAACCUUACAU',
+                'GAUGAAAUGACUGAUAAAUGGGGUGAUGCUAG' * 3, 'ccatgtaacttacatgg']
+        for seq in seqs:
+            for nested in (True, False):
+                expected_result = find_orf.find_all_orfs(seq,
+                        nested = nested)
+                for size in (1, 2, 4, 7, len(seq)):
+                    orfs = find_orf.iter_stream_orfs(self.split(seq, size),
+                            nested = nested)
+                    self.assertEqual(
+                            sorted(orfs, key = lambda orf: orf.start),
+                            expected_result)
+
+    def test_find_first_orf_in_stream(self):
+        seqs = ['CCAUGGUAUAGCC', 'AUGCAUGUAAUGA', 'GAUGAAAUGACUGAUAA',
+                'CAUGUAUGGAUAGGG', 'UAGAUGCCCUGAAUGUAA', 'CCC', '']
+        for seq in seqs:
+            for size in (1, 3, 5):
+                self.assertEqual(find_orf.find_first_orf_in_stream(
+                        self.split(seq, size)),
+                        find_orf.find_first_orf(seq))
+
+    def test_orfs_are_emitted_at_stop_codons(self):
+        scanner = find_orf.OrfStreamScanner()
+        self.assertEqual(scanner.feed('CAUGCC'), [])
+        self.assertEqual(scanner.first_open_start, 1)
+        self.assertEqual(scanner.feed(b'CU'), [])
+        self.assertEqual(scanner.feed('AG'),
+                [find_orf.Orf('AUGCCCUAG', '+', 1, 1, 10)])
+        self.assertEqual(scanner.first_open_start, None)
+        self.assertEqual(scanner.length, 10)
+
+    def test_bounded_memory(self):
+        scanner = find_orf.OrfStreamScanner()
+        for i in range(1000):
+            scanner.feed('CCCGGG' * 10)
+        self.assertLess(len(scanner._buffer), 3)
+        scanner.feed('AUGC')
+        for i in range(100):
+            scanner.feed('CCCGGG' * 10)
+        self.assertEqual(len(scanner._buffer), 6004)
+
+    def test_invalid_sequence(self):
+        scanner = find_orf.OrfStreamScanner()
+        scanner.feed('AUG')
+        self.assertRaises(Exception, scanner.feed, 'AXG')
+        self.assertRaises(Exception, scanner.feed, 'ATG')
+
+
+class TestIterFirstOrfs(TestFindOrfBaseClass):
+    def setUp(self):
+        self.sequences = ['CCAUGUAA', 'AUGCCC', 'ATGTGA', '',
+                'GAUGAAAUGACUGAUAA'] * 20
+        self.expected_result = [find_orf.find_first_orf(s)
+                for s in self.sequences]
+
+    def test_serial(self):
+        self.assertEqual(find_orf.find_first_orfs(self.sequences),
+                self.expected_result)
+        self.assertEqual(find_orf.find_first_orfs(self.sequences,
+                batch_bases = 1), self.expected_result)
+
+    def test_records(self):
+        records = [seqio.Record(str(i), s)
+                for i, s in enumerate(self.sequences)]
+        self.assertEqual(list(find_orf.iter_first_orfs(iter(records),
+                batch_bases = 10)),
+                list(zip(records, self.expected_result)))
+
+    def test_process_pool_order(self):
+        self.assertEqual(find_orf.find_first_orfs(self.sequences,
+                jobs = 2, batch_bases = 7), self.expected_result)
+        self.assertEqual(find_orf.find_first_orfs(['AUGUAAUGCCAUAA'],
+                start_codons = ['CCA'], stop_codons = ['UAA'], jobs = 2),
+                ['CCAUAA'])
+
+    def test_executor(self):
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            for i in range(2):
+                self.assertEqual(find_orf.find_first_orfs(self.sequences,
+                        batch_bases = 7, executor = executor),
+                        self.expected_result)
+            # The executor is left open for later calls
+            self.assertEqual(executor.submit(len, 'AUG').result(), 3)
+
+    def test_invalid_sequence(self):
+        self.assertRaises(Exception, find_orf.find_first_orfs,
+                ['AUGUAA', 'AUGXUAA'], jobs = 2)
+        self.assertRaises(Exception, find_orf.find_first_orfs, ['AUG'],
+                ['AU'])
+
+
 if __name__ == '__main__':
     unittest.main() 
@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+
+import unittest
+
+import test_util
+import genetic_codes
+import translate
+import find_orf
+
+class TestGeneticCodesBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+
+
+class TestGeneticCodes(TestGeneticCodesBaseClass):
+    def test_standard(self):
+        self.run_test_of_function(
+                function = genetic_codes.get_genetic_code_dict,
+                key_word_args = {"table_id" : 1},
+                expected_result = self.genetic_code)
+
+    def test_tables(self):
+        self.assertEqual(genetic_codes.get_table_ids()[:6], [1, 2, 3, 4, 5, 6])
+        for table_id in genetic_codes.get_table_ids():
+            code = genetic_codes.get_genetic_code_dict(table_id)
+            self.assertEqual(len(code), 64)
+            differences = [c for c in code if code[c] != self.genetic_code[c]]
+            self.assertLessEqual(len(differences), 6)
+            self.assertIn('AUG', genetic_codes.get_start_codons(table_id))
+
+    def test_vertebrate_mitochondrial(self):
+        self.run_test_of_function(
+                function = genetic_codes.get_stop_codons,
+                key_word_args = {"table_id" : 2},
+                expected_result = ['UAA', 'UAG', 'AGA', 'AGG'])
+        self.run_test_of_function(
+                function = genetic_codes.get_start_codons,
+                key_word_args = {"table_id" : 2},
+                expected_result = ['AUU', 'AUC', 'AUA', 'AUG', 'GUG'])
+        self.assertEqual(genetic_codes.get_table(2).name,
+                'Vertebrate Mitochondrial')
+
+    def test_unknown_table(self):
+        for table_id in (0, 7, 100, "x", None):
+            self.run_test_of_function_raise(
+                    function = genetic_codes.get_genetic_code,
+                    key_word_args = {"table_id" : table_id},
+                    expected_exception = ValueError)
+
+    def test_compiled_once(self):
+        code = genetic_codes.get_genetic_code(11)
+        self.assertIsInstance(code, translate.CompiledGeneticCode)
+        self.assertIs(genetic_codes.get_genetic_code("11"), code)
+        self.assertIs(translate.compile_genetic_code(11), code)
+        self.assertEqual(code.start_codons,
+                frozenset(genetic_codes.get_start_codons(11)))
+
+    def test_translate_by_id(self):
+        rna_seq = "AUGUGAAGAUAA"
+        self.assertEqual(translate.translate_sequence(rna_seq, 1), "M")
+        self.assertEqual(translate.translate_sequence(rna_seq, 2), "MW")
+        self.assertEqual(translate.translate_sequence(rna_seq, 5), "MWS")
+        self.assertEqual(translate.get_longest_peptide(rna_seq, 1), "M")
+        # GUG is a start codon, and AUA codes for M, in table 2
+        self.assertEqual(translate.get_longest_peptide(rna_seq, 2), "VKM")
+
+    def test_find_orf_with_table_codons(self):
+        rna_seq = "CCGUGAAAAGAGG"
+        self.assertEqual(find_orf.find_first_orf(rna_seq,
+                start_codons = genetic_codes.get_start_codons(2),
+                stop_codons = genetic_codes.get_stop_codons(2)),
+                "GUGAAAAGA")
+
+
+if __name__ == '__main__':
+    unittest.main()
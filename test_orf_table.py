@@ -0,0 +1,142 @@
+#! /usr/bin/env python3
+
+import os
+import shutil
+import random
+import tempfile
+import unittest
+
+import test_util
+import orf_table
+import find_orf
+import translate
+import seqio
+
+class TestOrfTableBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        rng = random.Random(1)
+        self.rows = []
+        for i in range(250):
+            start = rng.randrange(1000)
+            end = start + (3 * rng.randrange(2, 40))
+            self.rows.append(orf_table.OrfRow("seq{0} {1}".format(i,
+                    'x' * (i % 3)), rng.choice('+-'), rng.randrange(3),
+                    start, end, end - start,
+                    'M' + ''.join(rng.choice('ACDEFGHIKLMNPQRSTVWY')
+                            for j in range(((end - start) // 3) - 2))))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, rows, format = 'orfcol', **kwargs):
+        path = os.path.join(self.temp_dir, "orfs.{0}".format(format))
+        with orf_table.OrfTableWriter(path, format = format,
+                **kwargs) as writer:
+            for row in rows:
+                writer.write_row(row.record, row.strand, row.frame,
+                        row.start, row.end, row.peptide)
+        self.assertEqual(writer.num_rows, len(rows))
+        return path
+
+
+class TestOrfTable(TestOrfTableBaseClass):
+    def test_round_trip(self):
+        for batch_rows in (1, 7, 100, 1000):
+            path = self.write(self.rows, batch_rows = batch_rows)
+            with orf_table.OrfTable(path) as table:
+                self.assertEqual(table.format, 'orfcol')
+                self.assertEqual(len(table), len(self.rows))
+                self.assertEqual(list(table.rows()), self.rows)
+                self.assertEqual(list(table.column('record')),
+                        [row.record for row in self.rows])
+                self.assertEqual(table.column('peptide')[-1],
+                        self.rows[-1].peptide)
+                self.assertEqual(list(table.column('length')),
+                        [row.length for row in self.rows])
+                self.assertEqual(list(table.column('strand')),
+                        [1 if row.strand == '+' else -1
+                                for row in self.rows])
+
+    def test_filter(self):
+        path = self.write(self.rows, batch_rows = 64)
+        with orf_table.OrfTable(path) as table:
+            lengths = table.column('length')
+            indices = [i for i in range(len(table)) if lengths[i] >= 60]
+            self.assertEqual(list(table.rows(indices)),
+                    [row for row in self.rows if row.length >= 60])
+            self.assertEqual(list(table.rows(iter(indices[::-1]))),
+                    [self.rows[i] for i in indices[::-1]])
+            self.assertEqual(table.column('peptide').take([-1, 3, 200]),
+                    [self.rows[i].peptide for i in (-1, 3, 200)])
+            del lengths
+
+    def test_empty(self):
+        path = self.write([])
+        with orf_table.OrfTable(path) as table:
+            self.assertEqual(len(table), 0)
+            self.assertEqual(list(table.rows()), [])
+            self.assertEqual(len(table.column('start')), 0)
+            self.assertEqual(list(table.column('peptide')), [])
+
+    def test_text_is_utf8(self):
+        row = orf_table.OrfRow('séq', '-', 1, 3, 9, 6, 'MV')
+        with orf_table.OrfTable(self.write([row])) as table:
+            self.assertEqual(list(table.rows()), [row])
+
+    def test_errors(self):
+        path = os.path.join(self.temp_dir, "orfs.orfcol")
+        self.assertRaises(ValueError, orf_table.OrfTableWriter, path,
+                format = 'csv')
+        with orf_table.OrfTableWriter(path) as writer:
+            self.assertRaises(ValueError, writer.write_row, 'a', '.', 0, 0,
+                    3, '')
+        with open(path, 'wb') as stream:
+            stream.write(b'>seq\nAUGUAA\n' * 10)
+        self.assertRaises(Exception, orf_table.OrfTable, path)
+
+    @unittest.skipUnless(orf_table.pyarrow is not None,
+            "pyarrow is not installed")
+    def test_arrow_round_trip(self):
+        path = self.write(self.rows, format = 'arrow', batch_rows = 100)
+        with orf_table.OrfTable(path) as table:
+            self.assertEqual(table.format, 'arrow')
+            self.assertEqual(list(table.rows()), self.rows)
+
+    def test_write_columnar_orfs(self):
+        path = os.path.join(self.temp_dir, "seqs.fasta")
+        sequences = ['CCAUGGUAUAGCC', 'CCC', 'GAUGAAAUGACUGAUAA',
+                'UAGAUGCCCUGAAUGUAA']
+        with open(path, 'w') as stream:
+            for i, sequence in enumerate(sequences):
+                stream.write(">s{0}\n{1}\n".format(i, sequence))
+        table_path = os.path.join(self.temp_dir, "orfs.orfcol")
+        self.assertEqual(find_orf.write_columnar_orfs(table_path,
+                seqio.iter_records(path), format = 'orfcol'), 3)
+        expected_result = []
+        for i, sequence in enumerate(sequences):
+            orf = find_orf.locate_first_orf(sequence)
+            if orf is not None:
+                expected_result.append(orf_table.OrfRow("s{0}".format(i),
+                        orf.strand, orf.frame, orf.start, orf.end,
+                        len(orf.sequence), translate.translate_sequence(
+                                orf.sequence, 1)))
+        with orf_table.OrfTable(table_path) as table:
+            self.assertEqual(list(table.rows()), expected_result)
+        self.assertEqual(expected_result[0].peptide, 'MV')
+
+    def test_write_columnar_orfs_custom_stop_codons(self):
+        table_path = os.path.join(self.temp_dir, "orfs.orfcol")
+        records = [('a', 'AUGGUACCCGUAUAA'), ('b', 'AUGUAAGGGUAGCC'),
+                ('c', 'CCC')]
+        self.assertEqual(find_orf.write_columnar_orfs(table_path, records,
+                stop_codons = ['CCC', 'UAG'], format = 'orfcol'), 2)
+        with orf_table.OrfTable(table_path) as table:
+            # The peptide ends at the custom stop codon, and reads through
+            # the stop codons of the genetic code that are not stops here
+            self.assertEqual([(row.record, row.peptide)
+                    for row in table.rows()], [('a', 'MV'), ('b', 'M*G')])
+
+
+if __name__ == '__main__':
+    unittest.main()
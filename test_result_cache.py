@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import test_util
+import result_cache
+import translate
+import find_orf
+import seqio
+import sequence
+
+class TestResultCacheBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+class TestResultCache(TestResultCacheBaseClass):
+    def test_keys(self):
+        key = result_cache.make_key('f', 'AUGGUA', ('AUG',))
+        self.assertEqual(len(key), 16)
+        self.assertEqual(result_cache.make_key('f', b'auggua', ('AUG',)), key)
+        self.assertEqual(result_cache.make_key('f',
+                memoryview(b'AUGGUA'), ('AUG',), chunk_size = 4), key)
+        self.assertNotEqual(result_cache.make_key('f', 'AUGGUA', ('GUG',)),
+                key)
+        self.assertNotEqual(result_cache.make_key('g', 'AUGGUA', ('AUG',)),
+                key)
+        self.assertNotEqual(result_cache.make_key('f', 'AUGGUAA', ('AUG',)),
+                key)
+
+    def test_lru_eviction(self):
+        cache = result_cache.ResultCache(maxsize = 2)
+        cache.put(b'a', 'A')
+        cache.put(b'b', 'B')
+        self.assertEqual(cache.get(b'a'), 'A')
+        cache.put(b'c', '')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(b'b'))
+        self.assertEqual(cache.get(b'a'), 'A')
+        self.assertEqual(cache.get(b'c'), '')
+        self.assertEqual(cache.cache_info(),
+                result_cache.CacheInfo(3, 1, 2, 2))
+        cache.clear()
+        self.assertEqual(cache.cache_info(),
+                result_cache.CacheInfo(0, 0, 2, 0))
+
+    def test_persistence(self):
+        path = os.path.join(self.temp_dir, "cache.sqlite")
+        with result_cache.ResultCache(maxsize = 1, path = path,
+                commit_interval = 2) as cache:
+            cache.put(b'a', 'A')
+            cache.put(b'b', 'B')
+            cache.put(b'c', 'C')
+            # Evicted from memory, but read back from the database
+            self.assertEqual(cache.get(b'a'), 'A')
+        with result_cache.ResultCache(path = path) as cache:
+            self.assertEqual([cache.get(k) for k in (b'a', b'b', b'c', b'd')],
+                    ['A', 'B', 'C', None])
+            self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_get_longest_peptide(self):
+        cache = result_cache.ResultCache()
+        rna_seq = "CCAUGAAACCCUAGUUUAUGCCCUAA"
+        expected = translate.get_longest_peptide(rna_seq, self.genetic_code)
+        for seq in (rna_seq, rna_seq.lower(), sequence.Sequence(rna_seq)):
+            self.assertEqual(translate.get_longest_peptide(seq,
+                    self.genetic_code, cache = cache), expected)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        # A different genetic code has a different key
+        code = dict(self.genetic_code, UAG = 'Q')
+        self.assertEqual(translate.get_longest_peptide(rna_seq, code,
+                cache = cache), "MKPQFMP")
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_invalid_sequences_are_not_cached(self):
+        cache = result_cache.ResultCache()
+        for i in range(2):
+            self.assertRaises(Exception, find_orf.find_first_orf, "AUGXUAA",
+                    cache = cache)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 2, 0))
+
+    def test_find_first_orf(self):
+        cache = result_cache.ResultCache()
+        for seq in ("CCAUGUAA", "ccaugUAA", b"CCATGTAA", "CCAUGUAA"):
+            self.assertEqual(find_orf.find_first_orf(seq, cache = cache),
+                    "AUGUAA")
+        self.assertEqual(find_orf.find_first_orf("CCAUGUAA", ['CCA'],
+                ['UGU'], cache = cache), "CCAUGU")
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def test_iter_first_orfs(self):
+        sequences = ["CCAUGUAA", "AUGCCC", "ATGTGA", "CCAUGUAA", "AUGCCC"]
+        expected = ["AUGUAA", "", "AUGUGA", "AUGUAA", ""]
+        for jobs in (1, 2):
+            cache = result_cache.ResultCache()
+            self.assertEqual(find_orf.find_first_orfs(sequences,
+                    jobs = jobs, batch_bases = 10, cache = cache), expected)
+            self.assertEqual(len(cache), 3)
+            # Batches in flight are looked up before the results of earlier
+            # ones are cached, so only a second pass is sure to be all hits
+            hits, misses = cache.hits, cache.misses
+            self.assertEqual(find_orf.find_first_orfs(sequences,
+                    jobs = jobs, batch_bases = 10, cache = cache), expected)
+            self.assertEqual((cache.hits - hits, cache.misses - misses),
+                    (5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,262 @@
+#! /usr/bin/env python3
+
+import os
+import io
+import gzip
+import shutil
+import tempfile
+import unittest
+
+import test_util
+import seqio
+import find_orf
+import translate
+
+class TestSeqioBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name, content, compress = False):
+        path = os.path.join(self.temp_dir, name)
+        if compress:
+            with gzip.open(path, 'wb') as stream:
+                stream.write(content)
+        else:
+            with open(path, 'wb') as stream:
+                stream.write(content)
+        return path
+
+    def run_iter_records(self, content, expected_result):
+        self.run_test_of_function(
+                function = lambda source: list(seqio.iter_records(source)),
+                key_word_args = {"source" : io.BytesIO(content)},
+                expected_result = expected_result)
+
+
+class TestIterRecords(TestSeqioBaseClass):
+    def test_empty(self):
+        self.run_iter_records(b"", [])
+        self.run_iter_records(b"\n\n", [])
+
+    def test_plain(self):
+        self.run_iter_records(b"AUG\nGUA\n\nUAA\n",
+                [seqio.Record(None, "AUGGUAUAA")])
+
+    def test_fasta(self):
+        self.run_iter_records(
+                b">seq1 first\nAUG\nGUA\n>seq2\n>seq3\r\nUAA\r\n",
+                [
+                        seqio.Record("seq1 first", "AUGGUA"),
+                        seqio.Record("seq2", ""),
+                        seqio.Record("seq3", "UAA"),
+                ])
+
+    def test_fastq(self):
+        self.run_iter_records(
+                b"@read1\nAUGG\n+\n@@II\n\n@read2\nAU\nG\n+read2\n+I\nI\n",
+                [
+                        seqio.Record("read1", "AUGG"),
+                        seqio.Record("read2", "AUG"),
+                ])
+
+    def test_fastq_missing_quality(self):
+        self.assertRaises(Exception, list,
+                seqio.iter_records(io.BytesIO(b"@read1\nAUGG\n+\nII\n")))
+
+    def test_gzip_and_bgzip(self):
+        content = b">seq1\nAUGGUA\n>seq2\nUAA\n"
+        expected_result = [
+                seqio.Record("seq1", "AUGGUA"),
+                seqio.Record("seq2", "UAA"),
+                ]
+        path = self.write_file("seqs.fasta.gz", content, compress = True)
+        self.assertEqual(list(seqio.iter_records(path)), expected_result)
+        # BGZF files are concatenated gzip members.
+        path = self.write_file("seqs.fasta.bgz",
+                gzip.compress(content[:10]) + gzip.compress(content[10:]))
+        self.assertEqual(list(seqio.iter_records(path)), expected_result)
+
+    def test_open_sequence_file_closes_file(self):
+        path = self.write_file("seqs.fasta.gz", b">seq1\nAUG\n",
+                compress = True)
+        stream = seqio.open_sequence_file(path)
+        raw = stream.fileobj
+        self.assertEqual(stream.read(), b">seq1\nAUG\n")
+        stream.close()
+        self.assertTrue(raw.closed)
+
+    def test_sequence_chunks(self):
+        content = b"AUG GUA\r\nUAA\n\nCC\n"
+        self.assertEqual(b"".join(seqio.iter_sequence_chunks(
+                io.BytesIO(content), 3)), b"AUGGUAUAACC")
+        path = self.write_file("seq.txt.gz", content, compress = True)
+        self.assertEqual(list(seqio.iter_sequence_chunks(path)),
+                [b"AUGGUAUAACC"])
+
+
+class TestParseFromPath(TestSeqioBaseClass):
+    def test_parse_sequence_from_path(self):
+        path = self.write_file("seq.txt", b"CCAUG\nGUAUAA\n")
+        self.assertEqual(find_orf.parse_sequence_from_path(path),
+                "CCAUGGUAUAA")
+        path = self.write_file("seqs.fasta", b">a\nAUG\n>b\nCCC\n")
+        self.assertEqual(find_orf.parse_sequence_from_path(path), "AUG")
+
+    def test_parse_records_from_path(self):
+        path = self.write_file("seqs.fasta", b">a\nAUG\n>b\nCCC\n",
+                compress = True)
+        self.assertEqual(list(find_orf.parse_records_from_path(path)),
+                [seqio.Record("a", "AUG"), seqio.Record("b", "CCC")])
+
+
+class TestMappedFasta(TestSeqioBaseClass):
+    def setUp(self):
+        TestSeqioBaseClass.setUp(self)
+        self.genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+        self.path = self.write_file("seqs.fasta",
+                b"; comment\n>seq1 first\nCCAUG\nGUAUA\nA\n"
+                b">seq2\r\nAUGCCC\r\n\r\n>empty\n>seq3\nAUGUUUUAA")
+
+    def test_records(self):
+        with seqio.MappedFasta(self.path) as fasta:
+            self.assertEqual(list(fasta.records),
+                    ["seq1", "seq2", "empty", "seq3"])
+            self.assertEqual(fasta["seq1"].header, "seq1 first")
+            self.assertEqual([len(r) for r in fasta], [11, 6, 0, 9])
+            self.assertEqual(
+                    [bytes(r.view()) for r in fasta],
+                    [b"CCAUGGUAUAA", b"AUGCCC", b"", b"AUGUUUUAA"])
+
+    def test_slicing(self):
+        with seqio.MappedFasta(self.path) as fasta:
+            record = fasta["seq1"]
+            expected = b"CCAUGGUAUAA"
+            for start in range(len(expected) + 1):
+                for end in range(start, len(expected) + 2):
+                    self.assertEqual(record[start:end], expected[start:end])
+            self.assertEqual(record[-1], b"A")
+            self.assertEqual(record[::2], expected[::2])
+            self.assertRaises(IndexError, record.__getitem__, 11)
+
+    def test_zero_copy_views(self):
+        with seqio.MappedFasta(self.path) as fasta:
+            record = fasta["seq1"]
+            view = record.view(1, 4)
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(view, b"CAU")
+            self.assertEqual([bytes(v) for v in record.iter_lines()],
+                    [b"CCAUG", b"GUAUA", b"A"])
+            del view
+
+    def test_windows(self):
+        with seqio.MappedFasta(self.path) as fasta:
+            windows = [(start, bytes(w))
+                    for start, w in fasta["seq1"].iter_windows(6, 2)]
+            self.assertEqual(windows,
+                    [(0, b"CCAUGG"), (4, b"GGUAUA"), (8, b"UAA")])
+
+    def test_translate_views(self):
+        genetic_code = translate.compile_genetic_code(self.genetic_code)
+        with seqio.MappedFasta(self.path) as fasta:
+            self.assertEqual(translate.get_longest_peptide(
+                    fasta["seq1"].view(), genetic_code), "MV")
+            view = fasta["seq3"].view()
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(translate.translate_sequence(view, genetic_code),
+                    "MF")
+            for backend in ("python", "numpy"):
+                if backend == "numpy" and translate.numpy is None:
+                    continue
+                self.assertEqual(translate.get_longest_peptide(view,
+                        genetic_code, backend = backend), "MF")
+            del view
+
+
+    def test_find_first_orf_in_record(self):
+        path = self.write_file("long.fasta",
+                b">a\nCCAUG\nGUAUA\nA\n>b\nCCC\nAUGC\n"
+                b">c\nAUGCCCCC\nCCCCCCCC\nCUAAAUGU\nAA\n")
+        with seqio.MappedFasta(path) as fasta:
+            for record in fasta:
+                sequence = bytes(record.view())
+                for window_bases in (1, 4, 7, 1 << 20):
+                    self.assertEqual(find_orf.find_first_orf_in_record(
+                            record, window_bases = window_bases),
+                            find_orf.find_first_orf(sequence))
+                orf = find_orf.locate_first_orf_in_record(record,
+                        window_bases = 5)
+                self.assertEqual(orf, find_orf.locate_first_orf(sequence))
+            self.assertEqual(find_orf.find_first_orf_in_record(fasta["c"],
+                    stop_codons = ['CCU'], window_bases = 3),
+                    'AUGCCCCCCCCCCCCCCU')
+
+
+class TestFastaIndex(TestSeqioBaseClass):
+    def setUp(self):
+        TestSeqioBaseClass.setUp(self)
+        self.sequences = {
+                "seq1" : "CCAUGGUAUAAGGCAU",
+                "seq2" : "AUG",
+                "empty" : "",
+                }
+        self.path = self.write_file("seqs.fasta",
+                b">seq1 first\nCCAUGG\nUAUAAG\nGCAU\n"
+                b">seq2\r\nAUG\r\n>empty\n")
+
+    def test_build_index(self):
+        entries = seqio.build_fasta_index(self.path)
+        self.assertEqual(entries, [
+                seqio.FastaIndexEntry("seq1", 16, 12, 6, 7),
+                seqio.FastaIndexEntry("seq2", 3, 38, 3, 5),
+                seqio.FastaIndexEntry("empty", 0, 50, 0, 0),
+                ])
+        with open(self.path + ".fai") as stream:
+            self.assertEqual(stream.readline(), "seq1\t16\t12\t6\t7\n")
+        self.assertEqual(list(seqio.read_fasta_index(self.path).values()),
+                entries)
+
+    def test_uneven_lines(self):
+        path = self.write_file("uneven.fasta", b">seq1\nAUG\nAUGG\n")
+        self.assertRaises(Exception, seqio.build_fasta_index, path)
+        path = self.write_file("uneven.fasta", b">seq1\nAUG\nAU\nAUG\n")
+        self.assertRaises(Exception, seqio.build_fasta_index, path)
+
+    def test_fetch(self):
+        for name, sequence in self.sequences.items():
+            for start in range(len(sequence) + 1):
+                for end in range(start, len(sequence) + 2):
+                    self.assertEqual(
+                            seqio.fetch(self.path, name, start, end),
+                            sequence[start:end])
+            self.assertEqual(seqio.fetch(self.path, name), sequence)
+        self.assertRaises(KeyError, seqio.fetch, self.path, "missing")
+
+    def test_parse_region(self):
+        self.assertEqual(seqio.parse_region("seq1:2-5"), ("seq1", 1, 5))
+        self.assertEqual(seqio.parse_region("a:b:3"), ("a:b", 2, None))
+        self.assertRaises(Exception, seqio.parse_region, "seq1:5-2")
+        self.assertRaises(Exception, seqio.parse_region, "seq1:0")
+
+    def test_parse_region_names_with_colons(self):
+        names = ["chr1:HLA:1-10", "name:with:colon", "chr1:HLA"]
+        self.assertEqual(seqio.parse_region("chr1:HLA:1-10", names),
+                ("chr1:HLA:1-10", None, None))
+        self.assertEqual(seqio.parse_region("name:with:colon", names),
+                ("name:with:colon", None, None))
+        self.assertEqual(seqio.parse_region("chr1:HLA:2-4", names),
+                ("chr1:HLA", 1, 4))
+        self.assertRaises(Exception, seqio.parse_region, "name:with:colon")
+        path = self.write_file("colons.fasta",
+                b">chr1:HLA:1-10\nAUGC\n>chr1:HLA\nCCAUGG\n")
+        index = seqio.read_fasta_index(path)
+        self.assertEqual(seqio.fetch(path, *seqio.parse_region(
+                "chr1:HLA:1-10", index)), "AUGC")
+        self.assertEqual(seqio.fetch(path, *seqio.parse_region(
+                "chr1:HLA:2-4", index)), "CAU")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+
+import unittest
+
+import test_util
+import sequence
+import translate
+import find_orf
+
+class TestSequenceBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+        self.sequences = ["", "A", "AUGC", "CCAUGGUAUAAGG",
+                "augcauguaaugaucgcgauuua" * 5, "ATGCGTAGTACGTA"]
+
+
+class TestSequence(TestSequenceBaseClass):
+    def test_round_trip(self):
+        for seq in self.sequences:
+            packed = sequence.Sequence(seq)
+            self.assertEqual(len(packed), len(seq))
+            self.assertEqual(str(packed), seq.upper())
+            self.assertEqual(bytes(packed), seq.upper().encode('ascii'))
+            self.assertEqual(sequence.Sequence(seq.encode('ascii')), packed)
+            self.assertEqual(packed.nbytes, (len(seq) + 3) // 4)
+
+    def test_alphabet(self):
+        self.assertEqual(sequence.Sequence("ACGT").alphabet, "DNA")
+        self.assertEqual(sequence.Sequence("ACGU").alphabet, "RNA")
+        self.assertEqual(sequence.Sequence("ACG").alphabet, "RNA")
+        seq = sequence.Sequence("ACGU", alphabet = "dna")
+        self.assertEqual(str(seq), "ACGT")
+        self.assertEqual(seq.encode("RNA"), b"ACGU")
+
+    def test_invalid_sequence(self):
+        for seq in ("AUGN", "ATGU", "AUGé", "AUG "):
+            self.assertRaises(Exception, sequence.Sequence, seq)
+        self.assertRaises(ValueError, sequence.Sequence, "AUG",
+                alphabet = "protein")
+
+    def test_indexing(self):
+        seq = "CCAUGGUAUAAGG"
+        packed = sequence.Sequence(seq)
+        for i in range(-len(seq), len(seq)):
+            self.assertEqual(packed[i], seq[i])
+        self.assertRaises(IndexError, packed.__getitem__, len(seq))
+        for start in range(len(seq) + 1):
+            for end in range(start, len(seq) + 2):
+                self.assertEqual(str(packed[start:end]), seq[start:end])
+                self.assertEqual(str(packed[start:end][1:]),
+                        seq[start:end][1:])
+        self.assertEqual(str(packed[::3]), seq[::3])
+        self.assertEqual(str(packed[::-1]), seq[::-1])
+
+    def test_reverse_complement(self):
+        for seq in self.sequences:
+            packed = sequence.Sequence(seq)
+            reverse = packed.reverse_complement()
+            self.assertEqual(str(reverse),
+                    translate.reverse_and_complement(seq.upper()))
+            self.assertIs(packed.reverse_complement(), reverse)
+            self.assertIs(reverse.reverse_complement(), packed)
+            self.assertIs(translate.reverse_and_complement(packed), reverse)
+            self.assertEqual(str(packed[1:-2].reverse_complement()),
+                    translate.reverse_and_complement(seq[1:-2].upper()))
+
+    def test_codon_indices(self):
+        for seq in self.sequences:
+            packed = sequence.Sequence(seq)
+            for frame in range(3):
+                self.assertEqual(packed.codon_indices(frame),
+                        translate.codon_indices(seq, frame))
+                self.assertEqual(packed.frame(frame).codon_indices(),
+                        translate.codon_indices(seq[frame:]))
+
+
+class TestSequenceFunctions(TestSequenceBaseClass):
+    def test_translate(self):
+        for seq in self.sequences:
+            rna = seq.upper().replace("T", "U")
+            packed = sequence.Sequence(seq)
+            self.assertEqual(
+                    translate.translate_sequence(packed, self.genetic_code),
+                    translate.translate_sequence(rna, self.genetic_code))
+            self.assertEqual(
+                    translate.get_all_translations(packed.frame(1),
+                            self.genetic_code),
+                    translate.get_all_translations(rna[1:],
+                            self.genetic_code))
+            for backend in ("python", "numpy"):
+                if backend == "numpy" and translate.numpy is None:
+                    continue
+                self.assertEqual(
+                        translate.get_longest_peptide(packed,
+                                self.genetic_code, backend = backend),
+                        translate.get_longest_peptide(rna,
+                                self.genetic_code, backend = backend))
+
+    def test_find_orfs(self):
+        for seq in self.sequences:
+            packed = sequence.Sequence(seq)
+            self.assertEqual(find_orf.find_first_orf(packed),
+                    find_orf.find_first_orf(seq))
+            self.assertEqual(find_orf.find_all_orfs(packed, reverse = True),
+                    find_orf.find_all_orfs(seq, reverse = True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+#! /usr/bin/env python3
+
+import os
+import json
+import socket
+import shutil
+import tempfile
+import threading
+import unittest
+import http.client
+import concurrent.futures
+
+import test_util
+import server
+import find_orf
+import translate
+import genetic_codes
+
+class TestServerBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.servers = []
+        self.genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+        self.sequences = ['CC' + ('AUG' * i) + 'UAA' + ('GGU' * i)
+                for i in range(12)]
+
+    def tearDown(self):
+        for s in self.servers:
+            s.shutdown()
+            s.server_close()
+            s.batcher.close()
+        shutil.rmtree(self.temp_dir)
+
+    def start_server(self, address, **kwargs):
+        s = server.make_server(address, **kwargs)
+        threading.Thread(target = s.serve_forever, daemon = True).start()
+        self.servers.append(s)
+        if isinstance(address, tuple):
+            return s.server_address
+        return address
+
+    def check_client(self, address):
+        results = [None] * len(self.sequences)
+        def call(i):
+            with server.Client(address, timeout = 10) as client:
+                results[i] = (client.find_first_orf(self.sequences[i]),
+                        client.get_longest_peptide(self.sequences[i],
+                                self.genetic_code),
+                        client.get_longest_peptide(self.sequences[i], 2))
+        threads = [threading.Thread(target = call, args = (i,))
+                for i in range(len(self.sequences))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [(find_orf.find_first_orf(s),
+                translate.get_longest_peptide(s, self.genetic_code),
+                translate.get_longest_peptide(s, 2))
+                for s in self.sequences])
+        with server.Client(address, timeout = 10) as client:
+            self.assertEqual(client.find_first_orf('CCAUGCCCUAG',
+                    start_codons = ['CCC'], stop_codons = ['UAG']),
+                    'CCCUAG')
+            self.assertRaises(Exception, client.find_first_orf, 'AUGXUAA')
+            self.assertEqual(client.find_first_orf('AUGUAA'), 'AUGUAA')
+
+
+class TestServer(TestServerBaseClass):
+    def test_batcher(self):
+        batcher = server.Batcher(max_batch = 100, max_delay = 0.5)
+        futures = [batcher.submit('find_first_orf', s)
+                for s in self.sequences]
+        futures.append(batcher.submit('find_first_orf', 'AUGXUAA'))
+        futures.append(batcher.submit('get_longest_peptide', 'AUGGUACAUUAA',
+                genetic_code = self.genetic_code))
+        batcher.close()
+        self.assertEqual([f.result() for f in futures[:-2]],
+                [find_orf.find_first_orf(s) for s in self.sequences])
+        self.assertRaises(Exception, futures[-2].result)
+        self.assertEqual(futures[-1].result(), 'MVH')
+        self.assertEqual(batcher.batches, 1)
+        self.assertEqual(batcher.requests, len(self.sequences) + 2)
+        self.assertRaises(ValueError, batcher.submit, 'translate', 'AUG')
+
+    def test_batcher_jobs(self):
+        batcher = server.Batcher(jobs = 2)
+        try:
+            executor = batcher._executor
+            self.assertIsNotNone(executor)
+            results = []
+            for s in self.sequences[:4]:
+                results.append(batcher.submit('find_first_orf', s).result(30))
+            self.assertEqual(results,
+                    [find_orf.find_first_orf(s) for s in self.sequences[:4]])
+            self.assertGreater(batcher.batches, 1)
+            self.assertIs(batcher._executor, executor)
+        finally:
+            batcher.close()
+        self.assertIsNone(batcher._executor)
+
+    def test_handle_request(self):
+        batcher = server.Batcher()
+        try:
+            self.assertEqual(server.handle_request(batcher,
+                    {'operation' : 'find_first_orf', 'sequence' : 'CCAUGUAA'}),
+                    {'result' : 'AUGUAA'})
+            self.assertIn('error', server.handle_request(batcher,
+                    {'operation' : 'find_first_orf'}))
+            self.assertIn('error', server.handle_request(batcher,
+                    {'operation' : 'nope', 'sequence' : 'AUG'}))
+        finally:
+            batcher.close()
+
+    def test_malformed_requests(self):
+        batcher = server.Batcher()
+        try:
+            for request in ({'start_codons' : [['AUG']]},
+                    {'stop_codons' : 'UAA'},
+                    {'genetic_code' : [1]},
+                    {'genetic_code' : {'AUG' : ['M']}}):
+                request = dict(request, sequence = 'CCAUGUAA',
+                        operation = 'get_longest_peptide'
+                                if 'genetic_code' in request
+                                else 'find_first_orf')
+                self.assertIn('error', server.handle_request(batcher,
+                        request, timeout = 10))
+            # A request that reaches the worker unhashable fails alone, and
+            # the worker goes on
+            future = concurrent.futures.Future()
+            batcher._queue.put(server._Request('find_first_orf',
+                    ([['AUG']], ()), 'AUGUAA', future))
+            self.assertRaises(TypeError, future.result, 10)
+            self.assertEqual(server.handle_request(batcher,
+                    {'operation' : 'find_first_orf', 'sequence' : 'CCAUGUAA'},
+                    timeout = 10), {'result' : 'AUGUAA'})
+        finally:
+            batcher.close()
+
+    @unittest.skipUnless(hasattr(server, '_UnixServer'),
+            "Unix domain sockets are not supported")
+    def test_unix_server_malformed_request(self):
+        address = self.start_server(os.path.join(self.temp_dir, 'orf.sock'))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(10)
+            connection.connect(address)
+            reader = connection.makefile('rb')
+            for request in ({'operation' : 'find_first_orf',
+                    'sequence' : 'CCAUGUAA', 'start_codons' : [['AUG']]},
+                    {'operation' : 'find_first_orf',
+                            'sequence' : 'CCAUGUAA'}):
+                connection.sendall(json.dumps(request).encode('utf-8') +
+                        b"\n")
+                response = json.loads(reader.readline().decode('utf-8'))
+            self.assertEqual(response, {'result' : 'AUGUAA'})
+            reader.close()
+
+    def test_http_server_malformed_request(self):
+        address = self.start_server(('127.0.0.1', 0))
+        connection = http.client.HTTPConnection(*address, timeout = 10)
+        try:
+            for body, status in (({'sequence' : 'CCAUGUAA',
+                    'start_codons' : [['AUG']]}, 400),
+                    ({'sequence' : 'CCAUGUAA'}, 200)):
+                connection.request('POST', '/find_first_orf',
+                        body = json.dumps(body).encode('utf-8'))
+                response = connection.getresponse()
+                self.assertEqual(response.status, status)
+                result = json.loads(response.read().decode('utf-8'))
+            self.assertEqual(result, {'result' : 'AUGUAA'})
+        finally:
+            connection.close()
+
+    def test_parse_address(self):
+        self.assertEqual(server.parse_address('orf.sock'),
+                ('unix', 'orf.sock'))
+        self.assertEqual(server.parse_address('localhost:80'),
+                ('http', ('localhost', 80)))
+        self.assertEqual(server.parse_address(('127.0.0.1', '80')),
+                ('http', ('127.0.0.1', 80)))
+        self.assertEqual(server.parse_address(':80'),
+                ('http', (server.DEFAULT_HTTP_HOST, 80)))
+        self.assertEqual(server.DEFAULT_HTTP_HOST, '127.0.0.1')
+
+    @unittest.skipUnless(hasattr(server, '_UnixServer'),
+            "Unix domain sockets are not supported")
+    def test_unix_server(self):
+        self.check_client(self.start_server(
+                os.path.join(self.temp_dir, 'orf.sock')))
+
+    @unittest.skipUnless(hasattr(server, '_UnixServer'),
+            "Unix domain sockets are not supported")
+    def test_unix_server_existing_path(self):
+        path = os.path.join(self.temp_dir, 'orf.sock')
+        with open(path, 'w') as stream:
+            stream.write('data')
+        self.assertRaises(FileExistsError, server.make_server, path)
+        with open(path) as stream:
+            self.assertEqual(stream.read(), 'data')
+        os.remove(path)
+        # A socket left by an earlier server is replaced
+        s = server.make_server(path)
+        s.server_close()
+        s.batcher.close()
+        self.assertTrue(os.path.exists(path))
+        self.check_client(self.start_server(path))
+
+    @unittest.skipUnless(hasattr(server, '_UnixServer'),
+            "Unix domain sockets are not supported")
+    def test_unix_client_close(self):
+        address = self.start_server(os.path.join(self.temp_dir, 'orf.sock'))
+        client = server.Client(address, timeout = 10, fallback = False)
+        self.assertEqual(client.find_first_orf('CCAUGUAA'), 'AUGUAA')
+        reader = client._reader
+        connection = client._connection
+        client.close()
+        self.assertTrue(reader.closed)
+        self.assertEqual(connection.fileno(), -1)
+
+    def test_http_server(self):
+        self.check_client(self.start_server(('127.0.0.1', 0)))
+
+    def test_client_compiled_genetic_code(self):
+        address = self.start_server(('127.0.0.1', 0))
+        sequence = 'AUAUGAAGAUGGUACAUUAA'
+        with server.Client(address, timeout = 10, fallback = False) as client:
+            for code in (genetic_codes.get_genetic_code(2),
+                    translate.CompiledGeneticCode(self.genetic_code)):
+                self.assertEqual(client.get_longest_peptide(sequence, code),
+                        translate.get_longest_peptide(sequence, code))
+            self.assertRaises(ValueError, client.get_longest_peptide,
+                    sequence, translate.CompiledGeneticCode(
+                            self.genetic_code, start_codons = ['AUA']))
+            self.assertRaises(ValueError, client.get_longest_peptide,
+                    sequence, [2])
+
+    def test_client_fallback(self):
+        address = os.path.join(self.temp_dir, 'missing.sock')
+        with server.Client(address) as client:
+            self.assertEqual(client.find_first_orf('CCAUGUAA'), 'AUGUAA')
+            self.assertEqual(client.get_longest_peptide('AUGGUACAUUAA',
+                    self.genetic_code), 'MVH')
+        with server.Client(address, fallback = False) as client:
+            self.assertRaises(OSError, client.find_first_orf, 'CCAUGUAA')
+        with server.Client(None) as client:
+            self.assertRaises(Exception, client.find_first_orf, 'AUGXUAA')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#! /usr/bin/env python3
+
+import io
+import json
+import unittest
+import concurrent.futures
+
+import test_util
+import stats
+import find_orf
+import translate
+import result_cache
+import seqio
+
+class TestStatsBaseClass(test_util.TestBaseClass):
+    def setUp(self):
+        self.previous = stats.disable()
+        self.genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}
+
+    def tearDown(self):
+        stats.disable()
+        if self.previous is not None:
+            stats.enable(self.previous)
+
+
+class TestStats(TestStatsBaseClass):
+    def test_record_and_hooks(self):
+        calls = []
+        collector = stats.Stats(hooks = [lambda *args: calls.append(args)])
+        collector.record('search', 0.5, bytes = 10, orfs = 1)
+        collector.record('search', 0.25, bytes = 5)
+        self.assertEqual(collector.stages['search'].calls, 2)
+        self.assertAlmostEqual(collector.stages['search'].seconds, 0.75)
+        self.assertEqual(collector.stages['search'].counters,
+                {'bytes': 15, 'orfs': 1})
+        self.assertEqual(calls, [
+                ('search', 0.5, {'bytes': 10, 'orfs': 1}),
+                ('search', 0.25, {'bytes': 5})])
+
+    def test_merge(self):
+        worker = stats.Stats()
+        worker.record('search', 1.0, bytes = 8, codons = 6, orfs = 1)
+        collector = stats.Stats()
+        collector.record('search', 1.0, bytes = 2, codons = 0, orfs = 0)
+        collector.merge(worker.as_dict())
+        self.assertEqual(dict(collector.as_dict()['search']),
+                {'calls': 2, 'seconds': 2.0, 'bytes': 10, 'codons': 6,
+                        'orfs': 1})
+
+    def test_write(self):
+        collector = stats.Stats()
+        collector.record('parse', 2.0, bytes = 100, records = 3)
+        stream = io.StringIO()
+        collector.write(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split(),
+                ['parse', '1', '2.000000', '100', '50', 'records=3'])
+        stream = io.StringIO()
+        collector.write(stream, format = 'json')
+        self.assertEqual(json.loads(stream.getvalue()),
+                {'parse': {'calls': 1, 'seconds': 2.0, 'bytes': 100,
+                        'records': 3}})
+        self.assertRaises(ValueError, collector.write, stream, 'xml')
+
+    def test_disabled(self):
+        self.assertIsNone(stats.start())
+        collector = stats.Stats()
+        with stats.collecting(collector):
+            self.assertIs(stats.collector, collector)
+        self.assertIsNone(stats.collector)
+        find_orf.find_first_orf('CCAUGUAA')
+        self.assertEqual(collector.stages, {})
+
+    def test_find_orf_stages(self):
+        with stats.collecting() as collector:
+            self.assertEqual(find_orf.find_first_orf('ccaugccc'), '')
+            self.assertEqual(find_orf.find_first_orf('CCAUGUAA'), 'AUGUAA')
+        self.assertEqual(collector.stages['normalize'].counters,
+                {'bytes': 16})
+        self.assertEqual(collector.stages['search'].calls, 2)
+        self.assertEqual(collector.stages['search'].counters,
+                {'bytes': 16, 'codons': 12, 'orfs': 1})
+
+    def test_vet_stage(self):
+        with stats.collecting() as collector:
+            find_orf.vet_nucleotide_sequence('AUGC')
+            find_orf.vet_codon('AUG')
+            self.assertRaises(Exception, find_orf.vet_codon, 'AUGC')
+        self.assertEqual(collector.stages['vet'].calls, 3)
+        self.assertEqual(collector.stages['vet'].counters, {'bytes': 11})
+
+    def test_find_all_orfs_stage(self):
+        with stats.collecting() as collector:
+            orfs = find_orf.find_all_orfs('AUGUAACCAUGCCCUAG')
+        self.assertEqual(collector.stages['search'].counters,
+                {'bytes': 17, 'codons': 15, 'orfs': len(orfs)})
+
+    def test_stream_stage(self):
+        with stats.collecting() as collector:
+            orf = find_orf.find_first_orf_in_stream(
+                    ['CCAUG', 'CCCU', 'AGG'])
+        self.assertEqual(orf, 'AUGCCCUAG')
+        self.assertEqual(collector.stages['search'].counters['orfs'], 1)
+        self.assertEqual(collector.stages['normalize'].counters,
+                {'bytes': 12})
+
+    def test_parse_stage(self):
+        records = [seqio.Record('a', 'AUGUAA'), seqio.Record('b', 'CC')]
+        with stats.collecting() as collector:
+            parsed = list(stats.iter_timed('parse', records,
+                    find_orf._count_record))
+        self.assertEqual(parsed, records)
+        self.assertEqual(dict(collector.as_dict()['parse'],
+                seconds = None),
+                {'calls': 2, 'seconds': None, 'bytes': 8, 'records': 2})
+
+    def test_cache_stage(self):
+        cache = result_cache.ResultCache()
+        with stats.collecting() as collector:
+            find_orf.find_first_orf('CCAUGUAA', cache = cache)
+            find_orf.find_first_orf('CCAUGUAA', cache = cache)
+        self.assertEqual(collector.stages['cache'].counters,
+                {'hits': 1, 'misses': 1})
+        self.assertEqual(collector.stages['search'].calls, 1)
+
+    def test_translate_stage(self):
+        with stats.collecting() as collector:
+            peptide = translate.get_longest_peptide('AUGGUACAUUAA',
+                    self.genetic_code)
+        self.assertEqual(peptide, 'MVH')
+        self.assertEqual(collector.stages['translate'].counters,
+                {'bytes': 12, 'codons': 20, 'peptides': 1})
+
+    def test_parallel_merge(self):
+        records = [seqio.Record(str(i), 'CC' + ('AUG' * i) + 'UAA')
+                for i in range(20)]
+        with stats.collecting() as collector:
+            orfs = [orf for record, orf in find_orf.iter_first_orfs(records,
+                    jobs = 2, batch_bases = 40)]
+        self.assertEqual(orfs, [find_orf.find_first_orf(r.sequence)
+                for r in records])
+        self.assertEqual(collector.stages['search'].calls, 20)
+        self.assertEqual(collector.stages['search'].counters['orfs'], 19)
+
+
+    def test_thread_executor(self):
+        records = [seqio.Record(str(i), 'CC' + ('AUG' * i) + 'UAA')
+                for i in range(20)]
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            with stats.collecting() as collector:
+                orfs = [orf for record, orf in find_orf.iter_first_orfs(
+                        records, jobs = 2, batch_bases = 40,
+                        executor = executor)]
+                self.assertIs(stats.collector, collector)
+        self.assertEqual(orfs, [find_orf.find_first_orf(r.sequence)
+                for r in records])
+        self.assertEqual(collector.stages['search'].calls, 20)
+        self.assertEqual(collector.stages['search'].counters['orfs'], 19)
+
+if __name__ == '__main__':
+    unittest.main()
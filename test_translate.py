@@ -216,6 +216,56 @@ class TestGetAllTranslations(TestTranslateBaseClass):
                 rna_seq = rna_seq,
                 expected_result = expected_amino_acid_seqs)
 
+    def test_nested_starts(self):
+        rna_seq = "AUGCCCAUGGGGAUGUAAAUGAUG"
+        expected_amino_acid_seqs = [
+                "MPMGM",
+                "MGM",
+                "M",
+                "MM",
+                "M",
+                ]
+        self.run_get_all_translations(
+                rna_seq = rna_seq,
+                expected_result = expected_amino_acid_seqs)
+
+    def test_nested_starts_as_views(self):
+        rna_seq = "AUGCCCAUGGGGAUGUAAAUGAUG"
+        result = translate.get_all_translations(rna_seq, self.genetic_code,
+                views = True)
+        self.assertEqual([bytes(v) for v in result],
+                [b"MPMGM", b"MGM", b"M", b"MM", b"M"])
+        self.assertIs(result[0].obj, result[1].obj)
+
+
+class TestIterAllTranslations(TestTranslateBaseClass):
+    def test_coordinates(self):
+        rna_seq = "CCUGAAUGACGUACGUAUGACUGCAGUACGUUACGUACG"
+        result = list(translate.iter_all_translations(rna_seq,
+                self.genetic_code))
+        self.assertEqual(result, [
+                translate.Translation("MTAVRYV", 1, 16, 37),
+                translate.Translation("MTYV", 2, 5, 17),
+                ])
+
+    def test_chunks_match_whole_sequence(self):
+        rna_seq = ("AUGCCCAUGGGGAUGUAAAUGAUG" * 7) + "CCUGAAUGACGUACGUA"
+        expected = list(translate.iter_all_translations(rna_seq,
+                self.genetic_code))
+        for chunk_size in (3, 6, 9, 30, 31):
+            self.assertEqual(
+                    list(translate.iter_all_translations(rna_seq,
+                            self.genetic_code, chunk_size = chunk_size)),
+                    expected)
+
+    def test_early_termination(self):
+        rna_seq = ("AUGUAA" * 10) + "AUGNNN"
+        translations = translate.iter_all_translations(rna_seq,
+                self.genetic_code)
+        self.assertEqual(next(translations),
+                translate.Translation("M", 0, 0, 3))
+        self.assertRaises(KeyError, list, translations)
+
 
 class TestGetReverse(TestTranslateBaseClass):
     def test_empty_string(self):
@@ -260,6 +310,11 @@ class TestGetComplement(TestTranslateBaseClass):
         expected_result = "UACG"
         self.run_get_complement(seq, expected_result)
 
+    def test_dna(self):
+        seq = "ATGC"
+        expected_result = "TACG"
+        self.run_get_complement(seq, expected_result)
+
 
 class TestReverseAndComplement(TestTranslateBaseClass):
     def test_empty_string(self):
@@ -282,6 +337,44 @@ class TestReverseAndComplement(TestTranslateBaseClass):
         expected_result = "GCAU"
         self.run_reverse_and_complement(seq, expected_result)
 
+    def test_dna(self):
+        seq = "ATGC"
+        expected_result = "GCAT"
+        self.run_reverse_and_complement(seq, expected_result)
+
+    def test_ambiguity_codes(self):
+        seq = "ACGUNRYKMSWBDHV"
+        expected_result = "BDHVWSKMRYNACGU"
+        self.run_reverse_and_complement(seq, expected_result)
+
+    def test_bytes_like(self):
+        self.assertEqual(translate.reverse_and_complement(b"augc"), b"GCAU")
+        self.assertEqual(translate.reverse_and_complement(bytearray(b"AUGC")),
+                bytearray(b"GCAU"))
+        self.assertEqual(
+                translate.reverse_and_complement(memoryview(b"AUGC")),
+                b"GCAU")
+
+    def test_invalid_base(self):
+        self.assertRaises(KeyError, translate.reverse_and_complement, "AUGX")
+
+    def test_in_place(self):
+        seq = "AUGCCGAUUAGCN"
+        expected_result = translate.reverse_and_complement(seq).encode()
+        for chunk_size in (1, 2, 3, 5, 100):
+            buffer = bytearray(seq.lower().encode())
+            translate.reverse_and_complement_in_place(buffer,
+                    chunk_size = chunk_size)
+            self.assertEqual(buffer, expected_result)
+
+    def test_in_place_invalid_base(self):
+        buffer = bytearray(b"AUGCX")
+        self.assertRaises(KeyError,
+                translate.reverse_and_complement_in_place, buffer)
+        self.assertEqual(buffer, bytearray(b"AUGCX"))
+        self.assertRaises(TypeError,
+                translate.reverse_and_complement_in_place, b"AUGC")
+
 
 class TestGetLongestPeptide(TestTranslateBaseClass):
 
@@ -326,5 +419,219 @@ class TestGetLongestPeptide(TestTranslateBaseClass):
                 expected_result = expected_amino_acid_seq)
 
 
+class TestTranslateSequenceCompiled(TestTranslateSequence):
+    def setUp(self):
+        TestTranslateSequence.setUp(self)
+        self.genetic_code = translate.compile_genetic_code(self.genetic_code)
+
+
+class TestGetAllTranslationsCompiled(TestGetAllTranslations):
+    def setUp(self):
+        TestGetAllTranslations.setUp(self)
+        self.genetic_code = translate.compile_genetic_code(self.genetic_code)
+
+
+class TestGetLongestPeptideCompiled(TestGetLongestPeptide):
+    def setUp(self):
+        TestGetLongestPeptide.setUp(self)
+        self.genetic_code = translate.compile_genetic_code(self.genetic_code)
+
+
+@unittest.skipIf(translate.numpy is None, "NumPy is not installed")
+class TestGetLongestPeptideNumpy(TestGetLongestPeptide):
+    def run_get_longest_peptide(self, rna_seq, expected_result,
+            gen_code = None):
+        if gen_code is None:
+            gen_code = self.genetic_code
+        self.run_test_of_function(
+                function = translate.get_longest_peptide,
+                key_word_args = {
+                        "rna_sequence" : rna_seq,
+                        "genetic_code" : gen_code,
+                        "backend" : "numpy",
+                        },
+                expected_result = expected_result)
+
+    def test_matches_python_backend(self):
+        for seq in (
+                "AUGAUGUAAAUGCCCAUGUAG" * 20,
+                "CAUUCAUUAUUGUAACAU" * 30,
+                "AUGCCCAUGGGG" + ("GUC" * 400),
+                "augccc" * 3 + "uaa" + "aug",
+                ):
+            self.assertEqual(
+                    translate.get_longest_peptide(seq, self.genetic_code,
+                            backend = "numpy"),
+                    translate.get_longest_peptide(seq, self.genetic_code,
+                            backend = "python"))
+
+
+@unittest.skipIf(translate.numpy is None, "NumPy is not installed")
+class TestGetLongestPeptideParallel(TestGetLongestPeptide):
+    def run_get_longest_peptide(self, rna_seq, expected_result,
+            gen_code = None):
+        if gen_code is None:
+            gen_code = self.genetic_code
+        self.run_test_of_function(
+                function = translate.get_longest_peptide,
+                key_word_args = {
+                        "rna_sequence" : rna_seq,
+                        "genetic_code" : gen_code,
+                        "jobs" : 2,
+                        },
+                expected_result = expected_result)
+
+    def test_matches_python_backend(self):
+        # Small chunks, so that translations span several chunks
+        chunk_codons = translate._PARALLEL_CHUNK_CODONS
+        translate._PARALLEL_CHUNK_CODONS = 7
+        try:
+            for seq in (
+                    "AUGAUGUAAAUGCCCAUGUAG" * 20,
+                    "CAUUCAUUAUUGUAACAU" * 30,
+                    "AUGCCCAUGGGG" + ("GUC" * 400),
+                    "augccc" * 3 + "uaa" + "aug",
+                    "AUGCCC" * 3 + "UAAAUG" * 2 + "GUC" * 7,
+                    ):
+                self.assertEqual(
+                        translate.get_longest_peptide(seq,
+                                self.genetic_code, jobs = 3),
+                        translate.get_longest_peptide(seq,
+                                self.genetic_code, backend = "python"))
+            self.assertRaises(KeyError, translate.get_longest_peptide,
+                    "AUGCCCCCCNCCCCCCUAA", self.genetic_code, jobs = 2)
+        finally:
+            translate._PARALLEL_CHUNK_CODONS = chunk_codons
+
+    def test_python_backend(self):
+        self.assertRaises(ValueError, translate.get_longest_peptide, "AUG",
+                self.genetic_code, backend = "python", jobs = 2)
+
+    def test_invalid_jobs(self):
+        for jobs in (0, -1):
+            self.assertRaises(ValueError, translate.get_longest_peptide,
+                    "AUGGUACAUUAA", self.genetic_code, jobs = jobs)
+
+
+class TestGetLongestPeptides(TestTranslateBaseClass):
+    def all_translations_by_length(self, rna_seq):
+        peptides = translate.get_all_translations(rna_seq, self.genetic_code)
+        peptides += translate.get_all_translations(
+                translate.reverse_and_complement(rna_seq), self.genetic_code)
+        return sorted(peptides, key = len, reverse = True)
+
+    def test_top_k(self):
+        rna_seq = "AUGAUGUAAAUGCCCAUGUAGCAUUCAUUAUUGUAACAUGGGGUCUAG"
+        peptides = self.all_translations_by_length(rna_seq)
+        for k in range(1, len(peptides) + 2):
+            self.run_test_of_function(
+                    function = translate.get_longest_peptides,
+                    key_word_args = {
+                            "rna_sequence" : rna_seq,
+                            "genetic_code" : self.genetic_code,
+                            "k" : k,
+                            },
+                    expected_result = peptides[:k])
+        self.assertEqual(translate.get_longest_peptides(rna_seq,
+                self.genetic_code, k = 1)[0],
+                translate.get_longest_peptide(rna_seq, self.genetic_code))
+
+    def test_min_length(self):
+        rna_seq = "AUGAUGUAAAUGCCCAUGUAGCAUUCAUUAUUGUAACAUGGGGUCUAG"
+        for min_length in range(6):
+            self.assertEqual(translate.get_longest_peptides(rna_seq,
+                    self.genetic_code, k = 100, min_length = min_length),
+                    [p for p in self.all_translations_by_length(rna_seq)
+                            if len(p) >= min_length])
+
+    def test_no_translations(self):
+        self.assertEqual(translate.get_longest_peptides("GUCGAAUAACGA",
+                self.genetic_code), [])
+        self.assertEqual(translate.get_longest_peptides("AUGGUCUAA",
+                self.genetic_code, k = 0), [])
+
+    def test_invalid_codon(self):
+        self.assertRaises(KeyError, translate.get_longest_peptides,
+                "AUGGGGGUCGUCNNNUAA", self.genetic_code, k = 1)
+
+
+class TestCompiledGeneticCode(TestTranslateBaseClass):
+    def test_compile_is_cached(self):
+        code = translate.compile_genetic_code(self.genetic_code)
+        self.assertIs(code, translate.compile_genetic_code(self.genetic_code))
+        self.assertIs(code, translate.compile_genetic_code(code))
+
+    def test_translate_through_stops(self):
+        code = translate.compile_genetic_code(self.genetic_code)
+        self.assertEqual(code.translate("GUCGAAUAACGAA"), "VE*R")
+        self.assertEqual(code.translate("GUCGAAUAACGAA", 1), "SNNE")
+        self.assertEqual(code.translate(b"gucgaauaacgaa"), "VE*R")
+
+    def test_matches_dict_lookup(self):
+        code = translate.compile_genetic_code(self.genetic_code)
+        codons = sorted(self.genetic_code)
+        seq = "".join(codons)
+        self.assertEqual(code.translate(seq),
+                "".join(self.genetic_code[c] for c in codons))
+
+    def test_long_sequence_to_stop(self):
+        code = translate.compile_genetic_code(self.genetic_code)
+        seq = ("GUC" * 5000) + "UAA" + "GUC"
+        self.assertEqual(code.translate_to_stop(seq), "V" * 5000)
+        self.assertEqual(code.translate_to_stop(seq[:-7]), "V" * 4999)
+
+    def test_invalid_codon(self):
+        code = translate.compile_genetic_code(self.genetic_code)
+        self.assertRaises(KeyError, code.translate, "GUCNNN")
+        self.assertRaises(KeyError, translate.translate_sequence,
+                "GUCNNN", code)
+        self.assertEqual(translate.translate_sequence("GUCUAANNN", code), "V")
+
+    def test_incomplete_genetic_code(self):
+        self.assertRaises(ValueError, translate.CompiledGeneticCode,
+                {'AUG': 'M'})
+
+
+class TestTranslateMany(TestTranslateBaseClass):
+    def setUp(self):
+        TestTranslateBaseClass.setUp(self)
+        self.sequences = ["AUGGUACAUUAG", "", "gu", "GUCGAAUAACGAA",
+                b"CCAUGCCCUAAGGAUGUUUUUUUGA", "UUAUUAUUA"]
+
+    def test_translate_many(self):
+        for batch_bases in (1, 10, 1 << 20):
+            peptides = translate.translate_many(self.sequences,
+                    self.genetic_code, batch_bases = batch_bases)
+            self.assertEqual(list(peptides),
+                    [translate.translate_sequence(s, self.genetic_code)
+                            for s in self.sequences])
+        self.assertEqual(len(peptides), 6)
+        self.assertEqual(peptides.buffer, b"MVHVEPCPKDVFLLLL")
+        self.assertEqual(list(peptides.offsets), [0, 3, 3, 3, 5, 13, 16])
+        self.assertEqual(peptides.view(0), b"MVH")
+        self.assertRaises(IndexError, peptides.__getitem__, 6)
+
+    def test_translate_many_through_stops(self):
+        code = translate.compile_genetic_code(self.genetic_code)
+        self.assertEqual(list(translate.translate_many(self.sequences, code,
+                to_stop = False)), [code.translate(s) for s in self.sequences])
+
+    def test_longest_peptide_many(self):
+        for batch_bases in (1, 10, 1 << 20):
+            self.assertEqual(list(translate.longest_peptide_many(
+                    self.sequences, self.genetic_code,
+                    batch_bases = batch_bases)),
+                    [translate.get_longest_peptide(s, self.genetic_code)
+                            for s in self.sequences])
+
+    def test_invalid_codon(self):
+        self.assertRaises(KeyError, translate.translate_many,
+                ["GUC", "GUCNNN"], self.genetic_code)
+        self.assertEqual(list(translate.translate_many(["GUCUAANNN"],
+                self.genetic_code)), ["V"])
+        self.assertRaises(KeyError, translate.longest_peptide_many,
+                ["AUG", "AUGNNN"], self.genetic_code)
+
+
 if __name__ == '__main__':
     unittest.main() 
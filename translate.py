@@ -1,6 +1,325 @@
 #! /usr/bin/env python3
 
+import os
 import sys
+import array
+import heapq
+import functools
+import collections
+import concurrent.futures
+from multiprocessing import shared_memory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import result_cache
+import stats
+
+
+class CompiledGeneticCode(object):
+    """A genetic code precompiled into lookup tables for fast translation.
+
+    The 64 codons of `genetic_code` are numbered by packing their bases into
+    2-bit values. Three 256-entry tables (one for each position in a codon)
+    map every base to its contribution to the codon index, and a fourth
+    256-entry table maps codon indices to amino acids. A whole reading frame
+    is translated with a handful of C-level `bytes.translate` calls and one
+    big-integer addition, so no string is allocated per codon.
+
+    Parameters
+    ----------
+    genetic_code : dict
+        A dictionary mapping all 64 codons (strings of three RNA bases) to
+        amino acids (string of single-letter amino acid abbreviation). Stop
+        codons should be represented with asterisks ('*').
+    start_codons : iterable of strings
+        The codons at which translations are started by
+        `get_all_translations` and `get_longest_peptide`.
+
+    Examples
+    --------
+    >>> code = CompiledGeneticCode({a + b + c: 'X' for a in 'ACGU'
+    ...         for b in 'ACGU' for c in 'ACGU'})
+    >>> code.translate('AUGccc')
+    'XX'
+    """
+
+    _INVALID_AMINO_ACID = 0
+
+    def __init__(self, genetic_code, start_codons = ('AUG',)):
+        codons = {}
+        for codon, amino_acid in genetic_code.items():
+            codons[codon.upper()] = amino_acid
+        bases = sorted(set("".join(codons)))
+        if (len(codons) != 64) or (len(bases) != 4) or (
+                set(len(c) for c in codons) != {3}):
+            raise ValueError(
+                    "A genetic code must map all 64 codons of a 4-base "
+                    "alphabet; got {0} codons of bases {1!r}".format(
+                            len(codons), "".join(bases)))
+        self.genetic_code = codons
+        self.bases = "".join(bases)
+        self.start_codons = frozenset(c.upper() for c in start_codons)
+        self.stop_codons = frozenset(
+                c for c, aa in codons.items() if aa == '*')
+
+        self._position_tables = _make_position_tables(bases)
+
+        amino_acid_table = bytearray([self._INVALID_AMINO_ACID]) * 256
+        for codon, amino_acid in codons.items():
+            amino_acid_table[self.codon_index(codon)] = ord(amino_acid)
+        self._amino_acid_table = bytes(amino_acid_table)
+        start_table = bytearray(256)
+        for codon in self.start_codons:
+            start_table[self.codon_index(codon)] = 1
+        self._start_table = bytes(start_table)
+        self._numpy_tables = None
+        # What results depend on, for `result_cache.make_key`
+        self._cache_key = (self.bases, self._amino_acid_table,
+                tuple(sorted(self.start_codons)))
+
+    def codon_index(self, codon):
+        """Return the 2-bit packed index (0-63) of `codon`."""
+        index = 0
+        for base in codon.upper():
+            index = (index * 4) + self.bases.index(base)
+        return index
+
+    def codon_indices(self, sequence, frame = 0):
+        """Return the indices of all complete codons in `frame` as bytes.
+
+        Codons that contain a base outside of the code's alphabet get an
+        index >= 64.
+        """
+        return _pack_codons(sequence, frame, self._position_tables)
+
+    def numpy_tables(self):
+        """Return the lookup tables of the code as NumPy arrays.
+
+        The arrays are built on first use and returned as a tuple of the
+        three position tables (uint8 arrays of length 256), and boolean masks
+        of the start and stop codon indices (of length 256, so the invalid
+        indices >= 64 are all False).
+        """
+        if self._numpy_tables is None:
+            position_tables = tuple(
+                    numpy.frombuffer(t, dtype = numpy.uint8)
+                    for t in self._position_tables)
+            is_start = numpy.zeros(256, dtype = bool)
+            is_start[[self.codon_index(c) for c in self.start_codons]] = True
+            is_stop = numpy.zeros(256, dtype = bool)
+            is_stop[[self.codon_index(c) for c in self.stop_codons]] = True
+            self._numpy_tables = position_tables + (is_start, is_stop)
+        return self._numpy_tables
+
+    def index_frame(self, sequence, frame = 0):
+        """Translate `frame` of `sequence` once and index its translations.
+
+        The frame is translated in a single linear pass, and the positions of
+        its start and stop codons are recorded. Each translation (from a
+        start codon up to, but excluding, the next in-frame stop codon or the
+        end of the frame) is returned as a pair of codon offsets into the
+        translated frame, so its peptide is `amino_acids[start:end]`.
+
+        A `KeyError` is raised if a translation contains a codon that is not
+        in the genetic code.
+
+        Returns
+        -------
+        tuple
+            The translated frame as ASCII bytes (stop codons as asterisks),
+            and a list of (start, end) codon offsets, ordered by start.
+        """
+        indices = self.codon_indices(sequence, frame)
+        amino_acids = indices.translate(self._amino_acid_table)
+        is_start = indices.translate(self._start_table)
+        orfs = []
+        start = is_start.find(1)
+        while start >= 0:
+            end = amino_acids.find(b'*', start)
+            if end < 0:
+                end = len(amino_acids)
+            self._check_translation(sequence, frame, amino_acids, end,
+                    start)
+            while 0 <= start < end:
+                orfs.append((start, end))
+                start = is_start.find(1, start + 1)
+        return amino_acids, orfs
+
+    def _translate_bytes(self, sequence, frame = 0):
+        return self.codon_indices(sequence, frame).translate(
+                self._amino_acid_table)
+
+    def _check_translation(self, sequence, frame, amino_acids, end = None,
+            start = 0):
+        bad = amino_acids.find(self._INVALID_AMINO_ACID, start, end)
+        if bad >= 0:
+            seq = _as_bytes(sequence)
+            start = frame + (3 * bad)
+            raise KeyError(bytes(seq[start:start + 3]).decode(
+                    'ascii', 'replace'))
+
+    def translate(self, sequence, frame = 0):
+        """Translate every complete codon in `frame` of `sequence`.
+
+        Stop codons are translated to asterisks; translation does not end at
+        them. A `KeyError` naming the offending codon is raised if the frame
+        contains a codon that is not in the genetic code.
+
+        Parameters
+        ----------
+        sequence : str, bytes, bytearray or memoryview
+            An RNA sequence (upper or lower-case).
+        frame : int
+            The index of the first base of the first codon.
+
+        Returns
+        -------
+        str
+            A string of amino acids, one for each complete codon.
+        """
+        amino_acids = self._translate_bytes(sequence, frame)
+        self._check_translation(sequence, frame, amino_acids)
+        return amino_acids.decode('ascii')
+
+    def translate_to_stop(self, sequence, frame = 0, chunk_size = 3072):
+        """Translate `frame` of `sequence` up to the first stop codon.
+
+        The frame is translated in chunks of growing size, so an early stop
+        codon avoids translating the rest of a long sequence.
+
+        Returns
+        -------
+        str
+            A string of amino acids, without the stop codon.
+        """
+        seq = _as_bytes(sequence)
+        chunk_size -= chunk_size % 3
+        pieces = []
+        start = frame
+        while start + 3 <= len(seq):
+            end = min(start + chunk_size, len(seq))
+            chunk = seq[start:end]
+            amino_acids = self._translate_bytes(chunk)
+            stop = amino_acids.find(b'*')
+            if stop >= 0:
+                self._check_translation(chunk, 0, amino_acids, stop)
+                pieces.append(amino_acids[:stop].decode('ascii'))
+                break
+            self._check_translation(chunk, 0, amino_acids)
+            pieces.append(amino_acids.decode('ascii'))
+            start += chunk_size
+            chunk_size *= 2
+        return "".join(pieces)
+
+
+def _as_bytes(sequence):
+    if isinstance(sequence, str):
+        return sequence.encode('ascii', 'replace')
+    return sequence
+
+def _as_buffer(sequence, code):
+    # Like `_as_bytes`, but a `sequence.Sequence` (which can be sliced like
+    # bytes, but has no buffer) is unpacked in the alphabet of `code`
+    if hasattr(sequence, 'codon_indices'):
+        return sequence.encode('DNA' if 'T' in code.bases else 'RNA')
+    return _as_bytes(sequence)
+
+def _make_position_tables(bases, aliases = None):
+    # Invalid bases map to 64 in every position table, so any codon
+    # containing one sums to an index >= 64. The largest possible sum
+    # (3 * 64) still fits in a byte, so adding the packed columns as big
+    # integers never carries from one codon into the next.
+    tables = []
+    for position in range(3):
+        table = bytearray([64]) * 256
+        multiplier = 4 ** (2 - position)
+        for code, base in enumerate(bases):
+            for b in [base] + (aliases or {}).get(base, []):
+                table[ord(b.upper())] = code * multiplier
+                table[ord(b.lower())] = code * multiplier
+        tables.append(bytes(table))
+    return tables
+
+def _pack_codons(sequence, frame, position_tables):
+    # A `sequence.Sequence` (or view of one) computes its codon indices from
+    # its packed bases
+    codon_indices = getattr(sequence, 'codon_indices', None)
+    if codon_indices is not None:
+        return codon_indices(frame)
+    seq = _as_bytes(sequence)
+    n = (len(seq) - frame) // 3
+    if n <= 0:
+        return b''
+    end = frame + (3 * n)
+    packed = 0
+    for position, table in enumerate(position_tables):
+        column = bytes(seq[frame + position:end:3]).translate(table)
+        packed += int.from_bytes(column, 'big')
+    return packed.to_bytes(n, 'big')
+
+_RNA_POSITION_TABLES = _make_position_tables('ACGU', {'U': ['T']})
+
+def codon_indices(sequence, frame = 0):
+    """Return the 2-bit packed indices of the codons in `frame` of `sequence`.
+
+    Each complete codon is numbered 0-63 as (16 * b1) + (4 * b2) + b3, where
+    A, C, G and U (or T) are 0, 1, 2 and 3, regardless of case. Codons that
+    contain any other character get an index >= 64. The indices are computed
+    with table lookups and big-integer addition, with no per-codon loop.
+
+    Parameters
+    ----------
+    sequence : str, bytes, bytearray or memoryview
+        An RNA or DNA sequence.
+    frame : int
+        The index of the first base of the first codon.
+
+    Returns
+    -------
+    bytes
+        One byte per complete codon.
+
+    Examples
+    --------
+    >>> list(codon_indices('AAACCUgut'))
+    [0, 23, 47]
+    """
+    return _pack_codons(sequence, frame, _RNA_POSITION_TABLES)
+
+
+@functools.lru_cache(maxsize = 32)
+def _compile_genetic_code_items(items):
+    return CompiledGeneticCode(dict(items))
+
+def compile_genetic_code(genetic_code):
+    """Return `genetic_code` as a `CompiledGeneticCode`.
+
+    A `CompiledGeneticCode` is returned as is. A dict is compiled, and the
+    most recently used compilations are cached, so passing the same dict on
+    every call only pays for compiling it once. An int is the ID of an NCBI
+    translation table, as returned by `genetic_codes.get_genetic_code`.
+
+    Parameters
+    ----------
+    genetic_code : dict, int or CompiledGeneticCode
+        A dictionary mapping all 64 codons (strings of three RNA bases) to
+        amino acids (string of single-letter amino acid abbreviation), the
+        ID of an NCBI translation table, or a compiled genetic code.
+
+    Returns
+    -------
+    CompiledGeneticCode
+    """
+    if isinstance(genetic_code, CompiledGeneticCode):
+        return genetic_code
+    if isinstance(genetic_code, int):
+        import genetic_codes
+        return genetic_codes.get_genetic_code(genetic_code)
+    return _compile_genetic_code_items(tuple(sorted(genetic_code.items())))
+
 
 def translate_sequence(rna_sequence, genetic_code):
     """Translates a sequence of RNA into a sequence of amino acids.
@@ -16,21 +335,27 @@ def translate_sequence(rna_sequence, genetic_code):
     Parameters
     ----------
     rna_sequence : str
-        A string representing an RNA sequence (upper or lower-case).
+        A string representing an RNA sequence (upper or lower-case). A
+        `bytes`, `bytearray` or `memoryview` of ASCII bases can be passed
+        instead, such as a window of a memory-mapped file, or a packed
+        `sequence.Sequence`.
 
-    genetic_code : dict
+    genetic_code : dict, int or CompiledGeneticCode
         A dictionary mapping all 64 codons (strings of three RNA bases) to
         amino acids (string of single-letter amino acid abbreviation). Stop
-        codons should be represented with asterisks ('*').
+        codons should be represented with asterisks ('*'). A genetic code
+        compiled with `compile_genetic_code`, or the ID of an NCBI
+        translation table (see `genetic_codes`), can be passed instead.
 
     Returns
     -------
     str
         A string of the translated amino acids.
     """
-    pass
+    code = compile_genetic_code(genetic_code)
+    return code.translate_to_stop(rna_sequence)
 
-def get_all_translations(rna_sequence, genetic_code):
+def get_all_translations(rna_sequence, genetic_code, views = False):
     """Get a list of all amino acid sequences encoded by an RNA sequence.
 
     All three reading frames of `rna_sequence` are scanned from 'left' to
@@ -48,12 +373,24 @@ def get_all_translations(rna_sequence, genetic_code):
     Parameters
     ----------
     rna_sequence : str
-        A string representing an RNA sequence (upper or lower-case).
+        A string representing an RNA sequence (upper or lower-case). A
+        `bytes`, `bytearray` or `memoryview` of ASCII bases can be passed
+        instead, such as a window of a memory-mapped file, or a packed
+        `sequence.Sequence`.
 
-    genetic_code : dict
+    genetic_code : dict, int or CompiledGeneticCode
         A dictionary mapping all 64 codons (strings of three RNA bases) to
         amino acids (string of single-letter amino acid abbreviation). Stop
-        codons should be represented with asterisks ('*').
+        codons should be represented with asterisks ('*'). A genetic code
+        compiled with `compile_genetic_code`, or the ID of an NCBI
+        translation table (see `genetic_codes`), can be passed instead.
+
+    views : bool
+        If True, each peptide is returned as a read-only `memoryview` of ASCII
+        amino acids instead of a string. All of the peptides of a reading
+        frame are views into the same buffer, so nested translations (those
+        that start at an in-frame 'AUG' within another translation) share
+        memory.
 
     Returns
     -------
@@ -61,7 +398,161 @@ def get_all_translations(rna_sequence, genetic_code):
         A list of strings; each string is an sequence of amino acids encoded by
         `rna_sequence`.
     """
-    pass
+    return [t.peptide for t in iter_all_translations(rna_sequence,
+            genetic_code, views = views)]
+
+Translation = collections.namedtuple('Translation',
+        ['peptide', 'frame', 'start', 'end'])
+Translation.__doc__ = """A peptide translated from a sequence.
+
+`start` is the index of the first base of the start codon, and `end` is the
+index just past the last translated codon (the stop codon, if any, is not
+included), so the translated bases are `sequence[start:end]`.
+"""
+
+def iter_all_translations(rna_sequence, genetic_code, views = False,
+        chunk_size = 196608):
+    """Lazily generate all amino acid sequences encoded by an RNA sequence.
+
+    Yields the same peptides, in the same order, as `get_all_translations`,
+    each as a `Translation` with its frame and coordinates. Each frame is
+    translated `chunk_size` bases at a time, and a peptide is yielded as soon
+    as its stop codon (or the end of the frame) is reached, so memory use is
+    bounded by the chunk size and the longest translation, not by the length
+    of `rna_sequence` or the number of translations. Stopping iteration early
+    skips the rest of the work.
+
+    Parameters
+    ----------
+    rna_sequence : str, bytes, bytearray or memoryview
+        An RNA sequence (upper or lower-case).
+
+    genetic_code : dict or CompiledGeneticCode
+        A dictionary mapping all 64 codons (strings of three RNA bases) to
+        amino acids (string of single-letter amino acid abbreviation), or a
+        compiled genetic code.
+
+    views : bool
+        If True, each peptide is a read-only `memoryview` of ASCII amino
+        acids, and nested translations (those that start at an in-frame
+        start codon within another translation) share one buffer.
+
+    chunk_size : int
+        The number of bases translated at a time.
+
+    Yields
+    ------
+    Translation
+    """
+    code = compile_genetic_code(genetic_code)
+    seq = _as_bytes(rna_sequence)
+    chunk_size = max(3, chunk_size - (chunk_size % 3))
+    for frame in range(3):
+        starts = []
+        pieces = []
+        for chunk_start in range(frame, len(seq) - 2, chunk_size):
+            chunk = seq[chunk_start:chunk_start + chunk_size]
+            indices = code.codon_indices(chunk)
+            amino_acids = indices.translate(code._amino_acid_table)
+            is_start = indices.translate(code._start_table)
+            position = 0
+            while True:
+                stop = amino_acids.find(b'*', position)
+                end = len(amino_acids) if stop < 0 else stop
+                start = is_start.find(1, position, end)
+                if (not starts) and (start >= 0):
+                    position = start
+                while start >= 0:
+                    starts.append(chunk_start + (3 * start))
+                    start = is_start.find(1, start + 1, end)
+                if starts:
+                    code._check_translation(chunk, 0, amino_acids, end,
+                            position)
+                    pieces.append(amino_acids[position:end])
+                if stop < 0:
+                    break
+                if starts:
+                    for translation in _split_translations(starts, pieces,
+                            frame, chunk_start + (3 * stop), views):
+                        yield translation
+                    starts, pieces = [], []
+                position = stop + 1
+        if starts:
+            end = frame + (3 * ((len(seq) - frame) // 3))
+            for translation in _split_translations(starts, pieces, frame,
+                    end, views):
+                yield translation
+
+def _split_translations(starts, pieces, frame, end, views):
+    # Nested starts end at the same codon as the first start of their
+    # stretch of the frame, so that stretch is joined once and each peptide
+    # is a suffix of it.
+    segment = b"".join(pieces)
+    if views:
+        segment = memoryview(segment).toreadonly()
+    else:
+        segment = segment.decode('ascii')
+    for start in starts:
+        yield Translation(segment[(start - starts[0]) // 3:], frame, start,
+                end)
+
+_COMPLEMENTS = {
+        'A': 'U', 'C': 'G', 'G': 'C', 'U': 'A', 'T': 'A',
+        'M': 'K', 'K': 'M', 'R': 'Y', 'Y': 'R', 'W': 'W', 'S': 'S',
+        'B': 'V', 'V': 'B', 'D': 'H', 'H': 'D', 'N': 'N',
+        }
+
+def _make_complement_table(a_complement):
+    # Bytes that are not nucleotides (or IUPAC ambiguity codes) map to 0, so
+    # a single `find` after translating detects them.
+    table = bytearray(256)
+    for base, complement in _COMPLEMENTS.items():
+        if base == 'A':
+            complement = a_complement
+        table[ord(base)] = ord(complement)
+        table[ord(base.lower())] = ord(complement)
+    return bytes(table)
+
+_COMPLEMENT_TABLES = {
+        'RNA': _make_complement_table('U'),
+        'DNA': _make_complement_table('T'),
+        }
+_UPPER_TABLE = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz",
+        b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+def _iter_chunks(sequence, chunk_size):
+    for i in range(0, len(sequence), chunk_size):
+        yield bytes(sequence[i:i + chunk_size])
+
+def _get_complement_table(sequence, alphabet):
+    if alphabet is None:
+        if isinstance(sequence, memoryview):
+            is_dna = any((b'T' in c) or (b't' in c)
+                    for c in _iter_chunks(sequence, 1 << 20))
+        elif isinstance(sequence, str):
+            is_dna = ('T' in sequence) or ('t' in sequence)
+        else:
+            is_dna = (b'T' in sequence) or (b't' in sequence)
+        alphabet = 'DNA' if is_dna else 'RNA'
+    try:
+        return _COMPLEMENT_TABLES[alphabet.upper()]
+    except KeyError:
+        raise ValueError("Unknown alphabet: {0!r}".format(alphabet))
+
+def _translate_complement(sequence, table):
+    complement = bytes(_as_bytes(sequence)).translate(table)
+    invalid = complement.find(0)
+    if invalid >= 0:
+        raise KeyError(sequence[invalid:invalid + 1])
+    return complement
+
+def _like(sequence, result):
+    # Return `result` (bytes) as the type of `sequence`.
+    if isinstance(sequence, str):
+        return result.decode('ascii')
+    if isinstance(sequence, bytearray):
+        return bytearray(result)
+    return result
 
 def get_reverse(sequence):
     """Reverse orientation of `sequence`.
@@ -70,28 +561,47 @@ def get_reverse(sequence):
 
     If `sequence` is empty, an empty string is returned.
 
+    A `bytes`, `bytearray` or `memoryview` `sequence` is returned as
+    `bytes` (or `bytearray`).
+
     Examples
     --------
     >>> get_reverse('AUGC')
     'CGUA'
+    >>> get_reverse(b'augc')
+    b'CGUA'
     """
-    pass
+    if isinstance(sequence, str):
+        return sequence[::-1].upper()
+    return _like(sequence, bytes(sequence)[::-1].translate(_UPPER_TABLE))
 
-def get_complement(sequence):
+def get_complement(sequence, alphabet = None):
     """Get the complement of a `sequence` of nucleotides.
 
     Returns a string with the complementary sequence of `sequence`.
 
     If `sequence` is empty, an empty string is returned.
 
+    The complement is looked up in a precomputed translation table, which
+    includes the IUPAC ambiguity codes. The complement of 'A' is 'U' for RNA
+    and 'T' for DNA; unless `alphabet` is given as 'RNA' or 'DNA',
+    `sequence` is treated as DNA if it contains a 'T'. A `KeyError` is
+    raised if `sequence` contains a character that is not a nucleotide.
+
+    A `bytes`, `bytearray` or `memoryview` `sequence` is returned as
+    `bytes` (or `bytearray`).
+
     Examples
     --------
     >>> get_complement('AUGC')
     'UACG'
+    >>> get_complement('ATGCRN')
+    'TACGYN'
     """
-    pass
+    table = _get_complement_table(sequence, alphabet)
+    return _like(sequence, _translate_complement(sequence, table))
 
-def reverse_and_complement(sequence):
+def reverse_and_complement(sequence, alphabet = None):
     """Get the reversed and complemented form of a `sequence` of nucleotides.
 
     Returns a string that is the reversed and complemented sequence
@@ -99,14 +609,59 @@ def reverse_and_complement(sequence):
 
     If `sequence` is empty, an empty string is returned.
 
+    See `get_complement` for the alphabets, and the types of `sequence`,
+    that are accepted. For a `sequence.Sequence`, its cached reverse and
+    complement (a `Sequence`) is returned.
+
     Examples
     --------
     >>> reverse_and_complement('AUGC')
     'GCAU'
     """
-    pass
+    reverse_complement = getattr(sequence, 'reverse_complement', None)
+    if reverse_complement is not None:
+        # A `sequence.Sequence` caches its reverse and complement
+        return reverse_complement()
+    table = _get_complement_table(sequence, alphabet)
+    return _like(sequence, _translate_complement(sequence, table)[::-1])
+
+def reverse_and_complement_in_place(buffer, alphabet = None,
+        chunk_size = 1 << 20):
+    """Reverse and complement a `bytearray` (or writable `memoryview`) in place.
+
+    The buffer is validated and then rewritten from both ends a chunk at a
+    time, so only about two chunks of extra memory are used however large
+    the buffer is. If the buffer contains a character that is not a
+    nucleotide, a `KeyError` is raised and the buffer is left unchanged.
 
-def get_longest_peptide(rna_sequence, genetic_code):
+    Examples
+    --------
+    >>> seq = bytearray(b'AUGCC')
+    >>> reverse_and_complement_in_place(seq)
+    >>> seq
+    bytearray(b'GGCAU')
+    """
+    view = memoryview(buffer)
+    if view.readonly:
+        raise TypeError("A writable buffer is needed to reverse and "
+                "complement in place")
+    table = _get_complement_table(view, alphabet)
+    for chunk in _iter_chunks(view, chunk_size):
+        invalid = chunk.translate(table).find(0)
+        if invalid >= 0:
+            raise KeyError(chunk[invalid:invalid + 1])
+    left, right = 0, len(view)
+    while (right - left) >= (2 * chunk_size):
+        head = bytes(view[left:left + chunk_size])
+        tail = bytes(view[right - chunk_size:right])
+        view[left:left + chunk_size] = tail.translate(table)[::-1]
+        view[right - chunk_size:right] = head.translate(table)[::-1]
+        left += chunk_size
+        right -= chunk_size
+    view[left:right] = bytes(view[left:right]).translate(table)[::-1]
+
+def get_longest_peptide(rna_sequence, genetic_code, backend = None,
+        jobs = 1, cache = None):
     """Get the longest peptide encoded by an RNA sequence.
 
     Explore six reading frames of `rna_sequence` (the three reading frames of
@@ -120,12 +675,36 @@ def get_longest_peptide(rna_sequence, genetic_code):
     Parameters
     ----------
     rna_sequence : str
-        A string representing an RNA sequence (upper or lower-case).
+        A string representing an RNA sequence (upper or lower-case). A
+        `bytes`, `bytearray` or `memoryview` of ASCII bases can be passed
+        instead, such as a window of a memory-mapped file, or a packed
+        `sequence.Sequence`.
 
-    genetic_code : dict
+    genetic_code : dict, int or CompiledGeneticCode
         A dictionary mapping all 64 codons (strings of three RNA bases) to
         amino acids (string of single-letter amino acid abbreviation). Stop
-        codons should be represented with asterisks ('*').
+        codons should be represented with asterisks ('*'). A genetic code
+        compiled with `compile_genetic_code`, or the ID of an NCBI
+        translation table (see `genetic_codes`), can be passed instead.
+
+    backend : str or None
+        Either 'python' or 'numpy'. The default (None) uses the NumPy backend
+        when NumPy is installed and `rna_sequence` is long enough for
+        vectorizing to pay off, and the pure-Python backend otherwise. Both
+        backends return the same peptide.
+
+    jobs : int or None
+        The number of processes to search with. With more than one job (or
+        None, for the number of CPUs), `rna_sequence` and its reverse and
+        complement are copied once into shared memory, and chunks of its six
+        frames are searched by a process pool with the NumPy backend (so
+        `backend` must be None or 'numpy'). The same peptide is returned as
+        with one job. A `ValueError` is raised for fewer than one job.
+
+    cache : result_cache.ResultCache or None
+        A cache of peptides, keyed by a hash of `rna_sequence` and the
+        genetic code. If the peptide of the sequence is in the cache it is
+        returned without searching, and otherwise it is added to the cache.
 
     Returns
     -------
@@ -133,8 +712,605 @@ def get_longest_peptide(rna_sequence, genetic_code):
         A string of the longest sequence of amino acids encoded by
         `rna_sequence`.
     """
-    pass
+    if (jobs is not None) and (jobs < 1):
+        raise ValueError("The number of jobs must be at least 1: {0!r}".format(
+                jobs))
+    code = compile_genetic_code(genetic_code)
+    if cache is not None:
+        key = result_cache.make_key('get_longest_peptide',
+                _as_buffer(rna_sequence, code), code._cache_key)
+        peptide = cache.get(key)
+        if peptide is None:
+            peptide = get_longest_peptide(rna_sequence, code,
+                    backend = backend, jobs = jobs)
+            cache.put(key, peptide)
+        return peptide
+    started = stats.start()
+    peptide = _get_longest_peptide(rna_sequence, code, backend, jobs)
+    if started is not None:
+        n = len(rna_sequence)
+        stats.stop('translate', started, bytes = n,
+                codons = 2 * sum(max(0, (n - f) // 3) for f in range(3)),
+                peptides = 1)
+    return peptide
+
+def _get_longest_peptide(rna_sequence, code, backend, jobs):
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs != 1:
+        if backend not in (None, 'numpy'):
+            raise ValueError("Searching with more than one job requires the "
+                    "'numpy' backend")
+        if numpy is None:
+            raise ImportError("Searching with more than one job requires "
+                    "NumPy")
+        return _get_longest_peptide_parallel(rna_sequence, code, jobs)
+    if backend is None:
+        if (numpy is not None) and (
+                len(rna_sequence) >= _NUMPY_MIN_SEQUENCE_LENGTH):
+            backend = 'numpy'
+        else:
+            backend = 'python'
+    if backend == 'numpy':
+        if numpy is None:
+            raise ImportError("The 'numpy' backend requires NumPy")
+        return _get_longest_peptide_numpy(rna_sequence, code)
+    if backend != 'python':
+        raise ValueError("Unknown backend: {0!r}".format(backend))
+    peptides = get_all_translations(rna_sequence, code)
+    peptides += get_all_translations(reverse_and_complement(rna_sequence),
+            code)
+    if not peptides:
+        return ""
+    return max(peptides, key = len)
+
+_NUMPY_MIN_SEQUENCE_LENGTH = 3000
+
+def _get_longest_peptide_numpy(rna_sequence, code):
+    """Vectorized `get_longest_peptide`.
+
+    The only peptide of a stop-delimited stretch of a frame that can be the
+    longest is the one from its first start codon, so the length of every
+    candidate is found with a `searchsorted` of the start codon positions
+    into the stop codon positions. Ties are broken in the same order as the
+    pure-Python backend: forward frames before reverse frames, and lower
+    frames and earlier starts first.
+    """
+    first_table, second_table, third_table, is_start, is_stop = (
+            code.numpy_tables())
+    best_length = 0
+    best_peptide = ""
+    if isinstance(rna_sequence, str):
+        forward = rna_sequence.upper()
+    else:
+        forward = bytes(_as_buffer(rna_sequence, code)).translate(
+                _UPPER_TABLE)
+    for strand in (forward, reverse_and_complement(rna_sequence)):
+        strand = _as_buffer(strand, code)
+        seq = numpy.frombuffer(strand, dtype = numpy.uint8)
+        for frame in range(3):
+            n = (len(seq) - frame) // 3
+            if n <= 0:
+                continue
+            end = frame + (3 * n)
+            indices = (first_table[seq[frame:end:3]] +
+                    second_table[seq[frame + 1:end:3]] +
+                    third_table[seq[frame + 2:end:3]])
+            starts = numpy.flatnonzero(is_start[indices])
+            if len(starts) == 0:
+                continue
+            stops = numpy.flatnonzero(is_stop[indices])
+            next_stop = numpy.searchsorted(stops, starts)
+            ends = numpy.append(stops, n)[next_stop]
+            lengths = ends - starts
+            best = int(numpy.argmax(lengths))
+            invalid = numpy.flatnonzero(indices >= 64)
+            if len(invalid):
+                # Every translated peptide is checked for invalid codons, as
+                # translating them would be in the pure-Python backend.
+                first_starts = numpy.ones(len(starts), dtype = bool)
+                first_starts[1:] = next_stop[1:] != next_stop[:-1]
+                from_invalid = numpy.searchsorted(invalid,
+                        starts[first_starts])
+                to_invalid = numpy.searchsorted(invalid, ends[first_starts])
+                if numpy.any(to_invalid > from_invalid):
+                    i = int(invalid[from_invalid[to_invalid > from_invalid][0]])
+                    codon = _as_bytes(strand)[frame + (3 * i):
+                            frame + (3 * i) + 3]
+                    raise KeyError(codon.decode('ascii', 'replace'))
+            if int(lengths[best]) > best_length:
+                best_length = int(lengths[best])
+                best_peptide = code.translate_to_stop(strand,
+                        frame + (3 * int(starts[best])))
+    return best_peptide
+
+
+# The most codons of a frame that a worker of `_get_longest_peptide_parallel`
+# summarizes at a time
+_PARALLEL_CHUNK_CODONS = 1 << 22
+
+# The shared memory block attached to by each worker process
+_shared_sequence = None
+
+def _attach_shared_sequence(name):
+    global _shared_sequence
+    _shared_sequence = shared_memory.SharedMemory(name = name)
+
+def _first_between(positions, begin, end):
+    # Return the first of the sorted `positions` in [begin, end), or -1
+    i = int(numpy.searchsorted(positions, begin))
+    if (i < len(positions)) and (positions[i] < end):
+        return int(positions[i])
+    return -1
+
+def _summarize_region(starts, invalid, begin, end):
+    # Summarize a stretch of codons with no stop codon by its first start
+    # codon, its first invalid codon, and its first invalid codon at or
+    # after that start (all -1 if there is none)
+    first_start = _first_between(starts, begin, end)
+    first_invalid = _first_between(invalid, begin, end)
+    invalid_after_start = -1
+    if first_start >= 0:
+        invalid_after_start = _first_between(invalid, first_start, end)
+    return first_start, first_invalid, invalid_after_start
+
+def _join_regions(left, right):
+    # Summarize two adjacent stop-free stretches as one
+    first_invalid = left[1] if left[1] >= 0 else right[1]
+    if left[0] >= 0:
+        return left[0], first_invalid, (
+                left[2] if left[2] >= 0 else right[1])
+    return right[0], first_invalid, right[2]
 
+def _shift(position, offset):
+    return position + offset if position >= 0 else -1
+
+def _summarize_frame_chunk(code, offset, length, frame, first_codon,
+        last_codon):
+    """Summarize codons [first_codon, last_codon) of a frame of the strand
+    at `offset` of the shared sequence, for `_get_longest_peptide_parallel`.
+
+    Returns the summary of the stretch before the first stop codon, the
+    first stop codon, the longest translation (as its length and start)
+    between the first and last stop codons, the first invalid codon of any
+    translation between them, the summary of the stretch after the last
+    stop codon, and the last stop codon. Positions are codon offsets into
+    the frame, and -1 when there is none.
+    """
+    first_table, second_table, third_table, is_start, is_stop = (
+            code.numpy_tables())
+    seq = numpy.frombuffer(_shared_sequence.buf, dtype = numpy.uint8,
+            count = length, offset = offset)
+    begin = frame + (3 * first_codon)
+    end = frame + (3 * last_codon)
+    indices = (first_table[seq[begin:end:3]] +
+            second_table[seq[begin + 1:end:3]] +
+            third_table[seq[begin + 2:end:3]])
+    del seq
+    n = len(indices)
+    starts = numpy.flatnonzero(is_start[indices])
+    stops = numpy.flatnonzero(is_stop[indices])
+    invalid = numpy.flatnonzero(indices >= 64)
+    if len(stops) == 0:
+        head = _summarize_region(starts, invalid, 0, n)
+        return (tuple(_shift(p, first_codon) for p in head), -1, 0, -1, -1,
+                (-1, -1, -1), -1)
+    head = _summarize_region(starts, invalid, 0, int(stops[0]))
+    tail = _summarize_region(starts, invalid, int(stops[-1]) + 1, n)
+    best_length, best_start, error = 0, -1, -1
+    if len(stops) > 1:
+        # The first start codon between each pair of consecutive stop codons
+        segment_ends = stops[1:]
+        next_start = numpy.append(starts, n)[
+                numpy.searchsorted(starts, stops[:-1] + 1)]
+        has_start = next_start < segment_ends
+        segment_starts = next_start[has_start]
+        segment_ends = segment_ends[has_start]
+        if len(segment_starts):
+            lengths = segment_ends - segment_starts
+            best = int(numpy.argmax(lengths))
+            best_length = int(lengths[best])
+            best_start = int(segment_starts[best]) + first_codon
+            next_invalid = numpy.append(invalid, n)[
+                    numpy.searchsorted(invalid, segment_starts)]
+            bad = next_invalid < segment_ends
+            if numpy.any(bad):
+                error = int(next_invalid[bad][0]) + first_codon
+    return (tuple(_shift(p, first_codon) for p in head),
+            int(stops[0]) + first_codon,
+            best_length, best_start, error,
+            tuple(_shift(p, first_codon) for p in tail),
+            int(stops[-1]) + first_codon)
+
+def _get_longest_peptide_parallel(rna_sequence, code, jobs):
+    """`get_longest_peptide` searched by a pool of `jobs` processes.
+
+    The sequence and its reverse and complement are copied into a shared
+    memory block once, so only the name of the block and codon offsets are
+    sent to the workers. Each worker summarizes
+    a chunk of one frame (see `_summarize_frame_chunk`), and the summaries
+    are joined in order, carrying the stretch after the last stop codon of
+    each chunk into the next. Translations that span chunks are found this
+    way without overlapping the chunks, and ties and invalid codons are
+    resolved in the same order as by the serial backends.
+    """
+    seq = _as_buffer(rna_sequence, code)
+    reverse = _as_buffer(reverse_and_complement(rna_sequence), code)
+    length = len(seq)
+    block = shared_memory.SharedMemory(create = True,
+            size = max(2 * length, 1))
+    try:
+        block.buf[:length] = seq
+        block.buf[length:2 * length] = reverse
+        del reverse
+        tasks = []
+        for offset in (0, length):
+            for frame in range(3):
+                n = max((length - frame) // 3, 0)
+                chunk_codons = min(_PARALLEL_CHUNK_CODONS,
+                        max(-(-n // jobs), 1))
+                tasks.append((offset, frame, n, [
+                        (c, min(c + chunk_codons, n))
+                        for c in range(0, n, chunk_codons)]))
+        with concurrent.futures.ProcessPoolExecutor(jobs,
+                initializer = _attach_shared_sequence,
+                initargs = (block.name,)) as executor:
+            futures = [[executor.submit(_summarize_frame_chunk, code,
+                    offset, length, frame, first_codon, last_codon)
+                    for first_codon, last_codon in chunks]
+                    for offset, frame, n, chunks in tasks]
+            summaries = [[f.result() for f in chunk_futures]
+                    for chunk_futures in futures]
+
+        best = (0, None, None, None)
+        for (offset, frame, n, chunks), frame_summaries in zip(tasks,
+                summaries):
+            candidates = []
+            carry = (-1, -1, -1)
+            for (head, first_stop, best_length, best_start, error, tail,
+                    last_stop) in frame_summaries:
+                carry = _join_regions(carry, head)
+                if first_stop < 0:
+                    continue
+                candidates.append((carry[0], first_stop - carry[0], carry[2]))
+                if error >= 0:
+                    candidates.append((-1, 0, error))
+                candidates.append((best_start, best_length, -1))
+                carry = tail
+            candidates.append((carry[0], n - carry[0], carry[2]))
+            for start, peptide_length, error in candidates:
+                if error >= 0:
+                    i = offset + frame + (3 * error)
+                    raise KeyError(bytes(block.buf[i:i + 3]).decode(
+                            'ascii', 'replace'))
+                if (start >= 0) and (peptide_length > best[0]):
+                    best = (peptide_length, offset, frame, start)
+        if best[1] is None:
+            return ""
+        peptide_length, offset, frame, start = best
+        strand = block.buf[offset:offset + length]
+        try:
+            return code.translate_to_stop(strand, frame + (3 * start))
+        finally:
+            strand.release()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def get_longest_peptides(rna_sequence, genetic_code, k = 10, min_length = 1):
+    """Get the `k` longest peptides encoded by an RNA sequence.
+
+    The six reading frames of `rna_sequence` are explored as by
+    `get_longest_peptide`, but only the lengths of the translations are
+    found (from the positions of start and stop codons in each translated
+    frame), and the `k` longest are kept in a heap. A start codon is
+    skipped, without building its peptide, when the rest of its frame is
+    too short to beat the shortest peptide in a full heap, so only the
+    final `k` peptides are ever built.
+
+    Parameters
+    ----------
+    rna_sequence : str
+        A string representing an RNA sequence (upper or lower-case). A
+        `bytes`, `bytearray` or `memoryview` of ASCII bases, or a packed
+        `sequence.Sequence`, can be passed instead.
+
+    genetic_code : dict, int or CompiledGeneticCode
+        A dictionary mapping all 64 codons (strings of three RNA bases) to
+        amino acids (string of single-letter amino acid abbreviation). Stop
+        codons should be represented with asterisks ('*'). A genetic code
+        compiled with `compile_genetic_code`, or the ID of an NCBI
+        translation table (see `genetic_codes`), can be passed instead.
+
+    k : int
+        The number of peptides to return.
+
+    min_length : int
+        The fewest amino acids a returned peptide can have.
+
+    Returns
+    -------
+    list of str
+        Up to `k` peptides, longest first. Peptides of the same length are
+        in the order of `get_all_translations` of `rna_sequence` followed by
+        its reverse and complement, so the first peptide is the one returned
+        by `get_longest_peptide`.
+
+    Examples
+    --------
+    >>> code = {a + b + c: 'X' for a in 'ACGU' for b in 'ACGU' for c in 'ACGU'}
+    >>> code.update(AUG = 'M', UAA = '*', UAG = '*', UGA = '*')
+    >>> get_longest_peptides('AUGCCCAUGUAAAUGCCCCCCUAG', code, k = 2)
+    ['MXM', 'MXX']
+    >>> get_longest_peptides('AUGCCCAUGUAAAUGCCCCCCUAG', code, min_length = 3)
+    ['MXM', 'MXX']
+    """
+    code = compile_genetic_code(genetic_code)
+    if k <= 0:
+        return []
+    min_length = max(min_length, 1)
+    strands = (rna_sequence, reverse_and_complement(rna_sequence))
+    # A min-heap of the best translations as (length, -count, strand, frame,
+    # start), where `count` numbers the translations in the order they are
+    # found, so the root is the shortest and, of those, the last found
+    heap = []
+    count = 0
+    for strand_index, strand in enumerate(strands):
+        for frame in range(3):
+            indices = code.codon_indices(strand, frame)
+            amino_acids = indices.translate(code._amino_acid_table)
+            is_start = indices.translate(code._start_table)
+            # Every translation must be checked for invalid codons, so none
+            # can be skipped if there are any
+            has_invalid = amino_acids.find(code._INVALID_AMINO_ACID) >= 0
+            n = len(amino_acids)
+            start = is_start.find(1)
+            while start >= 0:
+                shortest = heap[0][0] if len(heap) == k else min_length - 1
+                if (n - start <= shortest) and not has_invalid:
+                    # No later start of the frame can make the cut
+                    break
+                end = amino_acids.find(b'*', start)
+                if end < 0:
+                    end = n
+                if has_invalid:
+                    code._check_translation(strand, frame, amino_acids, end,
+                            start)
+                # The starts up to this stop codon give ever shorter
+                # peptides, so the rest are skipped once one is too short
+                while (0 <= start < end) and (end - start > shortest):
+                    count += 1
+                    item = (end - start, -count, strand_index, frame, start)
+                    if len(heap) < k:
+                        heapq.heappush(heap, item)
+                    else:
+                        heapq.heapreplace(heap, item)
+                    if len(heap) == k:
+                        shortest = heap[0][0]
+                    start = is_start.find(1, start + 1)
+                start = is_start.find(1, end + 1)
+    heap.sort(reverse = True)
+    return [code.translate_to_stop(strands[strand_index], frame + (3 * start))
+            for length, count, strand_index, frame, start in heap]
+
+class Peptides(object):
+    """
+    Peptides stored back to back in one buffer, as returned by
+    `translate_many` and `longest_peptide_many`.
+
+    Peptide `i` is the ASCII amino acids `buffer[offsets[i]:offsets[i + 1]]`,
+    so a batch of any number of peptides is held in two objects rather than
+    a string per peptide. Indexing (and iterating) returns a string, and
+    `view` returns a zero-copy `memoryview`. `offsets` is an `array.array`
+    of 64-bit integers, which `numpy.frombuffer` can wrap without copying.
+
+    Examples
+    --------
+    >>> peptides = Peptides(b'MVMKP', array.array('q', [0, 2, 2, 5]))
+    >>> len(peptides), peptides[0], peptides[-1]
+    (3, 'MV', 'MKP')
+    >>> list(peptides)
+    ['MV', '', 'MKP']
+    """
+
+    __slots__ = ('buffer', 'offsets')
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _span(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not (0 <= i < n):
+            raise IndexError("Peptides index out of range")
+        return self.offsets[i], self.offsets[i + 1]
+
+    def __getitem__(self, i):
+        start, end = self._span(i)
+        return self.buffer[start:end].decode('ascii')
+
+    def view(self, i):
+        """Return peptide `i` as a read-only `memoryview` of the buffer."""
+        start, end = self._span(i)
+        return memoryview(self.buffer)[start:end]
+
+    def __iter__(self):
+        buffer, offsets = self.buffer, self.offsets
+        for i in range(len(self)):
+            yield buffer[offsets[i]:offsets[i + 1]].decode('ascii')
+
+    def __repr__(self):
+        return 'Peptides({0!r})'.format(list(self))
+
+def _join_sequences(sequences, code, batch_bases, reverse = False):
+    # Generate batches of `sequences` joined into one buffer, each sequence
+    # padded with 'N's to a whole number of codons so that the codons of
+    # frame f of every sequence are codons of frame f of the buffer. Each
+    # batch is the buffer, the (base offset, length) of each sequence, and
+    # (if `reverse`) the buffer of the reverses and complements of the
+    # sequences, padded the same way.
+    pieces, reverse_pieces, spans, size = [], [], [], 0
+    for sequence in sequences:
+        buffer = _as_buffer(sequence, code)
+        n = len(buffer)
+        padding = b'N' * ((-n) % 3)
+        pieces.append(buffer)
+        pieces.append(padding)
+        if reverse:
+            reverse_pieces.append(bytes(reverse_and_complement(buffer)))
+            reverse_pieces.append(padding)
+        spans.append((size, n))
+        size += n + len(padding)
+        if size >= batch_bases:
+            yield b"".join(pieces), spans, b"".join(reverse_pieces)
+            pieces, reverse_pieces, spans, size = [], [], [], 0
+    if spans:
+        yield b"".join(pieces), spans, b"".join(reverse_pieces)
+
+def _raise_invalid_codon(buffer, codon):
+    raise KeyError(buffer[3 * codon:(3 * codon) + 3].decode('ascii',
+            'replace'))
+
+def translate_many(sequences, genetic_code, to_stop = True,
+        batch_bases = 1 << 20):
+    """Translate many RNA sequences, as `translate_sequence` does each one.
+
+    The genetic code is compiled once, and the sequences are joined into
+    batches of about `batch_bases` bases that are each translated in one
+    pass; each sequence's peptide is then cut from the translated batch. The
+    peptides are returned in one buffer (see `Peptides`), rather than as a
+    string each.
+
+    Parameters
+    ----------
+    sequences : iterable
+        RNA sequences, as strings (upper or lower-case), `bytes`,
+        `bytearray` or `memoryview` of ASCII bases, or packed
+        `sequence.Sequence`.
+
+    genetic_code : dict, int or CompiledGeneticCode
+        A genetic code, as for `translate_sequence`.
+
+    to_stop : bool
+        If True, each sequence is translated up to its first stop codon, as
+        by `translate_sequence`. Otherwise every complete codon is
+        translated (stop codons as asterisks), as by
+        `CompiledGeneticCode.translate`.
+
+    batch_bases : int
+        The number of bases translated at a time.
+
+    Returns
+    -------
+    Peptides
+        The peptide of each sequence, in order.
+
+    Examples
+    --------
+    >>> code = {a + b + c: 'X' for a in 'ACGU' for b in 'ACGU' for c in 'ACGU'}
+    >>> code.update(AUG = 'M', UAA = '*', UAG = '*', UGA = '*')
+    >>> list(translate_many(['AUGCCC', 'UAA', 'augAUGuagAUG'], code))
+    ['MX', '', 'MM']
+    >>> translate_many(['augAUGuagAUG'], code, to_stop = False)[0]
+    'MM*M'
+    """
+    code = compile_genetic_code(genetic_code)
+    buffer = bytearray()
+    offsets = array.array('q', [0])
+    for joined, spans, _ in _join_sequences(sequences, code, batch_bases):
+        amino_acids = code._translate_bytes(joined)
+        for offset, n in spans:
+            start = offset // 3
+            end = start + (n // 3)
+            if to_stop:
+                stop = amino_acids.find(b'*', start, end)
+                if stop >= 0:
+                    end = stop
+            bad = amino_acids.find(code._INVALID_AMINO_ACID, start, end)
+            if bad >= 0:
+                _raise_invalid_codon(joined, bad)
+            buffer += amino_acids[start:end]
+            offsets.append(len(buffer))
+    return Peptides(bytes(buffer), offsets)
+
+def longest_peptide_many(sequences, genetic_code, batch_bases = 1 << 20):
+    """Get the longest peptide of many RNA sequences.
+
+    Returns the same peptide for each sequence as `get_longest_peptide`. The
+    genetic code is compiled once, and the sequences (and their reverses and
+    complements) are joined into batches of about `batch_bases` bases whose
+    three frames are each translated in one pass. Each sequence's longest
+    translation is then found from the positions of its start and stop
+    codons, without building a string for any other translation, and the
+    peptides are returned in one buffer (see `Peptides`).
+
+    Parameters
+    ----------
+    sequences : iterable
+        RNA sequences, as strings (upper or lower-case), `bytes`,
+        `bytearray` or `memoryview` of ASCII bases, or packed
+        `sequence.Sequence`.
+
+    genetic_code : dict, int or CompiledGeneticCode
+        A genetic code, as for `get_longest_peptide`.
+
+    batch_bases : int
+        The number of bases translated at a time.
+
+    Returns
+    -------
+    Peptides
+        The longest peptide of each sequence, in order.
+
+    Examples
+    --------
+    >>> code = {a + b + c: 'X' for a in 'ACGU' for b in 'ACGU' for c in 'ACGU'}
+    >>> code.update(AUG = 'M', UAA = '*', UAG = '*', UGA = '*')
+    >>> list(longest_peptide_many(['CCAUGCCCUAA', 'CCC', 'UUACAUCAU'], code))
+    ['MX', '', 'MM']
+    """
+    code = compile_genetic_code(genetic_code)
+    buffer = bytearray()
+    offsets = array.array('q', [0])
+    for joined, spans, reverse_joined in _join_sequences(sequences, code,
+            batch_bases, reverse = True):
+        # The translated frames of both strands, with their start codons
+        frames = []
+        for strand in (joined, reverse_joined):
+            for frame in range(3):
+                indices = code.codon_indices(strand, frame)
+                frames.append((strand, frame,
+                        indices.translate(code._amino_acid_table),
+                        indices.translate(code._start_table)))
+        for offset, n in spans:
+            longest = (0, b'', 0)
+            for strand, frame, amino_acids, is_start in frames:
+                first = offset // 3
+                last = first + max(0, (n - frame) // 3)
+                start = is_start.find(1, first, last)
+                while start >= 0:
+                    end = amino_acids.find(b'*', start, last)
+                    if end < 0:
+                        end = last
+                    # The first start after a stop codon has the longest
+                    # translation (and holds the nested ones)
+                    bad = amino_acids.find(code._INVALID_AMINO_ACID, start,
+                            end)
+                    if bad >= 0:
+                        _raise_invalid_codon(strand[frame:], bad)
+                    if end - start > longest[0]:
+                        longest = (end - start, amino_acids, start)
+                    start = is_start.find(1, end + 1, last)
+            length, amino_acids, start = longest
+            buffer += amino_acids[start:start + length]
+            offsets.append(len(buffer))
+    return Peptides(bytes(buffer), offsets)
 
 if __name__ == '__main__':
     genetic_code = {'GUC': 'V', 'ACC': 'T', 'GUA': 'V', 'GUG': 'V', 'ACU': 'T', 'AAC': 'N', 'CCU': 'P', 'UGG': 'W', 'AGC': 'S', 'AUC': 'I', 'CAU': 'H', 'AAU': 'N', 'AGU': 'S', 'GUU': 'V', 'CAC': 'H', 'ACG': 'T', 'CCG': 'P', 'CCA': 'P', 'ACA': 'T', 'CCC': 'P', 'UGU': 'C', 'GGU': 'G', 'UCU': 'S', 'GCG': 'A', 'UGC': 'C', 'CAG': 'Q', 'GAU': 'D', 'UAU': 'Y', 'CGG': 'R', 'UCG': 'S', 'AGG': 'R', 'GGG': 'G', 'UCC': 'S', 'UCA': 'S', 'UAA': '*', 'GGA': 'G', 'UAC': 'Y', 'GAC': 'D', 'UAG': '*', 'AUA': 'I', 'GCA': 'A', 'CUU': 'L', 'GGC': 'G', 'AUG': 'M', 'CUG': 'L', 'GAG': 'E', 'CUC': 'L', 'AGA': 'R', 'CUA': 'L', 'GCC': 'A', 'AAA': 'K', 'AAG': 'K', 'CAA': 'Q', 'UUU': 'F', 'CGU': 'R', 'CGC': 'R', 'CGA': 'R', 'GCU': 'A', 'GAA': 'E', 'AUU': 'I', 'UUG': 'L', 'UUA': 'L', 'UGA': '*', 'UUC': 'F'}